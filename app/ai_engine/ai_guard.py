@@ -1,14 +1,104 @@
 # app/ai_engine/ai_guard.py
 
-def ai_safe_execute(ai_function, fallback_function, *args, **kwargs):
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from app.config import AI_CALL_WORKERS
+from app.utils.metrics import counter
+
+AI_FALLBACKS = counter(
+    "ai_fallbacks_total",
+    "AI calls that failed and were served by the rule-based fallback",
+    ["function", "error"],
+)
+
+
+class AITimeoutError(TimeoutError):
+    """
+    Raised when an AI call does not finish within its timeout.
+    """
+
+
+# Calls with a timeout run here so the caller can stop waiting. A call
+# that times out keeps its thread until the SDK returns; the pool size
+# bounds how many of those can pile up.
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(1, AI_CALL_WORKERS),
+                    thread_name_prefix="ai-call",
+                )
+
+    return _executor
+
+
+def _call_with_timeout(function, timeout: float, args, kwargs):
+    if timeout <= 0:
+        raise AITimeoutError("no time budget left")
+
+    future = _get_executor().submit(function, *args, **kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise AITimeoutError(f"timed out after {timeout:.2f}s") from None
+
+
+def ai_safe_execute(ai_function, fallback_function, *args, timeout: Optional[float] = None, **kwargs):
     try:
+        if timeout is None:
+            result = ai_function(*args, **kwargs)
+        else:
+            result = _call_with_timeout(ai_function, timeout, args, kwargs)
+
+        return {
+            "used_ai": True,
+            "result": result
+        }
+    except Exception as e:
+        AI_FALLBACKS.inc(getattr(ai_function, "__name__", "ai_call"), type(e).__name__)
+        return {
+            "used_ai": False,
+            "fallback_reason": str(e),
+            "timed_out": isinstance(e, TimeoutError),
+            "result": fallback_function(*args, **kwargs)
+        }
+
+
+async def ai_safe_execute_async(ai_function, fallback_function, *args, timeout: Optional[float] = None, **kwargs):
+    """
+    ai_safe_execute for coroutine AI functions. The timeout cancels the
+    call itself instead of abandoning a thread.
+    """
+    try:
+        if timeout is not None and timeout <= 0:
+            raise AITimeoutError("no time budget left")
+
+        try:
+            result = await asyncio.wait_for(ai_function(*args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            raise AITimeoutError(f"timed out after {timeout:.2f}s") from None
+
         return {
             "used_ai": True,
-            "result": ai_function(*args, **kwargs)
+            "result": result
         }
     except Exception as e:
+        AI_FALLBACKS.inc(getattr(ai_function, "__name__", "ai_call"), type(e).__name__)
         return {
             "used_ai": False,
             "fallback_reason": str(e),
+            "timed_out": isinstance(e, TimeoutError),
             "result": fallback_function(*args, **kwargs)
         }
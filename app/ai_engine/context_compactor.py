@@ -0,0 +1,318 @@
+"""
+context_compactor.py
+
+Fits the resume and JD text of an LLM prompt into a token budget.
+
+Both documents are split into units (the sentences of each line).
+Repeated units and boilerplate (page markers, "references available
+upon request", equal-opportunity statements) are always dropped; a
+sentence naming a taxonomy skill is never boilerplate. When the prompt
+is still over budget, units are ranked by relevance to the JD and the
+best ones kept:
+
+- JD skills mentioned in the unit (skill spans from the taxonomy)
+- other skills, JD keywords and numbers (quantified results)
+- the resume section the unit belongs to, weighted per prompt (the
+  rewrite prompt only works on summary, experience and projects)
+
+The first line of every resume section is always kept, so the model
+never reports a section as missing because it was trimmed away.
+
+Kept units stay in document order (sentences of one line on one line),
+grouped under their section heading, so the model still sees a resume.
+A document with nothing left is passed through unchanged. Tokens are
+estimated at ~4 characters per token, like the gateway's usage fallback.
+"""
+
+import bisect
+import logging
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.config import (
+    CONTEXT_COMPACTION_ENABLED,
+    FEEDBACK_PROMPT_MAX_TOKENS,
+    REWRITE_PROMPT_MAX_TOKENS,
+)
+from app.matching.compiled_jd import CompiledJD, compile_jd
+from app.parsing.parsed_resume import ParsedResume, ensure_parsed
+from app.skills.skill_extractor import SKILL_AUTOMATON
+from app.utils.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+# Bump when the selection rules change (part of the result cache key)
+COMPACTOR_VERSION = "2"
+
+PROMPT_MAX_TOKENS = {
+    "section_feedback": FEEDBACK_PROMPT_MAX_TOKENS,
+    "resume_rewrite": REWRITE_PROMPT_MAX_TOKENS,
+}
+
+# Relevance weight of each resume section, per prompt template.
+# None is text outside any recognized section (name, contact details).
+SECTION_WEIGHTS: Dict[str, Dict[Optional[str], float]] = {
+    "section_feedback": {
+        "summary": 1.0, "experience": 1.0, "projects": 1.0, "skills": 1.0,
+        "education": 0.6, None: 0.3,
+    },
+    "resume_rewrite": {
+        "summary": 1.2, "experience": 1.2, "projects": 1.1, "skills": 0.6,
+        "education": 0.3, None: 0.2,
+    },
+}
+
+# Share of the budget the JD may take when both documents must shrink
+JD_BUDGET_SHARE = 0.35
+
+LLM_CONTEXT_TOKENS = counter(
+    "llm_context_tokens_total",
+    "Estimated resume + JD tokens in LLM prompts, before and after compaction",
+    ["template", "phase"],
+)
+
+_LINE_PATTERN = re.compile(r"[^\n]+")
+_SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+(?=\S)")
+_NORMALIZE_PATTERN = re.compile(r"[^a-z0-9]+")
+_WORD_PATTERN = re.compile(r"[a-z][a-z+#.]{3,}")
+_REQUIREMENT_PATTERN = re.compile(
+    r"\b(must|required|requirements?|qualifications?|responsibilit\w*|experience|years?)\b"
+)
+
+_RESUME_BOILERPLATE = re.compile(
+    r"^(page \d+( of \d+)?|\d+|references( are)? available( up)?on request"
+    r"|curriculum vitae|resume|cv|confidential)$"
+)
+_JD_BOILERPLATE = re.compile(
+    r"equal (employment )?opportunity|reasonable accommodation|without regard to"
+    r"|all qualified applicants|privacy (policy|notice)|e-verify"
+)
+
+_SECTION_LEAD_BONUS = 1000.0
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+class _Unit:
+    __slots__ = ("start", "end", "line", "text", "section", "score", "tokens")
+
+    def __init__(self, start: int, end: int, line: int, text: str, section: Optional[str]) -> None:
+        self.start = start
+        self.end = end
+        self.line = line
+        self.text = text
+        self.section = section
+        self.score = 0.0
+        self.tokens = estimate_tokens(text) + 1
+
+
+def _split_units(
+    text: str,
+    boilerplate: re.Pattern,
+    skill_spans: List[Tuple[int, int, str]],
+) -> List[Tuple[int, int, int, str]]:
+    """
+    (start, end, line_start, text) of every distinct, non-boilerplate
+    sentence, in document order.
+    """
+    units = []
+    seen = set()
+    skill_starts = sorted(start for start, _, _ in skill_spans)
+
+    for line in _LINE_PATTERN.finditer(text):
+        pieces = []
+        start = line.start()
+        for boundary in _SENTENCE_END_PATTERN.finditer(text, line.start(), line.end()):
+            pieces.append((start, boundary.start()))
+            start = boundary.end()
+        pieces.append((start, line.end()))
+
+        for start, end in pieces:
+            piece = text[start:end].strip()
+            key = _NORMALIZE_PATTERN.sub(" ", piece.lower()).strip()
+            if not key or key in seen:
+                continue
+            has_skill = bisect.bisect_left(skill_starts, start) < bisect.bisect_left(skill_starts, end)
+            if not has_skill and boilerplate.search(key):
+                continue
+            seen.add(key)
+            units.append((start, end, line.start(), piece))
+
+    return units
+
+
+def _render(units: List[_Unit]) -> List[str]:
+    """
+    Unit texts, with the kept sentences of one line joined again.
+    """
+    lines = []
+    previous = None
+    for unit in units:
+        if previous is not None and unit.line == previous.line:
+            lines[-1] += " " + unit.text
+        else:
+            lines.append(unit.text)
+        previous = unit
+    return lines
+
+
+def _skills_in(spans: List[Tuple[int, int, str]], start: int, end: int) -> set:
+    return {skill for skill_start, skill_end, skill in spans if skill_start >= start and skill_end <= end}
+
+
+def _select(units: List[_Unit], budget: int) -> List[_Unit]:
+    """
+    Highest-scoring units that fit in `budget`, back in document order.
+    """
+    kept = []
+    used = 0
+    for unit in sorted(units, key=lambda unit: (-unit.score, unit.start)):
+        if used + unit.tokens <= budget:
+            kept.append(unit)
+            used += unit.tokens
+    return sorted(kept, key=lambda unit: unit.start)
+
+
+# -----------------------------
+# Resume
+# -----------------------------
+def _resume_units(resume: ParsedResume, jd: CompiledJD, template: str) -> List[_Unit]:
+    # Offsets refer to `lower`; keep the original casing when lowercasing
+    # did not change the length
+    source = resume.text if len(resume.text) == len(resume.lower) else resume.lower
+    weights = SECTION_WEIGHTS.get(template, SECTION_WEIGHTS["section_feedback"])
+    jd_skills = set(jd.skills)
+    jd_words = set(_WORD_PATTERN.findall(jd.text.lower()))
+
+    # Text between section spans belongs to the section before it;
+    # text before the first heading to none
+    section_starts = sorted((s, name) for name, (s, _) in resume.sections.items())
+    starts = [s for s, _ in section_starts]
+
+    units = []
+    led = set()
+    for start, end, line, text in _split_units(source, _RESUME_BOILERPLATE, resume.skill_spans):
+        # Heading lines are rendered again from the section names
+        if any(start < s <= end and not source[s:end].strip(" \t:-|") for s in starts):
+            continue
+
+        index = bisect.bisect_right(starts, start) - 1
+        section = section_starts[index][1] if index >= 0 else None
+        unit = _Unit(start, end, line, text, section)
+
+        skills = _skills_in(resume.skill_spans, start, end)
+        keywords = len(set(_WORD_PATTERN.findall(resume.lower[start:end])) & jd_words)
+        unit.score = weights.get(section, 0.5) * (
+            1.0
+            + 3.0 * len(skills & jd_skills)
+            + 1.0 * len(skills - jd_skills)
+            + 0.5 * min(keywords, 5)
+            + (0.5 if re.search(r"\d", text) else 0.0)
+        )
+        # Keep every section visible: its first line goes in before any
+        # other line is ranked
+        if section not in led:
+            led.add(section)
+            unit.score += _SECTION_LEAD_BONUS
+        units.append(unit)
+
+    return units
+
+
+def _render_resume(units: List[_Unit]) -> str:
+    lines = []
+    current = object()
+    block: List[_Unit] = []
+    for unit in units:
+        if unit.section != current:
+            lines.extend(_render(block))
+            block = []
+            current = unit.section
+            if current is not None:
+                if lines:
+                    lines.append("")
+                lines.append(current.capitalize())
+        block.append(unit)
+    lines.extend(_render(block))
+    return "\n".join(lines)
+
+
+# -----------------------------
+# JD
+# -----------------------------
+def _jd_units(jd: CompiledJD) -> List[_Unit]:
+    lower = jd.text.lower()
+    source = jd.text if len(jd.text) == len(lower) else lower
+    spans = SKILL_AUTOMATON.find_spans(lower)
+    must_have = set(jd.must_have)
+
+    units = []
+    for start, end, line, text in _split_units(source, _JD_BOILERPLATE, spans):
+        unit = _Unit(start, end, line, text, None)
+        skills = _skills_in(spans, start, end)
+        unit.score = (
+            1.0
+            + 3.0 * len(skills & must_have)
+            + 2.0 * len(skills - must_have)
+            + (1.0 if _REQUIREMENT_PATTERN.search(lower[start:end]) else 0.0)
+        )
+        units.append(unit)
+
+    return units
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+def compact_context(
+    resume: Union[str, ParsedResume],
+    jd: Union[str, CompiledJD],
+    template: str,
+    prompt_template: str,
+) -> Tuple[str, str]:
+    """
+    (resume_text, jd_text) for `prompt_template` (rendered with
+    resume_text / jd_text), deduplicated and, if needed, trimmed so the
+    whole prompt stays within PROMPT_MAX_TOKENS[template].
+    """
+    resume = ensure_parsed(resume)
+    jd = compile_jd(jd)
+
+    before = estimate_tokens(resume.text) + estimate_tokens(jd.text)
+    if not CONTEXT_COMPACTION_ENABLED:
+        return resume.text, jd.text
+
+    overhead = estimate_tokens(prompt_template.format(resume_text="", jd_text=""))
+    budget = max(PROMPT_MAX_TOKENS.get(template, FEEDBACK_PROMPT_MAX_TOKENS) - overhead, 0)
+
+    resume_units = _resume_units(resume, jd, template)
+    jd_units = _jd_units(jd)
+    resume_tokens = sum(unit.tokens for unit in resume_units)
+    jd_tokens = sum(unit.tokens for unit in jd_units)
+
+    if resume_tokens + jd_tokens > budget:
+        # The JD gives up its share first; the resume keeps the rest
+        jd_budget = max(int(budget * JD_BUDGET_SHARE), budget - resume_tokens)
+        jd_units = _select(jd_units, jd_budget)
+        jd_tokens = sum(unit.tokens for unit in jd_units)
+        resume_units = _select(resume_units, budget - jd_tokens)
+
+    # Never hand the model an empty document (e.g. a JD that is a single
+    # boilerplate paragraph); the raw text is better than nothing
+    resume_text = _render_resume(resume_units) or resume.text
+    jd_text = "\n".join(_render(jd_units)) or jd.text
+    after = estimate_tokens(resume_text) + estimate_tokens(jd_text)
+
+    LLM_CONTEXT_TOKENS.inc(template, "before", amount=before)
+    LLM_CONTEXT_TOKENS.inc(template, "after", amount=after)
+    logger.info(
+        "Compacted %s context: ~%d -> ~%d tokens (resume %d -> %d, JD %d -> %d, budget %d)",
+        template, before, after,
+        estimate_tokens(resume.text), estimate_tokens(resume_text),
+        estimate_tokens(jd.text), estimate_tokens(jd_text),
+        budget,
+    )
+
+    return resume_text, jd_text
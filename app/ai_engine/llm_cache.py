@@ -0,0 +1,125 @@
+"""
+llm_cache.py
+
+Persistent cache of parsed LLM responses.
+
+Keyed by (model, prompt template id, SHA-256 of the rendered prompt), so
+the same resume checked against the same JD (UI refreshes, re-runs)
+reuses the earlier Gemini answer. Only responses that parsed as JSON are
+stored. Memory LRU tier in front of a size-bounded sqlite tier, both
+with a TTL.
+
+Each entry keeps the token usage of the call it replaced; hits add it
+to the tokens / dollars saved counters.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from app.config import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_MEMORY_ITEMS,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_PRICE_INPUT_PER_MTOK,
+    LLM_PRICE_OUTPUT_PER_MTOK,
+)
+from app.utils.cache import MemoryLRU, SqliteCache, TieredCache
+from app.utils.metrics import counter, register_cache_stats
+
+LLM_CACHE_TOKENS_SAVED = counter(
+    "llm_cache_tokens_saved_total",
+    "LLM tokens not spent thanks to the response cache",
+    ["model", "template", "kind"],
+)
+LLM_CACHE_DOLLARS_SAVED = counter(
+    "llm_cache_dollars_saved_total",
+    "Estimated LLM spend avoided by the response cache (USD)",
+    ["model", "template"],
+)
+
+llm_cache = TieredCache(
+    memory=MemoryLRU(max_items=LLM_CACHE_MEMORY_ITEMS, ttl_seconds=LLM_CACHE_TTL_SECONDS),
+    disk=SqliteCache(
+        LLM_CACHE_PATH,
+        max_bytes=LLM_CACHE_MAX_BYTES,
+        ttl_seconds=LLM_CACHE_TTL_SECONDS,
+        table="llm_responses",
+    ) if LLM_CACHE_PATH else None,
+) if LLM_CACHE_ENABLED else None
+
+_saved = {"tokens": 0, "dollars": 0.0}
+
+
+def llm_cache_key(model: str, template: str, prompt: str) -> str:
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return f"{model}:{template}:{digest}"
+
+
+def call_cost(prompt_tokens: int, output_tokens: int) -> float:
+    return (
+        prompt_tokens * LLM_PRICE_INPUT_PER_MTOK
+        + output_tokens * LLM_PRICE_OUTPUT_PER_MTOK
+    ) / 1_000_000
+
+
+def get_cached_response(model: str, template: str, prompt: str) -> Optional[Any]:
+    """
+    Parsed JSON of an earlier identical call, or None.
+    """
+    if llm_cache is None:
+        return None
+
+    payload = llm_cache.get(llm_cache_key(model, template, prompt))
+    if payload is None:
+        return None
+
+    entry = json.loads(payload)
+    prompt_tokens = entry.get("prompt_tokens", 0)
+    output_tokens = entry.get("output_tokens", 0)
+    dollars = call_cost(prompt_tokens, output_tokens)
+
+    LLM_CACHE_TOKENS_SAVED.inc(model, template, "prompt", amount=prompt_tokens)
+    LLM_CACHE_TOKENS_SAVED.inc(model, template, "output", amount=output_tokens)
+    LLM_CACHE_DOLLARS_SAVED.inc(model, template, amount=dollars)
+    _saved["tokens"] += prompt_tokens + output_tokens
+    _saved["dollars"] += dollars
+
+    return entry["response"]
+
+
+def store_response(
+    model: str,
+    template: str,
+    prompt: str,
+    response: Any,
+    prompt_tokens: int,
+    output_tokens: int,
+) -> None:
+    if llm_cache is None:
+        return
+
+    llm_cache.set(
+        llm_cache_key(model, template, prompt),
+        json.dumps({
+            "response": response,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+        }),
+    )
+
+
+def llm_cache_stats() -> Dict[str, object]:
+    if llm_cache is None:
+        return {"misses": 0, "hit_rate": 0.0}
+
+    return {
+        **llm_cache.stats(),
+        "tokens_saved": _saved["tokens"],
+        "dollars_saved": round(_saved["dollars"], 6),
+    }
+
+
+register_cache_stats("llm_responses", llm_cache_stats)
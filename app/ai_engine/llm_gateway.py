@@ -0,0 +1,327 @@
+"""
+llm_gateway.py
+
+Single async entry point for LLM calls.
+
+- one provider (see llm_providers.py; for Gemini, a genai client and
+  its HTTP connection pool) per event loop, created on first use; a
+  missing API key fails the call, not the import
+- global concurrency cap (LLM_MAX_CONCURRENCY in-flight calls)
+- token bucket limiting the request rate (LLM_REQUESTS_PER_MINUTE)
+- per-attempt timeout and an optional overall timeout
+- retries with exponential backoff and jitter for transient errors
+  (timeouts, connection errors, 429, 5xx)
+
+Calls are native asyncio, so LLM stages of the analysis pipeline run
+concurrently with each other and with the CPU stages without holding
+a thread each.
+
+generate_json() adds the persistent response cache (see llm_cache.py)
+in front of all of this.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+import weakref
+from typing import Any, Optional, Tuple
+
+import httpx
+from google.genai import errors as genai_errors
+
+from app.ai_engine.llm_cache import get_cached_response, store_response
+from app.ai_engine.llm_providers import (  # noqa: F401 (LLMUnavailableError re-exported)
+    LLMProvider,
+    LLMUnavailableError,
+    create_provider,
+)
+from app.config import (
+    LLM_BURST,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_MODEL,
+    LLM_PROVIDER,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_RETRY_BASE_SECONDS,
+    LLM_TIMEOUT_SECONDS,
+)
+from app.utils.metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+LLM_REQUEST_SECONDS = histogram(
+    "llm_request_seconds",
+    "Latency of one LLM attempt",
+    ["model"],
+)
+LLM_REQUESTS = counter(
+    "llm_requests_total",
+    "LLM attempts by outcome",
+    ["model", "outcome"],
+)
+LLM_RETRIES = counter(
+    "llm_retries_total",
+    "LLM attempts retried after a transient error",
+    ["model", "error"],
+)
+
+_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class LLMTimeoutError(TimeoutError):
+    """
+    An LLM call ran out of time (per attempt or overall).
+    """
+
+
+class LLMResponseParseError(ValueError):
+    """
+    The model answered, but not with valid JSON. `raw` holds the answer.
+    """
+
+    def __init__(self, raw: str) -> None:
+        super().__init__("LLM returned invalid JSON")
+        self.raw = raw
+
+
+# -----------------------------
+# Rate limiting
+# -----------------------------
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, up to `burst`.
+    rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """
+        Take a token; return how long the caller must wait for it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        if self.rate <= 0:
+            return
+
+        wait = self._reserve()
+        if timeout is not None and wait > timeout:
+            # Give the token back; the call would miss its deadline anyway
+            with self._lock:
+                self._tokens += 1
+            raise LLMTimeoutError(f"rate limited for {wait:.2f}s")
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE / 60.0, LLM_BURST)
+
+
+# -----------------------------
+# Per-loop client state
+# -----------------------------
+class _LoopState:
+    def __init__(self) -> None:
+        self.provider: LLMProvider = create_provider()
+        self.semaphore = asyncio.Semaphore(max(1, LLM_MAX_CONCURRENCY))
+
+
+# asyncio primitives and the async HTTP pool are bound to the loop that
+# created them; a server has one loop, but tests and job workers may not
+_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+_states_lock = threading.Lock()
+
+
+def _state() -> _LoopState:
+    loop = asyncio.get_running_loop()
+    state = _states.get(loop)
+    if state is None:
+        with _states_lock:
+            state = _states.get(loop)
+            if state is None:
+                state = _LoopState()
+                _states[loop] = state
+    return state
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, (TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, genai_errors.APIError):
+        return error.code in _RETRYABLE_STATUS
+    return False
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform in [0, base * 2^attempt]
+    return random.uniform(0, LLM_RETRY_BASE_SECONDS * (2 ** attempt))
+
+
+# -----------------------------
+# Calls
+# -----------------------------
+async def _attempt(state: _LoopState, model: str, prompt: str, timeout: float):
+    started = time.perf_counter()
+    try:
+        async with state.semaphore:
+            response = await asyncio.wait_for(
+                state.provider.generate(model, prompt),
+                timeout,
+            )
+    except asyncio.TimeoutError:
+        LLM_REQUESTS.inc(model, "timeout")
+        raise LLMTimeoutError(f"LLM call timed out after {timeout:.2f}s") from None
+    except asyncio.CancelledError:
+        # The caller's deadline expired
+        LLM_REQUESTS.inc(model, "cancelled")
+        raise
+    except Exception as e:
+        LLM_REQUESTS.inc(model, type(e).__name__)
+        raise
+    finally:
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, model)
+
+    LLM_REQUESTS.inc(model, "ok")
+    return response
+
+
+def _usage(response, prompt: str, text: str) -> Tuple[int, int]:
+    """
+    (prompt_tokens, output_tokens) as billed, estimated at ~4 characters
+    per token when the response carries no usage metadata.
+    """
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    if prompt_tokens is None:
+        return len(prompt) // 4, len(text) // 4
+
+    # Thinking tokens are billed as output
+    output_tokens = (
+        (getattr(usage, "candidates_token_count", None) or 0)
+        + (getattr(usage, "thoughts_token_count", None) or 0)
+    )
+    return prompt_tokens, output_tokens
+
+
+async def generate_text(
+    prompt: str,
+    model: str = LLM_MODEL,
+    timeout: Optional[float] = None,
+) -> str:
+    """
+    Return the text of one completion.
+
+    Each attempt is capped at LLM_TIMEOUT_SECONDS; `timeout` bounds the
+    whole call including rate limiting, retries and backoff.
+    """
+    text, _ = await _generate(prompt, model, timeout)
+    return text
+
+
+def strip_code_fences(text: str) -> str:
+    return re.sub(r"```json|```", "", text).strip()
+
+
+async def generate_json(
+    prompt: str,
+    template: str,
+    model: str = LLM_MODEL,
+    timeout: Optional[float] = None,
+) -> Any:
+    """
+    Return the parsed JSON answer for a prompt rendered from `template`
+    (a stable template id, e.g. "section_feedback").
+
+    Served from the response cache when the same model saw the same
+    prompt before. Raises LLMResponseParseError when the answer is not
+    JSON; such answers are never cached.
+    """
+    # Stand-in answers must never be served for real calls
+    cache_model = model if LLM_PROVIDER == "gemini" else f"{LLM_PROVIDER}/{model}"
+
+    cached = get_cached_response(cache_model, template, prompt)
+    if cached is not None:
+        return cached
+
+    text, (prompt_tokens, output_tokens) = await _generate(prompt, model, timeout)
+
+    cleaned = strip_code_fences(text)
+    try:
+        parsed = json.loads(cleaned)
+    except json.JSONDecodeError:
+        raise LLMResponseParseError(cleaned) from None
+
+    store_response(cache_model, template, prompt, parsed, prompt_tokens, output_tokens)
+    return parsed
+
+
+async def _generate(
+    prompt: str,
+    model: str,
+    timeout: Optional[float],
+) -> Tuple[str, Tuple[int, int]]:
+    state = _state()
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout is not None else None
+
+    def remaining() -> float:
+        if deadline is None:
+            return LLM_TIMEOUT_SECONDS
+        left = deadline - loop.time()
+        if left <= 0:
+            raise LLMTimeoutError("LLM call ran out of time")
+        return min(LLM_TIMEOUT_SECONDS, left)
+
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        await _bucket.acquire(remaining() if deadline is not None else None)
+
+        try:
+            response = await _attempt(state, model, prompt, remaining())
+            text = response.text or ""
+            return text, _usage(response, prompt, text)
+        except Exception as e:
+            if attempt >= LLM_MAX_RETRIES or not _is_transient(e):
+                raise
+
+            delay = _backoff(attempt)
+            if deadline is not None and loop.time() + delay >= deadline:
+                raise
+
+            LLM_RETRIES.inc(model, type(e).__name__)
+            logger.warning(
+                "LLM call failed (%s), retry %d in %.2fs", e, attempt + 1, delay
+            )
+            await asyncio.sleep(delay)
+
+    raise AssertionError("unreachable")
+
+
+async def close_llm_gateway() -> None:
+    """
+    Close the provider of the running loop (called on shutdown).
+    """
+    state = _states.pop(asyncio.get_running_loop(), None)
+    if state is not None:
+        await state.provider.aclose()
@@ -0,0 +1,212 @@
+"""
+llm_providers.py
+
+Backends behind the LLM gateway (LLM_PROVIDER).
+
+- gemini : Google Gemini through the google-genai async client
+- stub   : local stand-in for offline load and latency tests; answers
+           the three prompts in prompts.py with schema-valid JSON after
+           a log-normal delay, and injects 503 errors and truncated
+           JSON at configurable rates
+
+Providers only make one attempt; rate limiting, timeouts, retries and
+caching stay in llm_gateway.py, so the stand-in exercises the same
+paths as the real API.
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+from typing import Any, Dict, List, Optional
+
+from google import genai
+from google.genai import errors as genai_errors
+
+from app.config import (
+    GEMINI_API_KEY,
+    LLM_PROVIDER,
+    LLM_STUB_ERROR_RATE,
+    LLM_STUB_LATENCY_MS,
+    LLM_STUB_LATENCY_SIGMA,
+    LLM_STUB_MALFORMED_RATE,
+    LLM_STUB_SEED,
+)
+
+
+class LLMUnavailableError(RuntimeError):
+    """
+    The gateway cannot make calls (e.g. GEMINI_API_KEY is not set).
+    """
+
+
+class LLMProvider:
+    """
+    One completion per generate() call. The response has a `.text`
+    and, when the backend reports it, a Gemini-style `.usage_metadata`.
+    """
+
+    name = "base"
+
+    async def generate(self, model: str, prompt: str) -> Any:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+# -----------------------------
+# Gemini
+# -----------------------------
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str) -> None:
+        if not api_key:
+            raise LLMUnavailableError("GEMINI_API_KEY is not set")
+        self.client = genai.Client(api_key=api_key)
+
+    async def generate(self, model: str, prompt: str) -> Any:
+        return await self.client.aio.models.generate_content(model=model, contents=prompt)
+
+    async def aclose(self) -> None:
+        await self.client.aio.aclose()
+
+
+# -----------------------------
+# Offline stand-in
+# -----------------------------
+class StubResponse:
+    """
+    Minimal stand-in for a GenerateContentResponse. No usage metadata:
+    the gateway estimates token counts from the text.
+    """
+
+    usage_metadata = None
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+_STUB_SECTIONS = ("summary", "experience", "projects", "skills")
+_STUB_STATUSES = ("strong", "average", "weak")
+_STUB_CATEGORIES = (
+    "Programming Language",
+    "Framework / Library",
+    "Cloud / DevOps Tool",
+    "Data / AI Tool",
+    "Testing Tool",
+    "Other Technical Skill",
+)
+
+
+def _prompt_field(prompt: str, label: str, next_label: Optional[str] = None) -> str:
+    """
+    Text following `label:` in a rendered prompt, up to `next_label:`.
+    """
+    _, _, rest = prompt.partition(f"\n{label}:\n")
+    if next_label:
+        rest, _, _ = rest.partition(f"\n{next_label}:\n")
+    return rest.strip()
+
+
+class StubProvider(LLMProvider):
+    """
+    Offline stand-in. Latency is log-normal around `latency_ms` with
+    shape `sigma` (0 = constant); `error_rate` of the calls fail with a
+    503 ServerError (retried by the gateway), `malformed_rate` of the
+    answers are cut off mid-JSON. A non-zero `seed` makes runs repeatable.
+    """
+
+    name = "stub"
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        sigma: float = 0.5,
+        error_rate: float = 0.0,
+        malformed_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self._random = random.Random(seed or None)
+
+    def _delay(self) -> float:
+        return self.latency_ms / 1000.0 * math.exp(self._random.gauss(0.0, self.sigma))
+
+    async def generate(self, model: str, prompt: str) -> Any:
+        await asyncio.sleep(self._delay())
+
+        if self._random.random() < self.error_rate:
+            raise genai_errors.ServerError(503, {"error": {
+                "code": 503,
+                "message": "stub provider: simulated overload",
+                "status": "UNAVAILABLE",
+            }})
+
+        text = json.dumps(self.answer(prompt))
+        if self._random.random() < self.malformed_rate:
+            text = text[: len(text) // 2]
+        return StubResponse(text)
+
+    def answer(self, prompt: str) -> Any:
+        """
+        Schema-valid answer for a prompt rendered from prompts.py.
+        """
+        if "skill classification engine" in prompt:
+            return self._skill_classification(_prompt_field(prompt, "Skills"))
+        if "resume optimization engine" in prompt:
+            return self._resume_rewrite(_prompt_field(prompt, "Resume", "Job Description"))
+        if "resume reviewer" in prompt:
+            return self._section_feedback()
+        return {}
+
+    def _skill_classification(self, skills: str) -> Dict[str, str]:
+        return {
+            skill.strip(): self._random.choice(_STUB_CATEGORIES)
+            for skill in skills.split(",")
+            if skill.strip()
+        }
+
+    def _section_feedback(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            section: {
+                "status": self._random.choice(_STUB_STATUSES),
+                "issues": [f"{section.capitalize()} lacks measurable outcomes"],
+                "suggestions": [f"Align the {section} section with the JD keywords"],
+            }
+            for section in _STUB_SECTIONS
+        }
+
+    def _resume_rewrite(self, resume: str) -> Dict[str, Any]:
+        lines: List[str] = [
+            line.strip() for line in resume.splitlines()
+            if len(line.strip()) > 20
+        ]
+        summary = re.sub(r"\s+", " ", " ".join(lines[:2]))[:300]
+
+        return {
+            "summary": summary or "Engineer with experience relevant to the role.",
+            "experience": [f"Delivered: {line[:160]}" for line in lines[2:5]],
+            "projects": [f"Built: {line[:160]}" for line in lines[5:7]],
+        }
+
+
+def create_provider() -> LLMProvider:
+    provider = LLM_PROVIDER.strip().lower()
+    if provider == "gemini":
+        return GeminiProvider(GEMINI_API_KEY)
+    if provider == "stub":
+        return StubProvider(
+            latency_ms=LLM_STUB_LATENCY_MS,
+            sigma=LLM_STUB_LATENCY_SIGMA,
+            error_rate=LLM_STUB_ERROR_RATE,
+            malformed_rate=LLM_STUB_MALFORMED_RATE,
+            seed=LLM_STUB_SEED,
+        )
+
+    raise ValueError(f"Unknown LLM_PROVIDER: {LLM_PROVIDER!r}")
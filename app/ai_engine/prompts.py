@@ -17,7 +17,8 @@ classify each skill into one of these categories:
 - Testing Tool
 - Other Technical Skill
 
-Return JSON only.
+Return JSON only: an object mapping each skill, spelled exactly as
+given, to its category.
 
 Skills:
 {skills}
@@ -1,26 +1,24 @@
-import json
-import os
-from google import genai
-from app.ai_engine.prompts import JD_RESUME_REWRITE_PROMPT
+from typing import Union
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+from app.ai_engine.context_compactor import compact_context
+from app.ai_engine.llm_gateway import LLMResponseParseError, generate_json
+from app.ai_engine.prompts import JD_RESUME_REWRITE_PROMPT
+from app.matching.compiled_jd import CompiledJD
+from app.parsing.parsed_resume import ParsedResume
 
-def rewrite_resume_for_jd(resume_text: str, jd_text: str) -> dict:
+async def rewrite_resume_for_jd(
+    resume: Union[str, ParsedResume],
+    jd: Union[str, CompiledJD],
+) -> dict:
+    resume_text, jd_text = compact_context(resume, jd, "resume_rewrite", JD_RESUME_REWRITE_PROMPT)
     prompt = JD_RESUME_REWRITE_PROMPT.format(
         resume_text=resume_text,
         jd_text=jd_text
     )
 
-    response = client.models.generate_content(
-        model="models/gemini-2.5-flash",
-        contents=prompt
-    )
-
-    raw = response.text.replace("```json", "").replace("```", "").strip()
-
     try:
-        return json.loads(raw)
-    except Exception:
+        return await generate_json(prompt, "resume_rewrite")
+    except LLMResponseParseError:
         return {
             "summary": "",
             "experience": [],
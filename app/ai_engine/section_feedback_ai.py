@@ -1,40 +1,32 @@
 # app/ai_engine/section_feedback_ai.py
 
-import os
-import json
-from dotenv import load_dotenv
-from google import genai
+from typing import Union
 
+from app.ai_engine.context_compactor import compact_context
+from app.ai_engine.llm_gateway import LLMResponseParseError, generate_json
 from app.ai_engine.prompts import SECTION_FEEDBACK_PROMPT
+from app.matching.compiled_jd import CompiledJD
+from app.parsing.parsed_resume import ParsedResume
 
-load_dotenv()
 
-# Gemini client (same as skill_fallback.py)
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-
-
-def generate_section_feedback_ai(resume_text: str, jd_text: str) -> dict:
+async def generate_section_feedback_ai(
+    resume: Union[str, ParsedResume],
+    jd: Union[str, CompiledJD],
+) -> dict:
     """
     AI-based section-wise resume feedback:
     Summary, Experience, Projects, Skills, Education
     """
 
+    resume_text, jd_text = compact_context(resume, jd, "section_feedback", SECTION_FEEDBACK_PROMPT)
     prompt = SECTION_FEEDBACK_PROMPT.format(
         resume_text=resume_text,
         jd_text=jd_text
     )
 
-    response = client.models.generate_content(
-        model="models/gemini-2.5-flash",
-        contents=prompt,
-    )
-
-    raw_text = response.text.strip()
-    raw_text = raw_text.replace("```json", "").replace("```", "").strip()
-
     try:
-        return json.loads(raw_text)
-    except Exception:
+        return await generate_json(prompt, "section_feedback")
+    except LLMResponseParseError:
         return {
             "summary": {"status": "unknown", "issues": ["LLM parse failed"], "suggestions": []},
             "experience": {"status": "unknown", "issues": ["LLM parse failed"], "suggestions": []},
@@ -42,5 +34,3 @@ def generate_section_feedback_ai(resume_text: str, jd_text: str) -> dict:
             "skills": {"status": "unknown", "issues": ["LLM parse failed"], "suggestions": []},
             "education": {"status": "unknown", "issues": ["LLM parse failed"], "suggestions": []},
         }
-
-
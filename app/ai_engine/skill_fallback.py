@@ -3,28 +3,38 @@ skill_fallback.py
 
 AI-powered fallback engine using Google Gemini (new SDK).
 Used for unknown skill classification.
-"""
 
-import os
-import json
-import re
-from typing import List, Dict
+Each distinct skill is sent to the LLM at most once: answers are kept
+in the persistent skill store (app/skills/classification_store.py) and
+classified skills are promoted into the local taxonomy. Misses from
+concurrent requests are collected for SKILL_CLASSIFY_WINDOW_MS and
+classified with a single prompt.
+"""
 
-from dotenv import load_dotenv
-from google import genai
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, List, Optional
 
+from app.ai_engine.llm_gateway import generate_json
 from app.ai_engine.prompts import SKILL_CLASSIFICATION_PROMPT
+from app.config import SKILL_CLASSIFY_MAX_BATCH, SKILL_CLASSIFY_WINDOW_MS
+from app.skills.classification_store import skill_key, skill_store
+from app.skills.skill_extractor import promote_skills
+from app.utils.metrics import counter
 
-# Load environment variables
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY not found in environment variables")
+logger = logging.getLogger(__name__)
 
-# Create Gemini client
-client = genai.Client(api_key=GEMINI_API_KEY)
+SKILL_CLASSIFY_BATCHES = counter(
+    "skill_classification_batches_total",
+    "LLM prompts sent to classify unknown skills",
+    ["outcome"],
+)
+SKILL_CLASSIFY_COALESCED = counter(
+    "skill_classification_coalesced_total",
+    "Unknown skills that joined a classification already pending or in flight",
+)
 
 
 def detect_unknown_skills(
@@ -42,32 +52,179 @@ def detect_unknown_skills(
     ))
 
 
-def classify_unknown_skills(unknown_skills: List[str]) -> Dict[str, str]:
+# -----------------------------
+# Response parsing
+# -----------------------------
+def _parse_categories(parsed: Any) -> Dict[str, str]:
+    """
+    skill key -> category from the shapes the model answers with:
+    {skill: category}, {category: [skills]} or [{"skill", "category"}].
+    """
+    categories: Dict[str, str] = {}
+
+    if isinstance(parsed, list):
+        for item in parsed:
+            if isinstance(item, dict):
+                skill, category = item.get("skill"), item.get("category")
+                if isinstance(skill, str) and isinstance(category, str):
+                    categories[skill_key(skill)] = category
+        return categories
+
+    if not isinstance(parsed, dict):
+        return categories
+
+    for name, value in parsed.items():
+        if isinstance(value, str):
+            categories[skill_key(name)] = value
+        elif isinstance(value, dict) and isinstance(value.get("category"), str):
+            categories[skill_key(name)] = value["category"]
+        elif isinstance(value, list):
+            if all(isinstance(item, str) for item in value):
+                categories.update((skill_key(item), name) for item in value)
+            else:
+                categories.update(_parse_categories(value))
+
+    return categories
+
+
+# -----------------------------
+# Request coalescing
+# -----------------------------
+class _Coalescer:
+    """
+    Pending and in-flight skill keys of one event loop, each with the
+    future its callers wait on.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.futures: Dict[str, asyncio.Future] = {}
+        self.pending: Dict[str, str] = {}
+        self.timer: Optional[asyncio.TimerHandle] = None
+        # Strong references; the loop only keeps weak ones to tasks
+        self.tasks: set = set()
+
+    def submit(self, names: Dict[str, str]) -> Dict[str, asyncio.Future]:
+        futures = {}
+        for key, name in names.items():
+            future = self.futures.get(key)
+            if future is None:
+                future = self.loop.create_future()
+                self.futures[key] = future
+                self.pending[key] = name
+            else:
+                SKILL_CLASSIFY_COALESCED.inc()
+            futures[key] = future
+
+        if len(self.pending) >= SKILL_CLASSIFY_MAX_BATCH:
+            self.flush()
+        elif self.pending and self.timer is None:
+            self.timer = self.loop.call_later(SKILL_CLASSIFY_WINDOW_MS / 1000.0, self.flush)
+
+        return futures
+
+    def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        pending = list(self.pending.items())
+        self.pending.clear()
+
+        for start in range(0, len(pending), max(1, SKILL_CLASSIFY_MAX_BATCH)):
+            batch = dict(pending[start:start + SKILL_CLASSIFY_MAX_BATCH])
+            task = self.loop.create_task(self._classify(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _classify(self, batch: Dict[str, str]) -> None:
+        prompt = SKILL_CLASSIFICATION_PROMPT.format(skills=", ".join(batch.values()))
+
+        try:
+            parsed = await generate_json(prompt, "skill_classification")
+        except BaseException as e:
+            SKILL_CLASSIFY_BATCHES.inc(type(e).__name__)
+            self._resolve(batch, error=e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        SKILL_CLASSIFY_BATCHES.inc("ok")
+        logger.debug("Classified %d unknown skill(s) in one prompt", len(batch))
+        answered = _parse_categories(parsed)
+        categories = {key: answered.get(key) for key in batch}
+
+        # Skills the model skipped are recorded too, so they are not re-asked
+        skill_store.put_many(categories)
+        promote_skills([key for key, category in categories.items() if category])
+
+        self._resolve(batch, categories=categories)
+
+    def _resolve(self, batch, categories=None, error=None) -> None:
+        for key in batch:
+            future = self.futures.pop(key, None)
+            if future is None or future.done():
+                continue
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(categories[key])
+
+
+_coalescers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Coalescer]" = (
+    weakref.WeakKeyDictionary()
+)
+_coalescers_lock = threading.Lock()
+
+
+def _coalescer() -> _Coalescer:
+    loop = asyncio.get_running_loop()
+    coalescer = _coalescers.get(loop)
+    if coalescer is None:
+        with _coalescers_lock:
+            coalescer = _coalescers.get(loop)
+            if coalescer is None:
+                coalescer = _Coalescer(loop)
+                _coalescers[loop] = coalescer
+    return coalescer
+
+
+async def classify_unknown_skills(unknown_skills: List[str]) -> Dict[str, str]:
     """
     Classify unknown skills using Gemini AI.
-    Returns a JSON dictionary safely.
+    Returns {skill: category} for the skills that have a category.
+    Raises LLMResponseParseError when the answer is not valid JSON, so
+    pipeline stages degrade instead of merging an error payload.
     """
     if not unknown_skills:
         return {}
 
-    prompt = SKILL_CLASSIFICATION_PROMPT.format(
-        skills=", ".join(unknown_skills)
-    )
-
-    response = client.models.generate_content(
-        model="models/gemini-2.5-flash",
-        contents=prompt,
-    )
-
-    raw_text = response.text.strip()
-
-    # Remove markdown formatting if present
-    cleaned_text = re.sub(r"```json|```", "", raw_text).strip()
-
-    try:
-        return json.loads(cleaned_text)
-    except json.JSONDecodeError:
-        return {
-            "error": "AI returned invalid JSON",
-            "raw_response": cleaned_text,
-        }
\ No newline at end of file
+    names = {}
+    for skill in unknown_skills:
+        key = skill_key(skill)
+        if key:
+            names.setdefault(key, skill)
+
+    known, missing = skill_store.lookup(names)
+    categories = dict(known)
+
+    if missing:
+        futures = _coalescer().submit({key: names[key] for key in missing})
+        # Shielded: a caller that gives up (deadline) must not cancel
+        # a batch other requests are waiting on
+        results = await asyncio.shield(
+            asyncio.gather(*futures.values(), return_exceptions=True)
+        )
+
+        for key, result in zip(futures, results):
+            if isinstance(result, BaseException):
+                raise result
+            categories[key] = result
+
+    return {
+        names[key]: category
+        for key, category in categories.items()
+        if category
+    }
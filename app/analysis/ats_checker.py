@@ -6,7 +6,9 @@ Validates resume structure, formatting, and parsing friendliness.
 """
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Union
+
+from app.parsing.parsed_resume import ParsedResume, ensure_parsed
 
 
 REQUIRED_SECTIONS = [
@@ -29,7 +31,8 @@ def detect_images(text: str) -> bool:
     """
     Detect image references.
     """
-    return "image" in text.lower() or "img" in text.lower()
+    text = text.lower()
+    return "image" in text or "img" in text
 
 
 def detect_columns(text: str) -> bool:
@@ -39,29 +42,33 @@ def detect_columns(text: str) -> bool:
     return bool(re.search(r"\s{4,}\w+", text))
 
 
-def detect_required_sections(text: str) -> List[str]:
+def detect_required_sections(resume: Union[str, ParsedResume]) -> List[str]:
     """
     Detect missing required resume sections.
-    """
-    text = text.lower()
-    missing = []
 
-    for section in REQUIRED_SECTIONS:
-        if section not in text:
-            missing.append(section)
+    A section counts as present when its name appears anywhere in the
+    text, however the heading is decorated.
+    """
+    parsed = ensure_parsed(resume)
 
-    return missing
+    return [
+        section for section in REQUIRED_SECTIONS
+        if section not in parsed.lower
+    ]
 
 
-def calculate_ats_format_score(resume_text: str) -> Dict[str, object]:
+def calculate_ats_format_score(resume: Union[str, ParsedResume]) -> Dict[str, object]:
     """
     Calculate ATS compatibility score and issues.
     """
+    parsed = ensure_parsed(resume)
+    resume_text = parsed.text
+
     issues = []
     score = 100
 
     # Length check
-    word_count = len(resume_text.split())
+    word_count = parsed.word_count
     if word_count < 300:
         score -= 20
         issues.append("Resume is too short for ATS parsing")
@@ -82,7 +89,7 @@ def calculate_ats_format_score(resume_text: str) -> Dict[str, object]:
         issues.append("Multi-column layout detected (ATS reads single column)")
 
     # Section validation
-    missing_sections = detect_required_sections(resume_text)
+    missing_sections = detect_required_sections(parsed)
     if missing_sections:
         score -= 20
         issues.append(
@@ -8,7 +8,12 @@ Ignores education timeline.
 
 import re
 from datetime import datetime
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, Union
+
+from app.parsing.parsed_resume import ParsedResume, ensure_parsed
+
+if TYPE_CHECKING:
+    from app.matching.compiled_jd import CompiledJD
 
 
 CURRENT_YEAR = datetime.now().year
@@ -30,24 +35,11 @@ MONTH_MAP = {
 }
 
 
-def extract_experience_section(text: str) -> str:
+def extract_experience_section(resume: Union[str, ParsedResume]) -> str:
     """
     Extract only the Internship / Experience section from resume.
     """
-    text = text.lower()
-
-    patterns = [
-        r"internships(.+)",
-        r"experience(.+)",
-        r"work experience(.+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            return match.group(1)
-
-    return ""
+    return ensure_parsed(resume).section("experience")
 
 
 def extract_years_from_ranges(section_text: str) -> float:
@@ -81,7 +73,7 @@ def extract_years_from_ranges(section_text: str) -> float:
     return round(sum(years_found) * 0.5, 1)  # internships weighted as 0.5x
 
 
-def extract_experience_years(resume_text: str) -> float:
+def extract_experience_years(resume_text: Union[str, ParsedResume]) -> float:
     """
     Extract total experience in years from resume.
     Only counts internships and work experience.
@@ -107,9 +99,17 @@ def extract_required_years(jd_text: str) -> float:
 
     return 0.0
 
-def calculate_experience_score(resume_text: str, jd_text: str) -> dict:
+def calculate_experience_score(
+    resume_text: Union[str, ParsedResume],
+    jd_text: Union[str, "CompiledJD"],
+) -> dict:
     resume_years = extract_experience_years(resume_text)
-    required_years = extract_required_years(jd_text)
+
+    # A CompiledJD already carries the requirement
+    if isinstance(jd_text, str):
+        required_years = extract_required_years(jd_text)
+    else:
+        required_years = jd_text.required_years
 
     # Default response (SAFE)
     response = {
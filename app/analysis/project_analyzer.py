@@ -5,30 +5,16 @@ Industry-grade project relevance analyzer for ATS systems.
 Extracts project section from resume and evaluates relevance against JD skills.
 """
 
-import re
-from typing import Dict, List
+from typing import Dict, List, Union
 
-from app.skills.skill_extractor import extract_skills
+from app.parsing.parsed_resume import ParsedResume, ensure_parsed
 
 
-def analyze_projects(resume_text: str) -> str:
+def analyze_projects(resume_text: Union[str, ParsedResume]) -> str:
     """
     Extract Projects section from resume.
     """
-    text = resume_text.lower()
-
-    patterns = [
-        r"projects(.+)",
-        r"personal projects(.+)",
-        r"academic projects(.+)",
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            return match.group(1)
-
-    return ""
+    return ensure_parsed(resume_text).section("projects")
 
 
 def extract_project_technologies(project_section: str,
@@ -46,7 +32,7 @@ def extract_project_technologies(project_section: str,
 
 
 def calculate_project_relevance_score(
-    resume_text: str,
+    resume_text: Union[str, ParsedResume],
     jd_skills: List[str],
     known_skills: List[str],
 ) -> Dict[str, object]:
@@ -85,10 +71,8 @@ def calculate_project_relevance_score(
     }
 # app/analysis/project_analyzer.py
 
-from typing import Dict
-
 def analyze_projects_core(
-    resume_text: str,
+    resume_text: Union[str, ParsedResume],
     resume_skills: list,
     jd_skills: list,
 ) -> dict:
@@ -96,10 +80,11 @@ def analyze_projects_core(
     Core project relevance analyzer (logic-only, no FastAPI)
     """
 
+    text = ensure_parsed(resume_text).lower
     score = 0
 
     for skill in jd_skills:
-        if skill in resume_text.lower():
+        if skill in text:
             score += 1
 
     max_score = max(len(jd_skills), 1)
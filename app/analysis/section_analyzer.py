@@ -1,27 +1,17 @@
 # app/analysis/section_analyzer.py
 
-import re
-from typing import Dict
+from typing import Dict, Union
 
+from app.parsing.parsed_resume import SECTION_HEADINGS, ParsedResume, ensure_parsed
 
-SECTION_PATTERNS = {
-    "summary": r"(summary|profile|about me)(.*?)(experience|projects|skills|education|$)",
-    "experience": r"(experience|work experience)(.*?)(projects|skills|education|$)",
-    "projects": r"(projects|personal projects|academic projects)(.*?)(skills|education|$)",
-    "skills": r"(skills|technical skills)(.*?)(experience|projects|education|$)",
-    "education": r"(education|academic)(.*?)(experience|projects|skills|$)",
-}
 
+def extract_resume_sections(resume_text: Union[str, ParsedResume]) -> Dict[str, str]:
+    parsed = ensure_parsed(resume_text)
 
-def extract_resume_sections(resume_text: str) -> Dict[str, str]:
-    text = resume_text.lower()
-    sections = {}
-
-    for section, pattern in SECTION_PATTERNS.items():
-        match = re.search(pattern, text, re.DOTALL)
-        sections[section] = match.group(2).strip() if match else ""
-
-    return sections
+    return {
+        section: parsed.section(section).strip()
+        for section in SECTION_HEADINGS
+    }
 
 #----------------Section presence & strength analysis-----------
 def analyze_section_strength(
@@ -42,7 +32,7 @@ def analyze_section_strength(
     return "strong"
 #---------------- Main feedback generation function -----------
 def generate_section_feedback(
-    resume_text: str,
+    resume_text: Union[str, ParsedResume],
     jd_skills: list,
 ) -> Dict[str, dict]:
 
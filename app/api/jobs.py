@@ -0,0 +1,113 @@
+from fastapi import APIRouter, UploadFile, File, Form
+from typing import Optional, List, Dict
+
+from app.api.v1 import _safe_parse
+from app.jobs.runner import get_job_runner
+from app.jobs.store import job_store
+from app.parsing.jd_parser import parse_jd
+from app.parsing.resume_parser import parse_resume
+from app.service.analyze_service import resolve_v1_options
+
+
+# -----------------------------
+# Router
+# -----------------------------
+router = APIRouter(prefix="/api/v1/jobs", tags=["Background Jobs"])
+
+
+def _submit(kind: str, payload: Dict, validation_warnings: Optional[List[str]] = None) -> Dict:
+    job = job_store.submit(kind, payload)
+    get_job_runner().notify(kind)
+    return {**job, "warnings": validation_warnings or []}
+
+
+# ======================================================
+# SUBMIT
+# ======================================================
+@router.post("/rewrite", status_code=202)
+async def submit_rewrite(
+    resume_file: Optional[UploadFile] = File(None),
+    jd_file: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None),
+):
+    """
+    Queue an AI rewrite of the resume for the JD.
+    """
+    validation_warnings: List[str] = []
+    resume_text = await _safe_parse(resume_file, resume_text, parse_resume, "Resume", validation_warnings)
+    jd_text = await _safe_parse(jd_file, jd_text, parse_jd, "Job Description", validation_warnings)
+
+    return _submit("rewrite", {"resume_text": resume_text, "jd_text": jd_text}, validation_warnings)
+
+
+@router.post("/analyze", status_code=202)
+async def submit_analysis(
+    resume_file: Optional[UploadFile] = File(None),
+    jd_file: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+):
+    """
+    Queue a /api/v1/analyze run. The job has no latency budget, only
+    JOB_TIMEOUT_SECONDS.
+    """
+    validation_warnings: List[str] = []
+    mode, fields = resolve_v1_options(mode, fields)
+
+    resume_text = await _safe_parse(resume_file, resume_text, parse_resume, "Resume", validation_warnings)
+    jd_text = await _safe_parse(jd_file, jd_text, parse_jd, "Job Description", validation_warnings)
+
+    return _submit("analyze", {
+        "resume_text": resume_text,
+        "jd_text": jd_text,
+        "mode": mode,
+        "fields": list(fields),
+    }, validation_warnings)
+
+
+@router.post("/rank", status_code=202)
+async def submit_ranking(
+    resumes: List[str] = Form(...),
+    jd_text: str = Form(...),
+):
+    """
+    Queue a multi-resume ranking (runs in the job process pool).
+    """
+    candidates = [
+        {"name": f"resume_{index + 1}", "text": text}
+        for index, text in enumerate(resumes)
+    ]
+    return _submit("rank", {"resumes": candidates, "jd_text": jd_text})
+
+
+# ======================================================
+# STATUS / RESULT / CANCEL
+# ======================================================
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    return job_store.get(job_id)
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str):
+    """
+    Result of a succeeded job; 409 while it is queued or running, or
+    when it failed or was cancelled (see its status).
+    """
+    return {"job_id": job_id, "result": job_store.result(job_id)}
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """
+    Queued jobs are cancelled at once; running ones as soon as their
+    worker sees the request. Async so the local runner's task is
+    cancelled on the event loop, not from a threadpool thread.
+    """
+    job = job_store.cancel(job_id)
+    if get_job_runner().cancel_local(job_id):
+        job = {**job, "cancel_requested": True}
+    return job
@@ -1,8 +1,10 @@
 import warnings
 from app.utils.text_validator import validate_min_words
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Header, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict
-import os, uuid, datetime
+import os, uuid, datetime, json, logging
 
 
 # -----------------------------
@@ -10,32 +12,29 @@ import os, uuid, datetime
 # -----------------------------
 from app.parsing.resume_parser import parse_resume
 from app.parsing.jd_parser import parse_jd
-from app.skills.skill_extractor import extract_skills
-from app.matching.semantic_matcher import semantic_match
-
-
-from app.matching.jd_skill_classifier import classify_jd_skills
-from app.analysis.experience_analyzer import calculate_experience_score
-from app.analysis.project_analyzer import analyze_projects_core
-from app.analysis.ats_checker import calculate_ats_format_score
-
-
-from app.role_intelligence.role_detector import calculate_role_relevance_score, detect_role
-from app.analysis.final_scorer import calculate_final_ats_score
-from app.analysis.fraud_detector import detect_resume_fraud
-from app.ai_engine.section_feedback_ai import generate_section_feedback_ai
-from app.ai_engine.skill_fallback import classify_unknown_skills
-from app.ai_engine.resume_rewrite_ai import rewrite_resume_for_jd
+from app.parsing.document_loader import load_upload
 from app.recruiter.ranking_engine import rank_resumes_against_jd
+from app.service.analyze_service import analyze_v1, resolve_v1_options, stream_v1, v1_cache_name
+from app.service.budget import RequestBudget, request_budget_seconds
+from app.service.readiness import mark_analysis_done
+from app.service.result_cache import (
+    bypass_requested,
+    get_cached_result,
+    invalidate_results,
+    record_bypass,
+    result_cache_key,
+    store_result,
+)
+from app.utils.profiling import profiling_requested, request_profiling
 import warnings
 # -----------------------------
 # Router
 # -----------------------------
 router = APIRouter(prefix="/api/v1", tags=["Resume Intelligence"])
 
+logger = logging.getLogger(__name__)
+
 
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 # -----------------------------
@@ -70,7 +69,7 @@ def validate_text_soft(text: str, label: str, validation_warnings: List[str]):
 
 
        
-def _safe_parse(
+async def _safe_parse(
     file: Optional[UploadFile],
     text: Optional[str],
     parser_fn,
@@ -95,18 +94,33 @@ def _safe_parse(
         raise HTTPException(status_code=400, detail="Unsupported file format")
 
 
-    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{file.filename}")
-    with open(path, "wb") as f:
-        f.write(file.file.read())
-
-
-    parsed = parser_fn(path)
+    parsed = await load_upload(file, parser_fn)
     validate_text_soft(parsed, label, validation_warnings)
 
 
     return parsed
 
 
+def _analysis_response(resume_text: str, analysis: Dict, validation_warnings: List[str]) -> Dict:
+    """
+    Record the resume version and wrap an analysis into the
+    /analyze response.
+    """
+    resume_id = str(uuid.uuid4())
+    RESUME_VERSIONS.setdefault(resume_id, []).append({
+        "timestamp": datetime.datetime.utcnow().isoformat(),
+        "content": resume_text
+    })
+
+    mark_analysis_done()
+
+    return {
+        "resume_id": resume_id,
+        **analysis,
+        "warnings": validation_warnings,
+    }
+
+
 # ======================================================
 # 1️⃣ SINGLE RESUME + SINGLE JD ANALYSIS (MAIN UI)
 # ======================================================
@@ -116,114 +130,155 @@ async def analyze_resume(
     jd_file: Optional[UploadFile] = File(None),
     resume_text: Optional[str] = Form(None),
     jd_text: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+    budget_ms: Optional[int] = Form(None),
+    profile: Optional[bool] = Form(None),
+    refresh: Optional[bool] = Form(None),
+    x_profile: Optional[str] = Header(None),
+    cache_control: Optional[str] = Header(None),
+    response: Response = None,
 ):
+    # The deadline covers parsing too
+    budget = RequestBudget(request_budget_seconds(budget_ms))
     validation_warnings: List[str] = []
 
-
-    resume_text = _safe_parse(resume_file, resume_text, parse_resume, "Resume", validation_warnings)
-    jd_text = _safe_parse(jd_file, jd_text, parse_jd, "Job Description", validation_warnings)
+    # fast | standard | deep, and an optional comma-separated field mask
+    mode, fields = resolve_v1_options(mode, fields)
 
 
-    # ---------- Skills ----------
-    resume_skills = extract_skills(resume_text)
-    jd_skills = extract_skills(jd_text)
+    resume_text = await _safe_parse(resume_file, resume_text, parse_resume, "Resume", validation_warnings)
+    jd_text = await _safe_parse(jd_file, jd_text, parse_jd, "Job Description", validation_warnings)
 
 
-    # AI fallback for unknown skills
-    unknown = list(set(resume_skills) - set(jd_skills))
-    if unknown:
-        try:
-            resume_skills += classify_unknown_skills(unknown)
-        except:
-            pass
+    # ---------- Result cache ----------
+    # A profiled run must actually execute the pipeline
+    cache_key = result_cache_key(v1_cache_name(mode, fields), resume_text, jd_text)
+    bypass = bypass_requested(cache_control, refresh) or profiling_requested(x_profile, profile)
+    if bypass:
+        record_bypass("v1")
 
+    analysis = None if bypass else get_cached_result(cache_key)
+    cache_status = "HIT" if analysis is not None else ("BYPASS" if bypass else "MISS")
 
-    resume_skills = list(set(resume_skills))
+    profiler = None
+    if analysis is None:
+        async with request_profiling(x_profile, profile) as profiler:
+            analysis = await analyze_v1(
+                resume_text, jd_text,
+                profiler=profiler, mode=mode, fields=fields, budget=budget,
+            )
+        store_result("v1", cache_key, analysis)
 
+    if isinstance(response, Response):
+        response.headers["X-Cache"] = cache_status
 
-    matched, missing = semantic_match(resume_skills, jd_skills)
-    jd_classification = classify_jd_skills(jd_text, jd_skills)
+    response = _analysis_response(resume_text, analysis, validation_warnings)
+    if profiler is not None:
+        response["profile"] = profiler.report()
 
+    return response
 
-    resume_match_score = int((len(matched) / max(len(jd_skills), 1)) * 100)
 
+# ======================================================
+# STREAMING ANALYSIS (SSE / NDJSON)
+# ======================================================
+NDJSON = "application/x-ndjson"
 
-    # ---------- Experience ----------
-    experience = calculate_experience_score(resume_text, jd_text)
-    experience_score = experience.get("experience_score", 0)
 
+def _stream_event(event: str, data, ndjson: bool) -> str:
+    payload = jsonable_encoder(data)
+    if ndjson:
+        return json.dumps({"event": event, "data": payload}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
 
-    # ---------- Projects ----------
-    projects = analyze_projects_core(
-    resume_text=resume_text,
-    resume_skills=resume_skills,
-    jd_skills=jd_skills
-)
 
+@router.post("/analyze/stream")
+async def analyze_resume_stream(
+    resume_file: Optional[UploadFile] = File(None),
+    jd_file: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None),
+    mode: Optional[str] = Form(None),
+    fields: Optional[str] = Form(None),
+    budget_ms: Optional[int] = Form(None),
+    refresh: Optional[bool] = Form(None),
+    cache_control: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None),
+):
+    """
+    /analyze, streamed as each stage finishes: one "field" event per
+    response field ({"field", "value"}), then a "result" event with the
+    same payload /analyze returns. A failure after the stream started
+    ends it with an "error" event.
+
+    Server-sent events by default; NDJSON ({"event", "data"} per line)
+    with "Accept: application/x-ndjson".
+    """
+    budget = RequestBudget(request_budget_seconds(budget_ms))
+    validation_warnings: List[str] = []
 
-    project_score = projects.get("project_score", 0)
+    mode, fields = resolve_v1_options(mode, fields)
 
+    # Input errors are still plain HTTP errors, raised before streaming
+    resume_text = await _safe_parse(resume_file, resume_text, parse_resume, "Resume", validation_warnings)
+    jd_text = await _safe_parse(jd_file, jd_text, parse_jd, "Job Description", validation_warnings)
 
-    # ---------------- ATS + Role ----------------
-    ats_format_result = calculate_ats_format_score(resume_text)
-    detected_role = detect_role(resume_text)  # STRING
+    cache_key = result_cache_key(v1_cache_name(mode, fields), resume_text, jd_text)
+    bypass = bypass_requested(cache_control, refresh)
+    if bypass:
+        record_bypass("v1")
 
-    role_result = calculate_role_relevance_score(
-        resume_skills=resume_skills,
-        detected_role=detected_role
-    )
-    role_score = role_result["role_score"]
+    cached = None if bypass else get_cached_result(cache_key)
+    cache_status = "HIT" if cached is not None else ("BYPASS" if bypass else "MISS")
+    ndjson = isinstance(accept, str) and NDJSON in accept
 
-    # ---------------- Fraud ----------------
-    fraud_report = detect_resume_fraud(
-        resume_text,
-        experience.get("resume_years", 0)
-    )
+    async def events():
+        if cached is not None:
+            for field in fields:
+                yield _stream_event("field", {"field": field, "value": cached[field]}, ndjson)
+            yield _stream_event(
+                "result", _analysis_response(resume_text, cached, validation_warnings), ndjson,
+            )
+            return
 
-    # ---------------- Final ATS ----------------
-    final_ats = calculate_final_ats_score(
-        skill_score=resume_match_score,
-        experience_score=experience_score,
-        project_score=project_score,
-        ats_format_score=ats_format_result["ats_format_score"], 
-        role_score=role_score,
+        try:
+            async for event, data in stream_v1(
+                resume_text, jd_text, mode=mode, fields=fields, budget=budget,
+            ):
+                if event == "result":
+                    store_result("v1", cache_key, data)
+                    data = _analysis_response(resume_text, data, validation_warnings)
+                yield _stream_event(event, data, ndjson)
+        except Exception as e:
+            logger.exception("Streaming analysis failed")
+            yield _stream_event("error", {"detail": str(e) or type(e).__name__}, ndjson)
+
+    return StreamingResponse(
+        events(),
+        media_type=NDJSON if ndjson else "text/event-stream",
+        headers={
+            "X-Cache": cache_status,
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
     )
 
-    # ---------- AI ----------
-    ai_feedback = generate_section_feedback_ai(resume_text, jd_text)
-    ai_improved = rewrite_resume_for_jd(resume_text, jd_text)
-
-
-    # ---------- Resume Versions ----------
-    resume_id = str(uuid.uuid4())
-    RESUME_VERSIONS.setdefault(resume_id, []).append({
-        "timestamp": datetime.datetime.utcnow().isoformat(),
-        "content": resume_text
-    })
-
 
-    return {
-        "resume_id": resume_id,
-        "ats_score": final_ats["ats_score"],
-        "resume_match_score": resume_match_score,
-        "detected_role": detected_role,
-        "skills": {
-            "matched": matched,
-            "missing": missing,
-            "must_have": jd_classification["must_have"],
-            "good_to_have": jd_classification["good_to_have"],
-        },
-        "experience": experience,
-        "projects": projects,
-        "fraud_report": fraud_report,
-        "skill_coverage": {
-            "matched_percentage": resume_match_score,
-            "missing_percentage": 100 - resume_match_score,
-        },
-        "ai_insights": ai_feedback,
-        "ai_resume_improvements": ai_improved,
-        "warnings": validation_warnings,
-    }
+# ======================================================
+# RESULT CACHE INVALIDATION
+# ======================================================
+@router.post("/cache/results/invalidate")
+async def invalidate_cached_results(
+    resume_text: Optional[str] = Form(None),
+    jd_text: Optional[str] = Form(None),
+):
+    """
+    Drop cached analyses for a resume, a JD, a pair, or everything
+    when neither is given.
+    """
+    return {"invalidated": invalidate_results(resume_text=resume_text, jd_text=jd_text)}
 
 
 # ======================================================
@@ -260,13 +315,26 @@ async def analyze_multi_jd(
 @router.post("/rank-resumes")
 async def rank_resumes(
     resumes: List[str] = Form(...),
-    jd_text: str = Form(...)
+    jd_text: str = Form(...),
+    profile: Optional[bool] = Form(None),
+    x_profile: Optional[str] = Header(None),
 ):
     validation_warnings = []
     validate_text_soft(jd_text, "Job Description", validation_warnings)
 
 
-    return rank_resumes_against_jd(resumes, jd_text)
+    candidates = [
+        {"name": f"resume_{index + 1}", "text": text}
+        for index, text in enumerate(resumes)
+    ]
+
+    async with request_profiling(x_profile, profile) as profiler:
+        result = rank_resumes_against_jd(candidates, jd_text, observer=profiler)
+
+    if profiler is not None:
+        result["profile"] = profiler.report()
+
+    return result
 
 
 # ======================================================
@@ -0,0 +1,208 @@
+"""
+config.py
+
+Runtime settings for the backend.
+Every value can be overridden with an environment variable of the same name.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# -----------------------------
+# Embeddings
+# -----------------------------
+EMBEDDING_MODEL_NAME = _env_str("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+
+# Empty string disables the on-disk tier
+EMBEDDING_CACHE_DIR = _env_str("EMBEDDING_CACHE_DIR", "data/cache/embeddings")
+EMBEDDING_CACHE_MEMORY_ITEMS = _env_int("EMBEDDING_CACHE_MEMORY_ITEMS", 4096)
+
+# Precomputed taxonomy matrix (see app/matching/taxonomy_embeddings.py)
+TAXONOMY_EMBEDDINGS_DIR = _env_str("TAXONOMY_EMBEDDINGS_DIR", "data/taxonomy")
+# Rebuild the matrix at startup when it is missing or stale
+TAXONOMY_EMBEDDINGS_AUTO_BUILD = _env_bool("TAXONOMY_EMBEDDINGS_AUTO_BUILD", False)
+
+# -----------------------------
+# Startup
+# -----------------------------
+# Load the embedding model in the background right after startup
+WARMUP_ON_STARTUP = _env_bool("WARMUP_ON_STARTUP", True)
+
+# Micro-batching of concurrent embedding requests
+EMBEDDING_BATCHING = _env_bool("EMBEDDING_BATCHING", True)
+EMBEDDING_BATCH_MAX_SIZE = _env_int("EMBEDDING_BATCH_MAX_SIZE", 64)
+EMBEDDING_BATCH_MAX_WAIT_MS = _env_float("EMBEDDING_BATCH_MAX_WAIT_MS", 5.0)
+
+# -----------------------------
+# Document parsing
+# -----------------------------
+# Process pool that runs the PDF/DOCX parsers off the event loop
+PARSE_WORKERS = _env_int("PARSE_WORKERS", 2)
+PARSE_TIMEOUT_SECONDS = _env_float("PARSE_TIMEOUT_SECONDS", 20.0)
+# Pages beyond this are ignored (0 = no cap)
+PARSE_MAX_PAGES = _env_int("PARSE_MAX_PAGES", 30)
+
+# Parse cache (keyed by upload bytes + parser version)
+PARSE_CACHE_MEMORY_ITEMS = _env_int("PARSE_CACHE_MEMORY_ITEMS", 256)
+# Empty string disables the sqlite tier
+PARSE_CACHE_PATH = _env_str("PARSE_CACHE_PATH", "data/cache/parsed_documents.sqlite3")
+PARSE_CACHE_MAX_BYTES = _env_int("PARSE_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+# "auto" = pdfium with pdfplumber fallback, or force "pdfium" / "pdfplumber"
+PDF_ENGINE = _env_str("PDF_ENGINE", "auto")
+
+# -----------------------------
+# Uploads
+# -----------------------------
+# Uploads larger than this are rejected with 413
+MAX_UPLOAD_BYTES = _env_int("MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+UPLOAD_READ_CHUNK_BYTES = _env_int("UPLOAD_READ_CHUNK_BYTES", 1024 * 1024)
+# Uploads are parsed in memory; keeping the originals on disk is opt-in
+PERSIST_UPLOADS = _env_bool("PERSIST_UPLOADS", False)
+UPLOAD_DIR = _env_str("UPLOAD_DIR", "uploads")
+UPLOAD_RETENTION_HOURS = _env_float("UPLOAD_RETENTION_HOURS", 24.0)
+
+# -----------------------------
+# Job descriptions
+# -----------------------------
+# Compiled JDs kept in memory, keyed by content hash
+JD_CACHE_ITEMS = _env_int("JD_CACHE_ITEMS", 128)
+
+# -----------------------------
+# Skill classification
+# -----------------------------
+# Every skill string the LLM has classified, kept for the lifetime of
+# the file (empty string = in-memory only, lost on restart)
+SKILL_STORE_PATH = _env_str("SKILL_STORE_PATH", "data/skill_classifications.sqlite3")
+# Unknown skills from concurrent requests are collected for this long
+# and classified with one prompt
+SKILL_CLASSIFY_WINDOW_MS = _env_float("SKILL_CLASSIFY_WINDOW_MS", 25.0)
+SKILL_CLASSIFY_MAX_BATCH = _env_int("SKILL_CLASSIFY_MAX_BATCH", 50)
+
+# -----------------------------
+# Analysis pipeline
+# -----------------------------
+# Threads that run CPU stages of the analysis pipeline
+PIPELINE_CPU_WORKERS = _env_int("PIPELINE_CPU_WORKERS", 4)
+# Per-request latency budget (0 = no deadline). Optional stages (LLM
+# calls, semantic matching) are skipped or cut off to stay within it
+# and served by their rule-based fallback.
+ANALYSIS_BUDGET_SECONDS = _env_float("ANALYSIS_BUDGET_SECONDS", 20.0)
+# Below this much remaining budget an optional stage is not started
+AI_MIN_BUDGET_SECONDS = _env_float("AI_MIN_BUDGET_SECONDS", 2.0)
+SEMANTIC_MIN_BUDGET_SECONDS = _env_float("SEMANTIC_MIN_BUDGET_SECONDS", 0.25)
+# Threads for blocking optional calls that run with a timeout
+AI_CALL_WORKERS = _env_int("AI_CALL_WORKERS", 8)
+# /api/v1/analyze depth when the request does not pick one:
+# "fast", "standard" or "deep"
+ANALYSIS_DEFAULT_MODE = _env_str("ANALYSIS_DEFAULT_MODE", "deep")
+
+# -----------------------------
+# Analysis result cache
+# -----------------------------
+# "memory", "sqlite" (memory tier in front of a sqlite file) or "off"
+RESULT_CACHE_BACKEND = _env_str("RESULT_CACHE_BACKEND", "memory")
+RESULT_CACHE_MEMORY_ITEMS = _env_int("RESULT_CACHE_MEMORY_ITEMS", 512)
+RESULT_CACHE_PATH = _env_str("RESULT_CACHE_PATH", "data/cache/analysis_results.sqlite3")
+RESULT_CACHE_MAX_BYTES = _env_int("RESULT_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+RESULT_CACHE_TTL_SECONDS = _env_float("RESULT_CACHE_TTL_SECONDS", 24 * 3600.0)
+
+# -----------------------------
+# LLM gateway
+# -----------------------------
+# "gemini", or "stub" for a local stand-in (offline load / latency tests)
+LLM_PROVIDER = _env_str("LLM_PROVIDER", "gemini")
+GEMINI_API_KEY = _env_str("GEMINI_API_KEY", "")
+LLM_MODEL = _env_str("LLM_MODEL", "models/gemini-2.5-flash")
+# Concurrent in-flight LLM calls across the process
+LLM_MAX_CONCURRENCY = _env_int("LLM_MAX_CONCURRENCY", 8)
+# Token bucket on the request rate (0 = unlimited)
+LLM_REQUESTS_PER_MINUTE = _env_float("LLM_REQUESTS_PER_MINUTE", 120.0)
+LLM_BURST = _env_int("LLM_BURST", 10)
+# Per attempt; transient errors are retried with exponential backoff
+LLM_TIMEOUT_SECONDS = _env_float("LLM_TIMEOUT_SECONDS", 30.0)
+LLM_MAX_RETRIES = _env_int("LLM_MAX_RETRIES", 2)
+LLM_RETRY_BASE_SECONDS = _env_float("LLM_RETRY_BASE_SECONDS", 0.5)
+# USD per million tokens, used to report spend saved by the cache
+LLM_PRICE_INPUT_PER_MTOK = _env_float("LLM_PRICE_INPUT_PER_MTOK", 0.30)
+LLM_PRICE_OUTPUT_PER_MTOK = _env_float("LLM_PRICE_OUTPUT_PER_MTOK", 2.50)
+
+# Cache of parsed LLM responses, keyed by model + template + prompt hash
+LLM_CACHE_ENABLED = _env_bool("LLM_CACHE_ENABLED", True)
+LLM_CACHE_MEMORY_ITEMS = _env_int("LLM_CACHE_MEMORY_ITEMS", 256)
+# Empty string disables the sqlite tier
+LLM_CACHE_PATH = _env_str("LLM_CACHE_PATH", "data/cache/llm_responses.sqlite3")
+LLM_CACHE_MAX_BYTES = _env_int("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+LLM_CACHE_TTL_SECONDS = _env_float("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600.0)
+
+# Stand-in provider: log-normal latency around the median (sigma 0 =
+# constant), injected 503 errors and truncated JSON answers.
+# Seed 0 = different every run.
+LLM_STUB_LATENCY_MS = _env_float("LLM_STUB_LATENCY_MS", 800.0)
+LLM_STUB_LATENCY_SIGMA = _env_float("LLM_STUB_LATENCY_SIGMA", 0.5)
+LLM_STUB_ERROR_RATE = _env_float("LLM_STUB_ERROR_RATE", 0.0)
+LLM_STUB_MALFORMED_RATE = _env_float("LLM_STUB_MALFORMED_RATE", 0.0)
+LLM_STUB_SEED = _env_int("LLM_STUB_SEED", 0)
+
+# -----------------------------
+# Prompt context compaction
+# -----------------------------
+# Drop duplicated/boilerplate resume and JD lines before they reach the
+# LLM and, when a prompt is still too long, keep only the parts most
+# relevant to the JD (estimated at ~4 characters per token)
+CONTEXT_COMPACTION_ENABLED = _env_bool("CONTEXT_COMPACTION_ENABLED", True)
+FEEDBACK_PROMPT_MAX_TOKENS = _env_int("FEEDBACK_PROMPT_MAX_TOKENS", 3000)
+REWRITE_PROMPT_MAX_TOKENS = _env_int("REWRITE_PROMPT_MAX_TOKENS", 4000)
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+# Run job workers inside the web process. Set to false on web replicas
+# when a dedicated worker (python -m app.jobs.runner) serves the queue.
+JOBS_ENABLED = _env_bool("JOBS_ENABLED", True)
+JOB_STORE_PATH = _env_str("JOB_STORE_PATH", "data/jobs.sqlite3")
+# Jobs running at once per worker process, by executor
+JOB_ASYNC_WORKERS = _env_int("JOB_ASYNC_WORKERS", 4)
+JOB_PROCESS_WORKERS = _env_int("JOB_PROCESS_WORKERS", 2)
+# Idle workers re-check the queue this often (submissions from the same
+# process wake them immediately)
+JOB_POLL_SECONDS = _env_float("JOB_POLL_SECONDS", 1.0)
+# A running job whose worker has not renewed its lease for this long
+# (crash, kill, restart) is queued again, up to JOB_MAX_ATTEMPTS runs
+JOB_LEASE_SECONDS = _env_float("JOB_LEASE_SECONDS", 30.0)
+JOB_MAX_ATTEMPTS = _env_int("JOB_MAX_ATTEMPTS", 3)
+JOB_TIMEOUT_SECONDS = _env_float("JOB_TIMEOUT_SECONDS", 600.0)
+# Finished jobs (and their results) are deleted after this long
+JOB_RETENTION_HOURS = _env_float("JOB_RETENTION_HOURS", 24.0)
+
+# -----------------------------
+# Diagnostics
+# -----------------------------
+# Allow clients to request a per-request profile (X-Profile header or
+# `profile` form field). Keep disabled on public deployments.
+ENABLE_REQUEST_PROFILING = _env_bool("ENABLE_REQUEST_PROFILING", False)
+PROFILE_TOP_FUNCTIONS = _env_int("PROFILE_TOP_FUNCTIONS", 15)
@@ -0,0 +1,327 @@
+"""
+runner.py
+
+Worker pool that executes queued jobs.
+
+- JOB_ASYNC_WORKERS coroutines serve async kinds (LLM rewrites,
+  analyses) on the event loop
+- JOB_PROCESS_WORKERS coroutines serve process kinds (batch ranking),
+  each feeding one job at a time into a spawn-context process pool of
+  the same size
+
+A maintenance loop renews the leases of running jobs, applies
+cancellations flagged by any process, re-queues jobs of workers that
+died and purges old finished jobs.
+
+By default the web app runs a JobRunner in its lifespan. To size job
+capacity independently of the web tier, set JOBS_ENABLED=false on the
+web processes and run dedicated workers instead:
+
+    python -m app.jobs.runner
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+from app.config import (
+    JOB_ASYNC_WORKERS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_SECONDS,
+    JOB_PROCESS_WORKERS,
+    JOB_RETENTION_HOURS,
+    JOB_TIMEOUT_SECONDS,
+)
+from app.jobs.store import STATUSES, JobStore, job_store
+from app.jobs.tasks import ASYNC, JOB_KINDS, PROCESS, kinds_for
+from app.utils.metrics import REGISTRY, counter, histogram
+
+logger = logging.getLogger(__name__)
+
+JOBS_FINISHED = counter(
+    "jobs_finished_total",
+    "Background jobs finished, by outcome",
+    ["kind", "status"],
+)
+JOB_RUN_SECONDS = histogram(
+    "job_run_seconds",
+    "Execution time of a background job",
+    ["kind"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+JOB_QUEUE_SECONDS = histogram(
+    "job_queue_seconds",
+    "Time a background job waited in the queue",
+    ["kind"],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+
+class JobRunner:
+    """
+    Async and process workers plus the maintenance loop, all on the
+    event loop that calls start().
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        async_workers: int = 4,
+        process_workers: int = 2,
+        poll_seconds: float = 1.0,
+        lease_seconds: float = 30.0,
+        max_attempts: int = 3,
+        timeout: float = 600.0,
+        retention_seconds: float = 24 * 3600.0,
+    ) -> None:
+        self.store = store
+        self.async_workers = max(0, async_workers)
+        self.process_workers = max(0, process_workers)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.retention_seconds = retention_seconds
+
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Dict[str, asyncio.Event] = {}
+        # job id -> task executing it in this process
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelling: set = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self) -> None:
+        self._wake = {ASYNC: asyncio.Event(), PROCESS: asyncio.Event()}
+
+        for _ in range(self.async_workers):
+            self._tasks.append(asyncio.create_task(self._worker(ASYNC)))
+        for _ in range(self.process_workers):
+            self._tasks.append(asyncio.create_task(self._worker(PROCESS)))
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+        logger.info(
+            "Job runner started (%d async, %d process workers)",
+            self.async_workers, self.process_workers,
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop the workers. Jobs they were running go back to the queue
+        and resume on the next start (here or in another process).
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def notify(self, kind: str) -> None:
+        """
+        Wake a worker for a job just submitted in this process.
+        """
+        executor = JOB_KINDS[kind][0]
+        if executor in self._wake:
+            self._wake[executor].set()
+
+    def cancel_local(self, job_id: str) -> bool:
+        """
+        Interrupt a job running in this process. A process job keeps
+        running in its pool worker, but its result is discarded.
+        Must be called on the runner's event loop.
+        """
+        task = self._running.get(job_id)
+        if task is None or task.done():
+            return False
+        self._cancelling.add(job_id)
+        task.cancel()
+        return True
+
+    # -----------------------------
+    # Workers
+    # -----------------------------
+    async def _worker(self, executor: str) -> None:
+        kinds = kinds_for(executor)
+        wake = self._wake[executor]
+
+        while True:
+            wake.clear()
+            try:
+                job = self.store.claim(kinds, self.lease_seconds)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(wake.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Another idle worker may take the next queued job right away
+            wake.set()
+            await self._run(*job)
+
+    async def _run(self, job_id: str, kind: str, payload, created_at: float, attempt: int) -> None:
+        JOB_QUEUE_SECONDS.observe(max(time.time() - created_at, 0.0), kind)
+
+        execution = asyncio.create_task(self._execute(kind, payload))
+        self._running[job_id] = execution
+        started = time.perf_counter()
+        status = "failed"
+
+        try:
+            result = await asyncio.wait_for(execution, self.timeout)
+        except asyncio.CancelledError:
+            if job_id not in self._cancelling or asyncio.current_task().cancelling():
+                # The runner is stopping: hand the job back to the queue
+                self.store.release(job_id, attempt)
+                raise
+            self.store.mark_cancelled(job_id, attempt)
+            status = "cancelled"
+        except asyncio.TimeoutError:
+            self.store.fail(job_id, attempt, f"timed out after {self.timeout:g}s")
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            self.store.fail(job_id, attempt, f"{type(e).__name__}: {e}")
+        else:
+            try:
+                self.store.succeed(job_id, attempt, result)
+                status = "succeeded"
+            except Exception as e:
+                logger.exception("Storing the result of job %s failed", job_id)
+                self.store.fail(job_id, attempt, f"result not storable: {e}")
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelling.discard(job_id)
+
+        JOB_RUN_SECONDS.observe(time.perf_counter() - started, kind)
+        JOBS_FINISHED.inc(kind, status)
+
+    async def _execute(self, kind: str, payload):
+        executor, fn = JOB_KINDS[kind]
+        if executor == ASYNC:
+            return await fn(payload)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        try:
+            return await loop.run_in_executor(pool, fn, payload)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            raise
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max(1, self.process_workers),
+                    # spawn: never fork a process that may hold torch threads
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            if self._pool is broken:
+                self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    # -----------------------------
+    # Maintenance
+    # -----------------------------
+    async def _maintain(self) -> None:
+        interval = max(min(self.poll_seconds, self.lease_seconds / 3), 0.05)
+        last_purge = 0.0
+
+        while True:
+            try:
+                for job_id in self.store.renew(list(self._running), self.lease_seconds):
+                    self.cancel_local(job_id)
+
+                requeued, failed = self.store.recover_expired(self.max_attempts)
+                if requeued or failed:
+                    logger.warning(
+                        "Recovered jobs of lost workers: %d re-queued, %d failed",
+                        requeued, failed,
+                    )
+                    for wake in self._wake.values():
+                        wake.set()
+
+                if time.monotonic() - last_purge > 3600:
+                    self.store.purge(self.retention_seconds)
+                    last_purge = time.monotonic()
+            except Exception:
+                logger.exception("Job maintenance failed")
+
+            await asyncio.sleep(interval)
+
+
+_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    global _runner
+
+    if _runner is None:
+        _runner = JobRunner(
+            job_store,
+            async_workers=JOB_ASYNC_WORKERS,
+            process_workers=JOB_PROCESS_WORKERS,
+            poll_seconds=JOB_POLL_SECONDS,
+            lease_seconds=JOB_LEASE_SECONDS,
+            max_attempts=JOB_MAX_ATTEMPTS,
+            timeout=JOB_TIMEOUT_SECONDS,
+            retention_seconds=JOB_RETENTION_HOURS * 3600,
+        )
+
+    return _runner
+
+
+def _collect_queue_depth():
+    counts = job_store.counts()
+    yield (
+        "jobs",
+        "gauge",
+        "Background jobs in the store, by status",
+        [({"status": status}, counts[status]) for status in STATUSES],
+    )
+
+
+REGISTRY.register_collector(_collect_queue_depth)
+
+
+async def _serve() -> None:
+    from app.ai_engine.llm_gateway import close_llm_gateway
+
+    runner = get_job_runner()
+    runner.start()
+
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    await stopped.wait()
+    await runner.stop()
+    await close_llm_gateway()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_serve())
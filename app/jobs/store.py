@@ -0,0 +1,309 @@
+"""
+store.py
+
+Persistent job queue in a local sqlite file.
+
+A job moves through:
+
+    queued -> running -> succeeded | failed | cancelled
+
+Workers claim the oldest queued job of the kinds they serve in one
+atomic UPDATE, so several worker processes can share the file. A
+running job holds a lease its worker renews; when the lease runs out
+(the worker crashed or the server restarted) the job is queued again,
+up to JOB_MAX_ATTEMPTS runs, then failed. Each run is identified by its
+attempt number, so a worker that lost its lease cannot overwrite the
+outcome of the run that replaced it.
+
+Payloads and results are stored as JSON.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import JOB_STORE_PATH
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+STATUSES = (QUEUED, RUNNING) + FINISHED
+
+
+class JobNotFoundError(LookupError):
+    """
+    No job with this id (never submitted, or purged after retention).
+    """
+
+
+class JobNotFinishedError(RuntimeError):
+    """
+    The job has no result (yet): it is queued, running, failed or
+    cancelled.
+    """
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class JobStore:
+    """
+    sqlite-backed job table. Every method is one short transaction.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> None:
+        """
+        Connect and create the table on first use (not at import). Call
+        with the lock held.
+        """
+        if self._conn is not None:
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " kind TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " cancel_requested INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " lease_until REAL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs(status, kind, created_at)"
+        )
+        conn.commit()
+        self._conn = conn
+
+    def _execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        with self._lock:
+            self._open()
+            cursor = self._conn.execute(sql, tuple(params))
+            self._conn.commit()
+            return cursor
+
+    # -----------------------------
+    # Clients
+    # -----------------------------
+    def submit(self, kind: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(payload), time.time()),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Dict[str, Any]:
+        """
+        Status of a job, without payload or result.
+        """
+        with self._lock:
+            self._open()
+            row = self._conn.execute(
+                "SELECT id, kind, status, error, attempts, cancel_requested,"
+                " created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+
+        if row is None:
+            raise JobNotFoundError(f"Unknown job: {job_id}")
+
+        (job_id, kind, status, error, attempts, cancel_requested,
+         created_at, started_at, finished_at) = row
+        return {
+            "job_id": job_id,
+            "kind": kind,
+            "status": status,
+            "error": error,
+            "attempts": attempts,
+            "cancel_requested": bool(cancel_requested),
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+        }
+
+    def result(self, job_id: str) -> Any:
+        with self._lock:
+            self._open()
+            row = self._conn.execute(
+                "SELECT status, result FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        if row is None:
+            raise JobNotFoundError(f"Unknown job: {job_id}")
+
+        status, result = row
+        if status != SUCCEEDED:
+            raise JobNotFinishedError(f"Job {job_id} is {status}")
+        return json.loads(result)
+
+    def cancel(self, job_id: str) -> Dict[str, Any]:
+        """
+        Cancel a queued job at once; flag a running one for its worker.
+        Finished jobs are left as they are.
+        """
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, now, job_id, QUEUED),
+        )
+        self._execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+            (job_id, RUNNING),
+        )
+        return self.get(job_id)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            # Metrics scrapes alone should not create the file
+            if self._conn is None and not os.path.exists(self.path):
+                return {status: 0 for status in STATUSES}
+            self._open()
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {status: dict(rows).get(status, 0) for status in STATUSES}
+
+    # -----------------------------
+    # Workers
+    # -----------------------------
+    def claim(self, kinds: Iterable[str], lease_seconds: float) -> Optional[Tuple[str, str, Dict[str, Any], float, int]]:
+        """
+        Take the oldest queued job of one of `kinds`.
+        Returns (job_id, kind, payload, created_at, attempt) or None;
+        the worker passes `attempt` back when it finishes the run.
+        """
+        kinds = list(kinds)
+        if not kinds:
+            return None
+
+        now = time.time()
+        marks = ", ".join("?" for _ in kinds)
+        with self._lock:
+            self._open()
+            row = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, lease_until = ?,"
+                " attempts = attempts + 1"
+                " WHERE id = (SELECT id FROM jobs WHERE status = ?"
+                f" AND kind IN ({marks}) ORDER BY created_at LIMIT 1)"
+                " RETURNING id, kind, payload, created_at, attempts",
+                (RUNNING, now, now + lease_seconds, QUEUED, *kinds),
+            ).fetchone()
+            self._conn.commit()
+
+        if row is None:
+            return None
+
+        job_id, kind, payload, created_at, attempt = row
+        return job_id, kind, json.loads(payload), created_at, attempt
+
+    def _finish(self, job_id: str, attempt: int, status: str, result: Optional[str], error: Optional[str]) -> None:
+        # A job re-queued after its lease expired (and possibly claimed
+        # again) belongs to another run
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,"
+            " lease_until = NULL WHERE id = ? AND status = ? AND attempts = ?",
+            (status, result, error, time.time(), job_id, RUNNING, attempt),
+        )
+
+    def succeed(self, job_id: str, attempt: int, result: Any) -> None:
+        self._finish(job_id, attempt, SUCCEEDED, json.dumps(result, default=_json_default), None)
+
+    def fail(self, job_id: str, attempt: int, error: str) -> None:
+        self._finish(job_id, attempt, FAILED, None, error)
+
+    def mark_cancelled(self, job_id: str, attempt: int) -> None:
+        self._finish(job_id, attempt, CANCELLED, None, None)
+
+    def release(self, job_id: str, attempt: int) -> None:
+        """
+        Put a running job back in the queue (graceful shutdown). The
+        interrupted run does not count as an attempt.
+        """
+        self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, lease_until = NULL,"
+            " attempts = MAX(attempts - 1, 0) WHERE id = ? AND status = ? AND attempts = ?",
+            (QUEUED, job_id, RUNNING, attempt),
+        )
+
+    def renew(self, job_ids: List[str], lease_seconds: float) -> List[str]:
+        """
+        Extend the lease of running jobs. Returns those flagged for
+        cancellation.
+        """
+        if not job_ids:
+            return []
+
+        marks = ", ".join("?" for _ in job_ids)
+        self._execute(
+            f"UPDATE jobs SET lease_until = ? WHERE status = ? AND id IN ({marks})",
+            (time.time() + lease_seconds, RUNNING, *job_ids),
+        )
+        with self._lock:
+            self._open()
+            rows = self._conn.execute(
+                f"SELECT id FROM jobs WHERE cancel_requested = 1 AND id IN ({marks})",
+                job_ids,
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def recover_expired(self, max_attempts: int) -> Tuple[int, int]:
+        """
+        Re-queue running jobs whose lease ran out; fail those that have
+        used all their attempts and cancel those flagged for
+        cancellation. Returns (requeued, failed).
+        """
+        now = time.time()
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL"
+            " WHERE status = ? AND lease_until < ? AND cancel_requested = 1",
+            (CANCELLED, now, RUNNING, now),
+        )
+        failed = self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL"
+            " WHERE status = ? AND lease_until < ? AND attempts >= ?",
+            (FAILED, "worker lost (attempts exhausted)", now, RUNNING, now, max_attempts),
+        ).rowcount
+        requeued = self._execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, lease_until = NULL"
+            " WHERE status = ? AND lease_until < ?",
+            (QUEUED, RUNNING, now),
+        ).rowcount
+        return requeued, failed
+
+    def purge(self, older_than_seconds: float) -> int:
+        return self._execute(
+            f"DELETE FROM jobs WHERE status IN ({', '.join('?' for _ in FINISHED)})"
+            " AND finished_at < ?",
+            (*FINISHED, time.time() - older_than_seconds),
+        ).rowcount
+
+
+job_store = JobStore(JOB_STORE_PATH)
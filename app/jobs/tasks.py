@@ -0,0 +1,54 @@
+"""
+tasks.py
+
+Work that can be submitted as a background job, by kind.
+
+Each kind names its executor:
+
+- async   : coroutine on the worker's event loop (LLM-bound work)
+- process : function in the job process pool (CPU-bound batch work);
+            must be a module-level function taking and returning
+            picklable values
+
+Payloads are the JSON objects stored with the job.
+"""
+
+from typing import Any, Callable, Dict, Tuple
+
+from app.ai_engine.resume_rewrite_ai import rewrite_resume_for_jd
+from app.recruiter.ranking_engine import rank_resumes_against_jd
+from app.service.analyze_service import analyze_v1
+from app.service.budget import RequestBudget
+
+ASYNC = "async"
+PROCESS = "process"
+
+
+async def run_rewrite(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await rewrite_resume_for_jd(payload["resume_text"], payload["jd_text"])
+
+
+async def run_analysis(payload: Dict[str, Any]) -> Dict[str, Any]:
+    # No request deadline: the job timeout bounds the run instead
+    return await analyze_v1(
+        payload["resume_text"],
+        payload["jd_text"],
+        mode=payload["mode"],
+        fields=payload["fields"],
+        budget=RequestBudget(None),
+    )
+
+
+def run_ranking(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return rank_resumes_against_jd(payload["resumes"], payload["jd_text"])
+
+
+JOB_KINDS: Dict[str, Tuple[str, Callable]] = {
+    "rewrite": (ASYNC, run_rewrite),
+    "analyze": (ASYNC, run_analysis),
+    "rank": (PROCESS, run_ranking),
+}
+
+
+def kinds_for(executor: str):
+    return [kind for kind, (runs_on, _) in JOB_KINDS.items() if runs_on == executor]
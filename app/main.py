@@ -1,55 +1,132 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Body,Form
-import os
-import shutil
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager
+import asyncio
+from app.service.readiness import (
+    is_ready,
+    mark_analysis_done,
+    readiness_report,
+    run_warmup,
+)
+from app.config import JOBS_ENABLED, PERSIST_UPLOADS, WARMUP_ON_STARTUP
 from app.parsing.resume_parser import parse_resume
 from app.parsing.jd_parser import parse_jd
+from app.parsing.parse_executor import DocumentParseError, shutdown_parse_executor
+from app.parsing.document_loader import (
+    UploadTooLargeError,
+    cleanup_uploads,
+    load_upload,
+)
 from app.utils.text_validator import validate_min_words
 from app.skills.skill_extractor import extract_skills
-from app.matching.semantic_matcher import semantic_match
-from app.matching.jd_skill_classifier import classify_jd_skills
 from app.matching.skill_matcher import match_skills
-from app.matching.weighted_scorer import calculate_ats_score
-from app.matching.explainability import explain_score
 
 from typing import Optional
 from app.analysis.experience_analyzer import calculate_experience_score
-from app.analysis.experience_analyzer import extract_experience_years
 
 from app.analysis.project_analyzer import calculate_project_relevance_score
 from app.analysis.ats_checker import calculate_ats_format_score
-from app.recommendations.engine import generate_skill_gap_recommendations
-from app.analysis.final_scorer import calculate_final_ats_score
-from app.analysis.project_analyzer import analyze_projects_core
 from app.analysis.ats_checker import calculate_ats_format_score
 from app.role_intelligence.role_detector import detect_role, calculate_role_relevance_score
-from app.ai_engine.ai_guard import ai_safe_execute
-from app.analysis.fraud_detector import detect_resume_fraud
 
 from app.role_intelligence.role_detector import (
     detect_role,
     calculate_role_relevance_score,
 )
 
+from app.ai_engine.llm_gateway import LLMResponseParseError, close_llm_gateway
 from app.ai_engine.skill_fallback import (
     detect_unknown_skills,
     classify_unknown_skills,
 )
 
-from app.analysis.section_analyzer import generate_section_feedback
-from app.ai_engine.section_feedback_ai import generate_section_feedback_ai
-from app.ai_engine.resume_rewrite_ai import rewrite_resume_for_jd
-from app.recommendations.engine import generate_skill_gap_recommendations
+from app.parsing.parsed_resume import ParsedResume
+from app.service.analyze_service import analyze_legacy, shutdown_pipeline_executor
+from app.utils.metrics import CONTENT_TYPE, REGISTRY, RequestMetricsMiddleware
+from app.service.analyze_service import InvalidAnalysisOptions
+from app.utils.profiling import ProfilingDisabledError
 
 
 from app.api.v1 import router as v1_router
+from app.api.jobs import router as jobs_router
+from app.jobs.runner import get_job_runner
+from app.jobs.store import JobNotFinishedError, JobNotFoundError
+
+
+
+# -----------------------------
+# Startup / shutdown
+# -----------------------------
+async def upload_cleanup_loop():
+    while True:
+        await asyncio.to_thread(cleanup_uploads)
+        await asyncio.sleep(3600)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+    if WARMUP_ON_STARTUP:
+        # Runs in the background so the server accepts requests immediately
+        background_tasks.append(asyncio.create_task(run_warmup()))
+
+    if PERSIST_UPLOADS:
+        background_tasks.append(asyncio.create_task(upload_cleanup_loop()))
+
+    # Picks up jobs queued or interrupted before the restart
+    if JOBS_ENABLED:
+        get_job_runner().start()
+
+    yield
+
+    if JOBS_ENABLED:
+        await get_job_runner().stop()
 
+    for task in background_tasks:
+        if not task.done():
+            task.cancel()
+
+    shutdown_parse_executor()
+    shutdown_pipeline_executor()
+    await close_llm_gateway()
 
 
 # ✅ ONE app only
-app = FastAPI(title="AI Resume Analyzer Backend")
+app = FastAPI(title="AI Resume Analyzer Backend", lifespan=lifespan)
 app.include_router(v1_router)
-UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+app.include_router(jobs_router)
+app.add_middleware(RequestMetricsMiddleware)
+
+
+@app.exception_handler(DocumentParseError)
+async def document_parse_error_handler(request, exc: DocumentParseError):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(UploadTooLargeError)
+async def upload_too_large_handler(request, exc: UploadTooLargeError):
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
+@app.exception_handler(InvalidAnalysisOptions)
+async def invalid_analysis_options_handler(request, exc: InvalidAnalysisOptions):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+@app.exception_handler(ProfilingDisabledError)
+async def profiling_disabled_handler(request, exc: ProfilingDisabledError):
+    return JSONResponse(status_code=403, content={"detail": str(exc)})
+
+
+@app.exception_handler(JobNotFoundError)
+async def job_not_found_handler(request, exc: JobNotFoundError):
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
+
+
+@app.exception_handler(JobNotFinishedError)
+async def job_not_finished_handler(request, exc: JobNotFinishedError):
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
 
 
 # -----------------------------
@@ -60,6 +137,25 @@ def health_check():
     return {"status": "Backend is running"}
 
 
+# -----------------------------
+# Readiness (model + caches hot)
+# -----------------------------
+@app.get("/ready")
+def readiness_check():
+    return JSONResponse(
+        status_code=200 if is_ready() else 503,
+        content=readiness_report(),
+    )
+
+
+# -----------------------------
+# Metrics (Prometheus text format)
+# -----------------------------
+@app.get("/metrics")
+def metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # -----------------------------
 # Upload Resume
 # -----------------------------
@@ -68,11 +164,7 @@ async def upload_resume(file: UploadFile = File(...)):
     if not file.filename.endswith((".pdf", ".docx")):
         raise HTTPException(status_code=400, detail="Unsupported resume format")
 
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    text = parse_resume(file_path)
+    text = await load_upload(file, parse_resume)
 
     return {
         "filename": file.filename,
@@ -88,11 +180,7 @@ async def upload_jd(file: UploadFile = File(...)):
     if not file.filename.endswith((".pdf", ".docx")):
         raise HTTPException(status_code=400, detail="Unsupported JD format")
 
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-
-    text = parse_jd(file_path)
+    text = await load_upload(file, parse_jd)
 
     return {
         "filename": file.filename,
@@ -128,10 +216,7 @@ async def analyze(
 # Resume input handling
 # ---------------------------
     if resume_file and resume_file.filename:
-        resume_path = os.path.join(UPLOAD_DIR, resume_file.filename)
-        with open(resume_path, "wb") as f:
-            f.write(await resume_file.read())
-        resume_text = parse_resume(resume_path)
+        resume_text = await load_upload(resume_file, parse_resume)
 
     elif resume_text and resume_text.strip() and resume_text != "string":
         resume_text = resume_text.strip()
@@ -143,10 +228,7 @@ async def analyze(
 # JD input handling
 # ---------------------------
     if jd_file and jd_file.filename:
-        jd_path = os.path.join(UPLOAD_DIR, jd_file.filename)
-        with open(jd_path, "wb") as f:
-            f.write(await jd_file.read())
-        jd_text = parse_jd(jd_path)
+        jd_text = await load_upload(jd_file, parse_jd)
 
     elif jd_text and jd_text.strip() and jd_text != "string":
         jd_text = jd_text.strip()
@@ -185,211 +267,14 @@ async def analyze(
     
 
 
-    # ---------- 3. Extract skills ----------
-    resume_skills = extract_skills(resume_text)
-    jd_skills = extract_skills(jd_text)
-
-        # ---------- AI Fallback Skill Detection ----------
-    unknown_resume_skills = detect_unknown_skills(resume_skills, jd_skills)
-    ai_classified_skills = classify_unknown_skills(unknown_resume_skills)
+    # ---------- 3. Analysis pipeline ----------
+    result = await analyze_legacy(resume_text, jd_text)
 
-    # Merge AI-detected skills
-    # ai_classified_skills is a LIST of dicts
-    # -------- Merge AI-detected skills (SAFE) --------
-    for item in ai_classified_skills:
-        # Case 1: dict
-        if isinstance(item, dict):
-            skill_name = item.get("skill")
+    if "error" not in result:
+        mark_analysis_done()
 
-        # Case 2: string
-        elif isinstance(item, str):
-            skill_name = item
-
-        else:
-            continue
-
-        if skill_name and skill_name not in resume_skills:
-            resume_skills.append(skill_name)
-
-
-    # ---------- END AI Fallback Skill Detection ----------
-    if not resume_skills and not jd_skills:
-        return {
-            "error": "No skills detected in resume and job description",
-            "resume_skills": [],
-            "jd_skills": [],
-            "ats_score": 0,
-            "score_explanation": [
-                "Neither resume nor job description contains recognizable skills"
-            ]
-        }
-
-    if not resume_skills:
-        return {
-            "error": "No skills detected in resume",
-            "resume_skills": [],
-            "jd_skills": jd_skills,
-            "ats_score": 0,
-            "score_explanation": [
-                "Resume does not contain recognizable skills"
-            ]
-        }
-
-    if not jd_skills:
-            return {
-                "error": "No skills detected in job description",
-                "resume_skills": resume_skills,
-                "jd_skills": [],
-                "ats_score": 0,
-                "score_explanation": [
-                    "Job description does not contain recognizable skills"
-                ]
-        }
-    
+    return result
 
-    # ---------- 4. Rule-based matching ----------
-    rule_matches = set(resume_skills) & set(jd_skills)
-
-    # ---------- 5. Semantic matching ----------
-    semantic_result = semantic_match(resume_skills, jd_skills)
-    semantic_matches = set(semantic_result["matched_skills"])
-
-    # ---------- 6. Merge results (DAY 8 CORE) ----------
-    final_matched = sorted(rule_matches | semantic_matches)
-    final_missing = sorted(set(jd_skills) - set(final_matched))
-
-    #---skill gap recommendations---    
-    skill_gap_recommendations = generate_skill_gap_recommendations(final_missing)
-
-    # ---------------------------
-    # Skill Score (JD Coverage)
-    # ---------------------------
-    if jd_skills:
-        skill_score = round((len(final_matched) / len(jd_skills)) * 100)
-    else:
-        skill_score = 0
-
-    
-
-    #---------experience score------------
-    experience_result = calculate_experience_score(resume_text, jd_text)
-    experience_score = experience_result.get("experience_score", 0)
-
-    #---------project relevance score------------------------------
-
-    project_result = analyze_projects_core(
-        resume_text=resume_text,
-        resume_skills=resume_skills,
-        jd_skills=jd_skills,
-)
-    project_score = project_result["project_score"]
-
-
-    #---------ATS format score----------------
-    ats_format_result = calculate_ats_format_score(resume_text)
-    ats_format_score = ats_format_result["ats_format_score"]
-
-    #---------role relevance score----------------
-        # Detect role from JD
-    detected_role = detect_role(jd_skills)
-
-    # Calculate role relevance score
-    role_result = calculate_role_relevance_score(
-        resume_skills=resume_skills,
-        detected_role=detected_role
-    )
-
-    role_score = role_result["role_score"]
-
-
-
-    # ---------- 7. Classify JD skills ----------
-    jd_classification = classify_jd_skills(jd_text, jd_skills)
-
-    # ---------- Resume Match Score (JD Coverage) ----------
-    if jd_skills:
-        resume_match_score = round(
-            (len(final_matched) / len(jd_skills)) * 100
-        )
-    else:
-        resume_match_score = 0
-
-    # ---------- 8. Weighted ATS score ----------
-    ats_score = calculate_ats_score(
-        final_matched,
-        jd_classification["must_have"],
-        jd_classification["good_to_have"]
-    )
-
-    # ---------- 9. Explainability ----------
-    score_explanation = explain_score(
-        final_matched,
-        jd_classification["must_have"],
-        jd_classification["good_to_have"]
-    )
-
-    # ---------- Edge case: zero ATS score ----------
-    if ats_score == 0:
-        score_explanation.append("No must-have skills matched")
-
-    # ----------  Section Analysis ----------
-    section_feedback= generate_section_feedback(
-    resume_text=resume_text,
-    jd_skills=jd_skills,
-)
-    # -----------------------------
-    # SECTION-WISE FEEDBACK (AI)
-    # -----------------------------
-
-    section_feedback = ai_safe_execute(
-        ai_function=generate_section_feedback_ai,
-        fallback_function=generate_section_feedback,
-        resume_text=resume_text,
-        jd_text=jd_text
-    )
-
-    #--fraud detection--
-    years_of_experience = extract_experience_years(resume_text)
-    fraud_report = detect_resume_fraud(resume_skills, years_of_experience)
-
-    final_ats = calculate_final_ats_score(
-        skill_score=skill_score,
-        experience_score=experience_score,
-        project_score=project_score,
-        ats_format_score=ats_format_score,
-        role_score=role_score,
-    )
-
-    print("USING FINAL ATS:", final_ats)
-
-
-
-    return {
-        "resume_match_score": resume_match_score,
-        "resume_skills": resume_skills,
-        "jd_skills": jd_skills,
-        "matched_skills": final_matched,
-        "missing_skills": final_missing,
-
-        "skill_gap_recommendations": skill_gap_recommendations,
-         "section_feedback": {
-        "rule_based": section_feedback,
-        "ai_based": section_feedback
-    },
-        "must_have_skills": jd_classification["must_have"],
-        "good_to_have_skills": jd_classification["good_to_have"],
-        "ats_score" : final_ats["ats_score"] ,
-        "score_explanation": score_explanation,
-
-        "fraud_report": fraud_report,
-
-
-
-        "_debug": {
-            "rule_matches_count": len(rule_matches),
-            "semantic_matches_count": len(semantic_matches)
-        }
-    }
 # -----------------------------
 # Experience Analysis API
 # -----------------------------
@@ -398,17 +283,11 @@ async def analyze_experience(
         resume_file: UploadFile = File(...),
         jd_file: UploadFile = File(...)
     ):
-        resume_path = os.path.join(UPLOAD_DIR, resume_file.filename)
-        jd_path = os.path.join(UPLOAD_DIR, jd_file.filename)
 
-        with open(resume_path, "wb") as f:
-            f.write(await resume_file.read())
 
-        with open(jd_path, "wb") as f:
-            f.write(await jd_file.read())
 
-        resume_text = parse_resume(resume_path)
-        jd_text = parse_jd(jd_path)
+        resume_text = await load_upload(resume_file, parse_resume)
+        jd_text = await load_upload(jd_file, parse_jd)
 
         experience_result = calculate_experience_score(resume_text, jd_text)
 
@@ -425,23 +304,18 @@ async def analyze_projects_api(
         resume_file: UploadFile = File(...),
         jd_file: UploadFile = File(...),
     ):
-        resume_path = os.path.join(UPLOAD_DIR, resume_file.filename)
-        jd_path = os.path.join(UPLOAD_DIR, jd_file.filename)
 
-        with open(resume_path, "wb") as f:
-            f.write(await resume_file.read())
 
-        with open(jd_path, "wb") as f:
-            f.write(await jd_file.read())
 
-        resume_text = parse_resume(resume_path)
-        jd_text = parse_jd(jd_path)
+        resume_text = await load_upload(resume_file, parse_resume)
+        jd_text = await load_upload(jd_file, parse_jd)
 
-        resume_skills = extract_skills(resume_text)
+        resume = ParsedResume(resume_text)
+        resume_skills = resume.skills
         jd_skills = extract_skills(jd_text)
 
         project_result = calculate_project_relevance_score(
-            resume_text=resume_text,
+            resume_text=resume,
             jd_skills=jd_skills,
             known_skills=resume_skills,
         )
@@ -455,12 +329,9 @@ async def analyze_projects_api(
     # -----------------------------
 @app.post("/analyze-ats-format")
 async def analyze_ats_format(resume_file: UploadFile = File(...)):
-        resume_path = os.path.join(UPLOAD_DIR, resume_file.filename)
 
-        with open(resume_path, "wb") as f:
-            f.write(await resume_file.read())
 
-        resume_text = parse_resume(resume_path)
+        resume_text = await load_upload(resume_file, parse_resume)
 
         ats_result = calculate_ats_format_score(resume_text)
 
@@ -477,17 +348,11 @@ async def analyze_role(
         resume_file: UploadFile = File(...),
         jd_file: UploadFile = File(...),
     ):
-        resume_path = os.path.join(UPLOAD_DIR, resume_file.filename)
-        jd_path = os.path.join(UPLOAD_DIR, jd_file.filename)
 
-        with open(resume_path, "wb") as f:
-            f.write(await resume_file.read())
 
-        with open(jd_path, "wb") as f:
-            f.write(await jd_file.read())
 
-        resume_text = parse_resume(resume_path)
-        jd_text = parse_jd(jd_path)
+        resume_text = await load_upload(resume_file, parse_resume)
+        jd_text = await load_upload(jd_file, parse_jd)
 
         resume_skills = extract_skills(resume_text)
         jd_skills = extract_skills(jd_text)
@@ -510,12 +375,9 @@ async def analyze_role(
 async def analyze_dynamic_skills(
         resume_file: UploadFile = File(...),
 ):
-        resume_path = os.path.join(UPLOAD_DIR, resume_file.filename)
 
-        with open(resume_path, "wb") as f:
-            f.write(await resume_file.read())
 
-        resume_text = parse_resume(resume_path)
+        resume_text = await load_upload(resume_file, parse_resume)
 
         extracted_skills = extract_skills(resume_text)
 
@@ -529,7 +391,13 @@ async def analyze_dynamic_skills(
         )
 
         # Classify unknown skills using AI
-        classified_skills = classify_unknown_skills(unknown_skills)
+        try:
+            classified_skills = await classify_unknown_skills(unknown_skills)
+        except LLMResponseParseError as e:
+            classified_skills = {
+                "error": "AI returned invalid JSON",
+                "raw_response": e.raw,
+            }
 
         return {
             "extracted_skills": extracted_skills,
@@ -0,0 +1,118 @@
+"""
+compiled_jd.py
+
+Job description analyzed once and reused for every resume scored
+against it.
+
+A CompiledJD holds the JD skills, the must-have / good-to-have split,
+the required years, the detected role and (lazily) the normalized skill
+embeddings. compile_jd() caches them by content hash, so ranking N
+resumes against one JD costs one JD analysis instead of N.
+"""
+
+import hashlib
+import threading
+from typing import Dict, List, Union
+
+from app.analysis.experience_analyzer import extract_required_years
+from app.config import JD_CACHE_ITEMS
+from app.matching.jd_skill_classifier import classify_jd_skills
+from app.role_intelligence.role_detector import detect_role
+from app.skills.skill_extractor import extract_skills, on_taxonomy_change
+from app.utils.cache import MemoryLRU
+from app.utils.metrics import register_cache_stats
+
+
+def jd_digest(jd_text: str) -> str:
+    return hashlib.sha256((jd_text or "").encode("utf-8")).hexdigest()
+
+
+class CompiledJD:
+    """
+    Everything the scorers need from a job description.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text or ""
+        self.digest = jd_digest(self.text)
+
+        self.skills: List[str] = extract_skills(self.text)
+        self.classification: Dict[str, List[str]] = classify_jd_skills(
+            self.text, self.skills
+        )
+        self.required_years = extract_required_years(self.text)
+        self.detected_role = detect_role(self.skills)
+
+        self._embeddings = None
+        self._lock = threading.Lock()
+
+    @property
+    def must_have(self) -> List[str]:
+        return self.classification["must_have"]
+
+    @property
+    def good_to_have(self) -> List[str]:
+        return self.classification["good_to_have"]
+
+    @property
+    def skill_embeddings(self):
+        """
+        L2-normalized embeddings of `skills`, computed on first use.
+        """
+        if self._embeddings is None:
+            # Imported here: the matcher imports this module
+            from app.matching.semantic_matcher import _normalize_rows, encode_skills
+
+            with self._lock:
+                if self._embeddings is None:
+                    self._embeddings = _normalize_rows(encode_skills(self.skills))
+
+        return self._embeddings
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def __iter__(self):
+        return iter(self.skills)
+
+
+_compiled_jds = MemoryLRU(max_items=JD_CACHE_ITEMS)
+_cache_counts = {"hits": 0, "misses": 0}
+
+# Promoted skills change JD skill extraction
+on_taxonomy_change(_compiled_jds.clear)
+
+
+def compile_jd(jd: Union[str, CompiledJD]) -> CompiledJD:
+    """
+    Return the CompiledJD for a JD text, building it on first sight.
+    """
+    if isinstance(jd, CompiledJD):
+        return jd
+
+    key = jd_digest(jd)
+    compiled = _compiled_jds.get(key)
+    if compiled is None:
+        _cache_counts["misses"] += 1
+        compiled = CompiledJD(jd)
+        _compiled_jds.set(key, compiled)
+    else:
+        _cache_counts["hits"] += 1
+
+    return compiled
+
+
+def compiled_jd_cache_stats() -> Dict[str, object]:
+    hits, misses = _cache_counts["hits"], _cache_counts["misses"]
+    lookups = hits + misses
+
+    return {
+        "memory_items": len(_compiled_jds),
+        "memory_hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "evictions": _compiled_jds.evictions,
+    }
+
+
+register_cache_stats("compiled_jd", compiled_jd_cache_stats)
@@ -0,0 +1,182 @@
+"""
+embedding_batcher.py
+
+Dynamic micro-batching for embedding requests.
+
+Concurrent callers submit small lists of texts. A single worker thread
+collects them and flushes when the batch reaches `max_batch_size` texts
+or the oldest request has waited `max_wait_ms`, runs one `encode` call
+for the whole batch, and hands each caller its own rows back.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent `encode` calls into batched forward passes.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        stats_window: int = 2048,
+    ) -> None:
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._latencies = deque(maxlen=stats_window)
+        self._batch_sizes = deque(maxlen=stats_window)
+        self._encode_seconds = 0.0
+        self.requests = 0
+        self.batches = 0
+        self.texts = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="embedding-batcher", daemon=True
+        )
+        self._thread.start()
+
+    # -----------------------------
+    # Caller side
+    # -----------------------------
+    def submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+
+        if self._closed:
+            raise RuntimeError("Embedding batcher is closed")
+
+        self._queue.put((list(texts), future, time.perf_counter()))
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Blocking helper: submit and wait for this caller's rows.
+        """
+        return self.submit(texts).result()
+
+    def close(self) -> None:
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    # -----------------------------
+    # Worker side
+    # -----------------------------
+    def _collect(self, first) -> list:
+        batch = [first]
+        size = len(first[0])
+        deadline = first[2] + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if item is None:
+                self._closed = True
+                break
+
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = self._collect(first)
+            self._flush(batch)
+
+            if self._closed and self._queue.empty():
+                return
+
+    def _flush(self, batch: list) -> None:
+        # Each distinct text is encoded once even if several callers sent it
+        unique: Dict[str, int] = {}
+        for texts, _, _ in batch:
+            for text in texts:
+                unique.setdefault(text, len(unique))
+
+        started = time.perf_counter()
+        try:
+            vectors = np.asarray(self.encode_fn(list(unique)), dtype=np.float32)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        for texts, future, _ in batch:
+            future.set_result(vectors[[unique[text] for text in texts]])
+
+        with self._stats_lock:
+            self._encode_seconds += finished - started
+            self._batch_sizes.append(len(unique))
+            self.batches += 1
+            self.texts += len(unique)
+            self.requests += len(batch)
+            for _, _, submitted in batch:
+                self._latencies.append(finished - submitted)
+
+    # -----------------------------
+    # Stats
+    # -----------------------------
+    def stats(self) -> Dict[str, object]:
+        with self._stats_lock:
+            latencies = list(self._latencies)
+            batch_sizes = list(self._batch_sizes)
+            elapsed = time.perf_counter() - self._started_at
+
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "requests": self.requests,
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch_size": round(sum(batch_sizes) / len(batch_sizes), 2)
+                if batch_sizes else 0.0,
+                "texts_per_second": round(self.texts / elapsed, 2) if elapsed else 0.0,
+                "encode_texts_per_second": round(self.texts / self._encode_seconds, 2)
+                if self._encode_seconds else 0.0,
+                "latency_ms": {
+                    "p50": round(_percentile(latencies, 50) * 1000, 3),
+                    "p95": round(_percentile(latencies, 95) * 1000, 3),
+                    "p99": round(_percentile(latencies, 99) * 1000, 3),
+                },
+            }
@@ -0,0 +1,278 @@
+"""
+embedding_cache.py
+
+Tiered embedding cache for skill strings.
+Keyed by (model name, normalized skill text).
+
+- Static tier: optional read-only lookup, e.g. the precomputed
+  taxonomy matrix from taxonomy_embeddings.py.
+- Memory tier: bounded LRU of float32 vectors.
+- Disk tier: append-only float32 matrix (memory-mapped for reads)
+  plus a key index, shared by all processes and kept across restarts.
+
+Only cache misses reach the model's encode function.
+"""
+
+import fcntl
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+def normalize_cache_key(text: str) -> str:
+    """
+    Normalize skill text for cache lookups.
+
+    Texts that differ only in case or whitespace share one cached
+    vector: the one computed for the first of them encoded.
+    """
+    return " ".join(text.lower().split())
+
+
+class _DiskTier:
+    """
+    Append-only on-disk embedding store.
+
+    vectors.f32 : raw float32 rows, memory-mapped for reads
+    keys.tsv    : "<row>\\t<key>" lines, appended after their vectors
+    meta.json   : model name and embedding dimension
+
+    Appends from several processes are serialized with an flock on the
+    index file. Vectors are written before their index line, so any key
+    a reader can see always has its row on disk.
+    """
+
+    def __init__(self, directory: str, model_name: str) -> None:
+        self.directory = directory
+        self.model_name = model_name
+
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.tsv")
+        self.meta_path = os.path.join(directory, "meta.json")
+
+        self.dim: Optional[int] = None
+        self.index: Dict[str, int] = {}
+
+        self._keys_offset = 0
+        self._matrix: Optional[np.ndarray] = None
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Pick up rows appended by other processes since the last read.
+        """
+        if not os.path.exists(self.keys_path):
+            return
+
+        with open(self.keys_path, "r", encoding="utf-8") as f:
+            f.seek(self._keys_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    # Partially written line, read it next time
+                    break
+                row, key = line.rstrip("\n").split("\t", 1)
+                self.index[key] = int(row)
+                self._keys_offset += len(line.encode("utf-8"))
+
+        self._matrix = None
+
+    def _map(self) -> Optional[np.ndarray]:
+        if self._matrix is None and self.dim and os.path.exists(self.vectors_path):
+            rows = os.path.getsize(self.vectors_path) // (self.dim * 4)
+            if rows:
+                self._matrix = np.memmap(
+                    self.vectors_path, dtype=np.float32, mode="r",
+                    shape=(rows, self.dim),
+                )
+        return self._matrix
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.index.get(key)
+        if row is None:
+            return None
+
+        matrix = self._map()
+        if matrix is None or row >= matrix.shape[0]:
+            return None
+
+        return np.array(matrix[row])
+
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        # Created with the first write, so a read-only run leaves no files
+        os.makedirs(self.directory, exist_ok=True)
+
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "dim": self.dim}, f)
+
+        with open(self.keys_path, "a", encoding="utf-8") as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                first_row = 0
+                if os.path.exists(self.vectors_path):
+                    first_row = os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+                with open(self.vectors_path, "ab") as f:
+                    f.write(vectors.tobytes())
+
+                index_file.write("".join(
+                    f"{first_row + i}\t{key}\n" for i, key in enumerate(keys)
+                ))
+                index_file.flush()
+            finally:
+                fcntl.flock(index_file, fcntl.LOCK_UN)
+
+        self.refresh()
+
+
+class EmbeddingCache:
+    """
+    Embedding cache with a bounded in-memory LRU and an optional disk tier.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = "",
+        max_memory_items: int = 4096,
+    ) -> None:
+        self.model_name = model_name
+        self.max_memory_items = max_memory_items
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._static = None
+
+        self._disk: Optional[_DiskTier] = None
+        if cache_dir:
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+            self._disk = _DiskTier(os.path.join(cache_dir, safe_name), model_name)
+
+        self.static_hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def set_static_tier(self, lookup) -> None:
+        """
+        Attach a read-only tier consulted first. `lookup` must support
+        `key in lookup` and `lookup.get(key)` (vector or None).
+        """
+        self._static = lookup
+
+    # -----------------------------
+    # Memory tier
+    # -----------------------------
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        if self._static is not None:
+            vector = self._static.get(key)
+            if vector is not None:
+                self.static_hits += 1
+                return vector
+
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+        if self._disk is not None:
+            vector = self._disk.get(key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+
+        return None
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def encode(
+        self,
+        texts: List[str],
+        encode_fn: Callable[[List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Return one float32 embedding row per text.
+        Only texts missing from every tier are passed to `encode_fn`,
+        as given (the model sees the original casing, not the key).
+        """
+        keys = [normalize_cache_key(text) for text in texts]
+        originals: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            originals.setdefault(key, text)
+        found: Dict[str, np.ndarray] = {}
+        missing: List[str] = []
+
+        with self._lock:
+            if self._disk is not None and any(
+                key not in self._memory
+                and key not in self._disk.index
+                and (self._static is None or key not in self._static)
+                for key in keys
+            ):
+                self._disk.refresh()
+
+            for key in keys:
+                if key in found or key in missing:
+                    continue
+                vector = self._lookup(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    found[key] = vector
+
+            self.misses += len(missing)
+
+        if missing:
+            vectors = np.asarray(encode_fn([originals[key] for key in missing]), dtype=np.float32)
+
+            with self._lock:
+                for key, vector in zip(missing, vectors):
+                    found[key] = vector
+                    self._remember(key, vector)
+
+                if self._disk is not None:
+                    self._disk.put_many(missing, vectors)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> Dict[str, object]:
+        hits = self.static_hits + self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+
+        return {
+            "model": self.model_name,
+            "static_items": len(self._static) if self._static is not None else 0,
+            "memory_items": len(self._memory),
+            "disk_items": len(self._disk.index) if self._disk else 0,
+            "static_hits": self.static_hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
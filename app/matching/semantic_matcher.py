@@ -1,28 +1,296 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import threading
+import time
+from typing import Dict, List, Union
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
 
-def semantic_match(resume_skills, jd_skills, threshold=0.80):
-    res_emb = model.encode(resume_skills)
-    jd_emb = model.encode(jd_skills)
+from app.config import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+    EMBEDDING_BATCHING,
+    EMBEDDING_CACHE_DIR,
+    EMBEDDING_CACHE_MEMORY_ITEMS,
+    EMBEDDING_MODEL_NAME,
+    TAXONOMY_EMBEDDINGS_AUTO_BUILD,
+)
+from app.matching.compiled_jd import CompiledJD
+from app.matching.embedding_batcher import EmbeddingBatcher
+from app.matching.embedding_cache import EmbeddingCache
+from app.utils.metrics import register_cache_stats
+from app.matching.taxonomy_embeddings import (
+    build_taxonomy_matrix,
+    load_taxonomy_matrix,
+)
+
+# -----------------------------
+# Lazy model + taxonomy matrix
+# -----------------------------
+# Nothing heavy happens at import: torch and the model are only loaded
+# on first use (or by warmup()), so workers that never run semantic
+# matching never pay for them.
+_model = None
+_model_lock = threading.Lock()
+
+_taxonomy_loaded = False
+_taxonomy_lock = threading.Lock()
+
+_load_timings: Dict[str, float] = {}
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+embedding_cache = EmbeddingCache(
+    model_name=EMBEDDING_MODEL_NAME,
+    cache_dir=EMBEDDING_CACHE_DIR,
+    max_memory_items=EMBEDDING_CACHE_MEMORY_ITEMS,
+)
+
+
+def get_model():
+    """
+    Return the SentenceTransformer, loading it once (thread-safe).
+    """
+    global _model
+
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                started = time.perf_counter()
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                _load_timings["model_load_seconds"] = round(
+                    time.perf_counter() - started, 3
+                )
+
+    return _model
+
+
+def _model_encode(texts: List[str]) -> np.ndarray:
+    return get_model().encode(texts)
+
+
+def get_batcher() -> EmbeddingBatcher:
+    """
+    Shared micro-batcher: concurrent requests' cache misses are
+    flushed together into one model.encode call.
+    """
+    global _batcher
+
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher(
+                    encode_fn=_model_encode,
+                    max_batch_size=EMBEDDING_BATCH_MAX_SIZE,
+                    max_wait_ms=EMBEDDING_BATCH_MAX_WAIT_MS,
+                )
+
+    return _batcher
+
+
+def _ensure_taxonomy_matrix() -> None:
+    """
+    Attach the precomputed taxonomy vectors (memory-mapped and shared
+    across workers) to the embedding cache, once.
+    """
+    global _taxonomy_loaded
+
+    if _taxonomy_loaded:
+        return
+
+    with _taxonomy_lock:
+        if _taxonomy_loaded:
+            return
+
+        started = time.perf_counter()
+        taxonomy_matrix = load_taxonomy_matrix(EMBEDDING_MODEL_NAME)
+        if taxonomy_matrix is None and TAXONOMY_EMBEDDINGS_AUTO_BUILD:
+            build_taxonomy_matrix(model=get_model(), model_name=EMBEDDING_MODEL_NAME)
+            taxonomy_matrix = load_taxonomy_matrix(EMBEDDING_MODEL_NAME)
+
+        if taxonomy_matrix is not None:
+            embedding_cache.set_static_tier(taxonomy_matrix)
+
+        _load_timings["taxonomy_load_seconds"] = round(
+            time.perf_counter() - started, 3
+        )
+        _taxonomy_loaded = True
+
+
+def encode_skills(skills: List[str]) -> np.ndarray:
+    """
+    Embed skill strings through the cache; only misses hit the model.
+    """
+    _ensure_taxonomy_matrix()
+
+    if EMBEDDING_BATCHING:
+        return embedding_cache.encode(skills, get_batcher().encode)
+
+    return embedding_cache.encode(skills, _model_encode)
+
+
+def embedding_cache_stats() -> Dict[str, object]:
+    return embedding_cache.stats()
+
+
+register_cache_stats("embeddings", embedding_cache_stats)
+
+
+def embedding_batcher_stats() -> Dict[str, object]:
+    if _batcher is None:
+        return {"enabled": EMBEDDING_BATCHING, "started": False}
+    return {"enabled": EMBEDDING_BATCHING, "started": True, **_batcher.stats()}
+
+
+def warmup() -> Dict[str, object]:
+    """
+    Load the model and taxonomy matrix and run one forward pass,
+    so the first real request does not pay for it.
+    """
+    started = time.perf_counter()
 
+    _ensure_taxonomy_matrix()
+    get_model().encode(["warmup"])
+
+    _load_timings["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    return model_status()
+
+
+def model_status() -> Dict[str, object]:
+    return {
+        "model": EMBEDDING_MODEL_NAME,
+        "model_loaded": _model is not None,
+        "taxonomy_matrix_loaded": _taxonomy_loaded,
+        "timings": dict(_load_timings),
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_batcher": embedding_batcher_stats(),
+    }
+
+
+def _normalize_rows(embeddings) -> np.ndarray:
+    """
+    L2-normalize an embedding block so a matmul gives cosine similarity.
+    """
+    emb = np.asarray(embeddings, dtype=np.float32)
+    if emb.ndim == 1:
+        emb = emb.reshape(1, -1)
+
+    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return emb / norms
+
+
+def _collect_matches(jd_skills, resume_skills, best_scores, best_idx, threshold):
     matched = set()
     missing = set(jd_skills)
+    best_matches = {}
 
     for i, jd_skill in enumerate(jd_skills):
-        for j, res_skill in enumerate(resume_skills):
-            score = cosine_similarity(
-                [jd_emb[i]],
-                [res_emb[j]]
-            )[0][0]
+        if not resume_skills:
+            continue
+
+        score = float(best_scores[i])
+        best_matches[jd_skill] = {
+            "resume_skill": resume_skills[int(best_idx[i])],
+            "score": round(score, 4),
+        }
 
-            if score >= threshold:
-                matched.add(jd_skill)
-                missing.discard(jd_skill)
-                break
+        if score >= threshold:
+            matched.add(jd_skill)
+            missing.discard(jd_skill)
 
     return {
         "matched_skills": sorted(matched),
-        "missing_skills": sorted(missing)
+        "missing_skills": sorted(missing),
+        "best_matches": best_matches,
     }
+
+
+def _jd_embeddings(jd, jd_skills: List[str]) -> np.ndarray:
+    if isinstance(jd, CompiledJD):
+        return jd.skill_embeddings
+    return _normalize_rows(encode_skills(jd_skills))
+
+
+def semantic_match(resume_skills, jd_skills, threshold=0.80):
+    """
+    Match JD skills to resume skills by embedding similarity.
+
+    Both blocks are normalized once and compared with a single
+    similarity matrix; each JD skill keeps its best resume skill.
+    `jd_skills` may be a CompiledJD, whose embeddings are reused.
+    """
+    jd = jd_skills
+    resume_skills = list(resume_skills)
+    jd_skills = list(jd_skills)
+
+    if not resume_skills or not jd_skills:
+        return _collect_matches(jd_skills, resume_skills, [], [], threshold)
+
+    res_emb = _normalize_rows(encode_skills(resume_skills))
+    jd_emb = _jd_embeddings(jd, jd_skills)
+
+    # (jd x resume) cosine similarity matrix
+    similarity = jd_emb @ res_emb.T
+
+    best_idx = similarity.argmax(axis=1)
+    best_scores = similarity[np.arange(len(jd_skills)), best_idx]
+
+    return _collect_matches(
+        jd_skills, resume_skills, best_scores, best_idx, threshold
+    )
+
+
+def semantic_match_many(
+    resume_skill_lists: List[List[str]],
+    jd_skills: Union[List[str], CompiledJD],
+    threshold: float = 0.80,
+) -> List[Dict[str, object]]:
+    """
+    Recruiter variant: score many resumes' skill lists against one JD.
+
+    All resume skills are stacked into one block and encoded once, the JD
+    is encoded once, and a single matmul scores every pair. Per-resume
+    maxima are taken over each resume's slice of the stacked matrix.
+    """
+    jd = jd_skills
+    resume_skill_lists = [list(skills) for skills in resume_skill_lists]
+    jd_skills = list(jd_skills)
+
+    stacked = [skill for skills in resume_skill_lists for skill in skills]
+
+    if not stacked or not jd_skills:
+        return [
+            _collect_matches(jd_skills, skills, [], [], threshold)
+            for skills in resume_skill_lists
+        ]
+
+    # Encode each distinct skill once across the whole batch
+    vocab = sorted(set(stacked))
+    vocab_index = {skill: i for i, skill in enumerate(vocab)}
+
+    vocab_emb = _normalize_rows(encode_skills(vocab))
+    jd_emb = _jd_embeddings(jd, jd_skills)
+
+    # (jd x vocab) similarity, then gathered into (jd x stacked)
+    similarity = (jd_emb @ vocab_emb.T)[
+        :, [vocab_index[skill] for skill in stacked]
+    ]
+
+    results = []
+    offset = 0
+    for skills in resume_skill_lists:
+        block = similarity[:, offset:offset + len(skills)]
+        offset += len(skills)
+
+        if not skills:
+            results.append(_collect_matches(jd_skills, skills, [], [], threshold))
+            continue
+
+        best_idx = block.argmax(axis=1)
+        best_scores = block[np.arange(len(jd_skills)), best_idx]
+        results.append(
+            _collect_matches(jd_skills, skills, best_scores, best_idx, threshold)
+        )
+
+    return results
@@ -0,0 +1,222 @@
+"""
+taxonomy_embeddings.py
+
+Precomputed embedding matrix for the skill taxonomy.
+
+An offline build step embeds every skill in SKILL_LIST and SKILL_ALIASES
+once and stores the result as a float16 matrix next to a JSON header.
+At startup the matrix is opened with np.memmap (read-only, zero copy), so
+every worker process shares the same page-cache pages instead of each
+re-encoding the vocabulary.
+
+The header carries a version stamp derived from the taxonomy contents and
+the model name; a mismatch marks the matrix as stale.
+
+Usage:
+    python -m app.matching.taxonomy_embeddings build
+    python -m app.matching.taxonomy_embeddings check
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import EMBEDDING_MODEL_NAME, TAXONOMY_EMBEDDINGS_DIR
+from app.matching.embedding_cache import normalize_cache_key
+from app.skills.skill_aliases import SKILL_ALIASES
+from app.skills.skill_list import SKILL_LIST
+
+logger = logging.getLogger(__name__)
+
+
+def taxonomy_terms() -> List[str]:
+    """
+    Every distinct skill string in the taxonomy, normalized and sorted.
+    """
+    terms = set()
+    terms.update(normalize_cache_key(skill) for skill in SKILL_LIST)
+    terms.update(normalize_cache_key(alias) for alias in SKILL_ALIASES)
+    terms.update(normalize_cache_key(skill) for skill in SKILL_ALIASES.values())
+    terms.discard("")
+    return sorted(terms)
+
+
+def taxonomy_version(terms: List[str], model_name: str) -> str:
+    """
+    Version stamp tied to the taxonomy contents and the embedding model.
+    """
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    for term in terms:
+        digest.update(b"\n")
+        digest.update(term.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _paths(model_name: str, directory: str):
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+    base = os.path.join(directory, safe_name)
+    return base + ".f16", base + ".json"
+
+
+class TaxonomyMatrix:
+    """
+    Read-only view over the memory-mapped taxonomy embeddings.
+    """
+
+    def __init__(self, terms: List[str], matrix: np.ndarray, version: str) -> None:
+        self.terms = terms
+        self.matrix = matrix
+        self.version = version
+        self.index: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.index.get(key)
+        if row is None:
+            return None
+        return self.matrix[row].astype(np.float32)
+
+
+def build_taxonomy_matrix(
+    model=None,
+    model_name: str = EMBEDDING_MODEL_NAME,
+    directory: str = TAXONOMY_EMBEDDINGS_DIR,
+) -> Dict[str, object]:
+    """
+    Embed the whole taxonomy and write the float16 matrix and header.
+
+    Files are written to temporary names and renamed into place, so
+    processes that already mapped the previous matrix keep a valid view.
+    """
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name)
+
+    os.makedirs(directory, exist_ok=True)
+    matrix_path, header_path = _paths(model_name, directory)
+
+    terms = taxonomy_terms()
+    vectors = np.asarray(model.encode(terms), dtype=np.float16)
+
+    header = {
+        "version": taxonomy_version(terms, model_name),
+        "model": model_name,
+        "dtype": "float16",
+        "dim": int(vectors.shape[1]),
+        "count": len(terms),
+        "terms": terms,
+    }
+
+    with open(header_path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            tmp_matrix = f"{matrix_path}.{os.getpid()}.tmp"
+            tmp_header = f"{header_path}.{os.getpid()}.tmp"
+
+            vectors.tofile(tmp_matrix)
+            with open(tmp_header, "w", encoding="utf-8") as f:
+                json.dump(header, f)
+
+            # Matrix first: a reader that sees the new header finds the new rows
+            os.replace(tmp_matrix, matrix_path)
+            os.replace(tmp_header, header_path)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    logger.info(
+        "Built taxonomy embeddings %s (%d terms, version %s)",
+        matrix_path, len(terms), header["version"],
+    )
+
+    return {key: header[key] for key in ("version", "model", "dim", "count")}
+
+
+def taxonomy_matrix_status(
+    model_name: str = EMBEDDING_MODEL_NAME,
+    directory: str = TAXONOMY_EMBEDDINGS_DIR,
+) -> Dict[str, object]:
+    """
+    Compare the stored header with the current taxonomy.
+    """
+    matrix_path, header_path = _paths(model_name, directory)
+    expected = taxonomy_version(taxonomy_terms(), model_name)
+
+    if not os.path.exists(header_path) or not os.path.exists(matrix_path):
+        return {"status": "missing", "expected_version": expected}
+
+    with open(header_path, "r", encoding="utf-8") as f:
+        header = json.load(f)
+
+    return {
+        "status": "fresh" if header.get("version") == expected else "stale",
+        "expected_version": expected,
+        "stored_version": header.get("version"),
+        "count": header.get("count"),
+    }
+
+
+def load_taxonomy_matrix(
+    model_name: str = EMBEDDING_MODEL_NAME,
+    directory: str = TAXONOMY_EMBEDDINGS_DIR,
+) -> Optional[TaxonomyMatrix]:
+    """
+    Memory-map the taxonomy matrix. Returns None if missing or stale.
+    """
+    matrix_path, header_path = _paths(model_name, directory)
+
+    if not os.path.exists(header_path) or not os.path.exists(matrix_path):
+        logger.info("No taxonomy embeddings at %s", matrix_path)
+        return None
+
+    with open(header_path, "r", encoding="utf-8") as f:
+        header = json.load(f)
+
+    expected = taxonomy_version(taxonomy_terms(), model_name)
+    if header.get("version") != expected:
+        logger.warning(
+            "Taxonomy embeddings are stale (stored %s, expected %s); "
+            "run `python -m app.matching.taxonomy_embeddings build`",
+            header.get("version"), expected,
+        )
+        return None
+
+    matrix = np.memmap(
+        matrix_path, dtype=np.float16, mode="r",
+        shape=(header["count"], header["dim"]),
+    )
+
+    return TaxonomyMatrix(header["terms"], matrix, header["version"])
+
+
+def main(argv: List[str]) -> int:
+    command = argv[1] if len(argv) > 1 else "check"
+
+    if command == "build":
+        print(json.dumps(build_taxonomy_matrix(), indent=2))
+        return 0
+
+    if command == "check":
+        status = taxonomy_matrix_status()
+        print(json.dumps(status, indent=2))
+        return 0 if status["status"] == "fresh" else 1
+
+    print("usage: python -m app.matching.taxonomy_embeddings [build|check]")
+    return 2
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main(sys.argv))
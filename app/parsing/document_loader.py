@@ -0,0 +1,150 @@
+"""
+document_loader.py
+
+Single entry point for turning an uploaded file into text.
+
+Uploads are read in chunks up to MAX_UPLOAD_BYTES and parsed straight
+from memory; nothing touches the disk unless PERSIST_UPLOADS is set.
+Byte-identical uploads are served from the parse cache; only misses are
+sent to the parsing process pool.
+"""
+
+import logging
+import os
+import time
+import uuid
+from typing import Callable, Dict
+
+from app.config import (
+    MAX_UPLOAD_BYTES,
+    PERSIST_UPLOADS,
+    UPLOAD_DIR,
+    UPLOAD_READ_CHUNK_BYTES,
+    UPLOAD_RETENTION_HOURS,
+)
+from app.parsing.parse_cache import parse_cache, parse_cache_key
+from app.parsing.parse_executor import get_parse_executor
+from app.utils.metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+PARSE_SECONDS = histogram(
+    "document_parse_seconds",
+    "Time to parse an uploaded document (parse cache misses only)",
+    ["parser"],
+)
+PARSE_ERRORS = counter(
+    "document_parse_errors_total",
+    "Uploaded documents that failed to parse",
+    ["parser", "error"],
+)
+
+
+class UploadTooLargeError(Exception):
+    """
+    Raised when an upload exceeds MAX_UPLOAD_BYTES.
+    """
+
+
+async def read_upload(file, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """
+    Stream an UploadFile into memory, refusing anything over `max_bytes`.
+    """
+    chunks = []
+    total = 0
+
+    while True:
+        chunk = await file.read(UPLOAD_READ_CHUNK_BYTES)
+        if not chunk:
+            break
+
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLargeError(
+                f"Upload exceeds the maximum size of {max_bytes} bytes"
+            )
+        chunks.append(chunk)
+
+    return b"".join(chunks)
+
+
+# -----------------------------
+# Optional persistence of originals
+# -----------------------------
+def persist_upload(data: bytes, filename: str) -> str:
+    """
+    Keep a copy of the original upload under UPLOAD_DIR.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    safe_name = os.path.basename(filename or "upload")
+    path = os.path.join(UPLOAD_DIR, f"{uuid.uuid4()}_{safe_name}")
+
+    with open(path, "wb") as f:
+        f.write(data)
+
+    return path
+
+
+def cleanup_uploads(retention_hours: float = UPLOAD_RETENTION_HOURS) -> Dict[str, int]:
+    """
+    Delete persisted uploads older than the retention window.
+    """
+    if not os.path.isdir(UPLOAD_DIR):
+        return {"deleted": 0, "kept": 0}
+
+    cutoff = time.time() - retention_hours * 3600
+    deleted = kept = 0
+
+    for entry in os.scandir(UPLOAD_DIR):
+        if not entry.is_file():
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                deleted += 1
+            else:
+                kept += 1
+        except FileNotFoundError:
+            continue
+
+    if deleted:
+        logger.info("Removed %d uploads older than %sh", deleted, retention_hours)
+
+    return {"deleted": deleted, "kept": kept}
+
+
+# -----------------------------
+# Parsing
+# -----------------------------
+async def parse_upload_bytes(data: bytes, parser_fn: Callable, filename: str) -> str:
+    executor = get_parse_executor()
+    extension = os.path.splitext(filename or "")[1].lower()
+    key = parse_cache_key(data, parser_fn, executor.max_pages, extension)
+
+    cached = parse_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if PERSIST_UPLOADS:
+        persist_upload(data, filename)
+
+    parser = parser_fn.__name__
+    started = time.perf_counter()
+    try:
+        text = await executor.parse(parser_fn, data, filename)
+    except Exception as e:
+        PARSE_ERRORS.inc(parser, type(e).__name__)
+        raise
+    finally:
+        PARSE_SECONDS.observe(time.perf_counter() - started, parser)
+
+    parse_cache.set(key, text)
+    return text
+
+
+async def load_upload(file, parser_fn: Callable) -> str:
+    """
+    Read an UploadFile and return its parsed text.
+    """
+    data = await read_upload(file)
+    return await parse_upload_bytes(data, parser_fn, file.filename)
@@ -0,0 +1,54 @@
+"""
+parse_cache.py
+
+Content-addressed cache of parsed document text.
+
+Keyed by a SHA-256 of the uploaded bytes plus the parser identity,
+parser version, page cap and file extension, so a byte-identical
+document is parsed once no matter which endpoint receives it.
+Memory LRU tier in front of a size-bounded sqlite tier.
+"""
+
+import hashlib
+import inspect
+from typing import Callable, Dict, Optional
+
+from app.config import (
+    PARSE_CACHE_MAX_BYTES,
+    PARSE_CACHE_MEMORY_ITEMS,
+    PARSE_CACHE_PATH,
+)
+from app.utils.cache import MemoryLRU, SqliteCache, TieredCache
+from app.utils.metrics import register_cache_stats
+
+parse_cache = TieredCache(
+    memory=MemoryLRU(max_items=PARSE_CACHE_MEMORY_ITEMS),
+    disk=SqliteCache(
+        PARSE_CACHE_PATH,
+        max_bytes=PARSE_CACHE_MAX_BYTES,
+        table="parsed_documents",
+    ) if PARSE_CACHE_PATH else None,
+)
+
+
+def parse_cache_key(
+    data: bytes,
+    parser_fn: Callable,
+    max_pages: Optional[int],
+    extension: str = "",
+) -> str:
+    module = inspect.getmodule(parser_fn)
+    version = getattr(module, "PARSER_VERSION", "0")
+    parser_id = (
+        f"{parser_fn.__module__}.{parser_fn.__name__}:{version}:{max_pages}:{extension}"
+    )
+
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{digest}:{parser_id}"
+
+
+def parse_cache_stats() -> Dict[str, object]:
+    return parse_cache.stats()
+
+
+register_cache_stats("parsed_documents", parse_cache_stats)
@@ -0,0 +1,205 @@
+"""
+parse_executor.py
+
+Runs blocking PDF/DOCX parsers in a bounded process pool, so a large
+upload cannot stall the event loop for every other request.
+
+- Per-document timeout (the stuck worker is killed, the pool replaced)
+- Page cap passed to the parsers
+- Crash isolation: when a worker dies, every document that was in the
+  broken pool is retried in its own single-use process, so only the
+  document that actually crashes the parser fails
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Union
+
+from app.config import PARSE_MAX_PAGES, PARSE_TIMEOUT_SECONDS, PARSE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentParseError(Exception):
+    """
+    Raised when a document cannot be parsed within the executor limits.
+    """
+
+
+def _run_parser(
+    parser_fn: Callable,
+    source: Union[str, bytes],
+    max_pages: Optional[int],
+    filename: Optional[str],
+) -> str:
+    # Executed inside a worker process
+    return parser_fn(source, max_pages=max_pages, filename=filename)
+
+
+def _label(source: Union[str, bytes], filename: Optional[str]) -> str:
+    if filename:
+        return filename
+    return source if isinstance(source, str) else "in-memory document"
+
+
+class ParseExecutor:
+    """
+    Bounded process pool for document parsers.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        timeout: float = 20.0,
+        max_pages: Optional[int] = 30,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.max_pages = max_pages
+
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=self._spawn_context(),
+                )
+                self._generation += 1
+            return self._pool, self._generation
+
+    def _replace_pool(self, generation: int) -> None:
+        """
+        Kill the current pool's workers and start fresh on next use.
+        """
+        with self._lock:
+            if self._pool is None or generation != self._generation:
+                return
+
+            pool = self._pool
+            self._pool = None
+
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _spawn_context(self):
+        # spawn: never fork a process that may hold torch threads
+        return multiprocessing.get_context("spawn")
+
+    async def _await(self, future, label: str):
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Parsing %s timed out after %ss", label, self.timeout)
+            raise DocumentParseError(
+                f"Document parsing timed out after {self.timeout:g} seconds"
+            )
+
+    async def _parse_isolated(
+        self,
+        parser_fn: Callable,
+        source: Union[str, bytes],
+        filename: Optional[str],
+    ) -> str:
+        """
+        Parse in a dedicated single-use process.
+        """
+        loop = asyncio.get_running_loop()
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=self._spawn_context())
+
+        try:
+            future = loop.run_in_executor(
+                pool, _run_parser, parser_fn, source, self.max_pages, filename
+            )
+            return await self._await(future, _label(source, filename))
+
+        except BrokenProcessPool:
+            logger.warning("Parsing %s crashed the parser process", _label(source, filename))
+            raise DocumentParseError("Document could not be parsed (parser crashed)")
+
+        finally:
+            for process in list(getattr(pool, "_processes", {}).values()):
+                process.terminate()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    async def parse(
+        self,
+        parser_fn: Callable,
+        source: Union[str, bytes],
+        filename: Optional[str] = None,
+    ) -> str:
+        """
+        Run `parser_fn(source, max_pages=..., filename=...)` in the pool.
+        `source` is a file path or the raw document bytes.
+        """
+        loop = asyncio.get_running_loop()
+
+        pool, generation = self._get_pool()
+        future = loop.run_in_executor(
+            pool, _run_parser, parser_fn, source, self.max_pages, filename
+        )
+
+        try:
+            return await self._await(future, _label(source, filename))
+
+        except DocumentParseError:
+            # The worker is still stuck on this document
+            self._replace_pool(generation)
+            raise
+
+        except BrokenProcessPool:
+            # Some document in the pool crashed its worker; we cannot tell
+            # which one, so each affected document is retried on its own
+            self._replace_pool(generation)
+            return await self._parse_isolated(parser_fn, source, filename)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool = self._pool
+            self._pool = None
+
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_executor: Optional[ParseExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_parse_executor() -> ParseExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ParseExecutor(
+                    max_workers=PARSE_WORKERS,
+                    timeout=PARSE_TIMEOUT_SECONDS,
+                    max_pages=PARSE_MAX_PAGES or None,
+                )
+
+    return _executor
+
+
+async def parse_document(
+    parser_fn: Callable,
+    source: Union[str, bytes],
+    filename: Optional[str] = None,
+) -> str:
+    """
+    Parse a document (path or bytes) off the event loop.
+    """
+    return await get_parse_executor().parse(parser_fn, source, filename)
+
+
+def shutdown_parse_executor() -> None:
+    if _executor is not None:
+        _executor.shutdown()
@@ -0,0 +1,179 @@
+"""
+parsed_resume.py
+
+Shared document model for a resume.
+
+Built once per request: the text is lowercased, tokenized, split into
+sections and scanned for skills a single time. Every analyzer reads
+from the same object, so they all see the same section boundaries.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.skills.skill_extractor import SKILL_AUTOMATON
+
+
+SECTION_HEADINGS: Dict[str, List[str]] = {
+    "summary": ["summary", "profile", "about me"],
+    "experience": ["work experience", "experience", "internships", "internship"],
+    "projects": ["personal projects", "academic projects", "projects"],
+    "skills": ["technical skills", "skills"],
+    "education": ["education", "academic"],
+}
+
+_HEADING_TO_SECTION = {
+    heading: section
+    for section, headings in SECTION_HEADINGS.items()
+    for heading in headings
+}
+
+# Longest headings first so "work experience" wins over "experience"
+# and "academic projects" over "academic"
+_HEADING_ALTERNATION = "|".join(
+    re.escape(heading)
+    for heading in sorted(_HEADING_TO_SECTION, key=len, reverse=True)
+)
+
+# Words joined to a heading: "& internships", "/ certifications",
+# "and training", "(2018-2024)"
+_HEADING_SUFFIX = (
+    r"(?:[ \t]*(?:&|/|\+|,|\band\b)[ \t]*[a-z]+(?:[ \t]+[a-z]+){0,2})?"
+    r"(?:[ \t]*\([^()\n]*\))?"
+)
+
+# A heading stands alone on its line, optionally after one qualifier
+# word ("Professional Summary", "Key Skills"), joined words and a colon.
+# Bullets that merely mention a heading word ("- Led projects ...") are
+# content.
+_LINE_HEADING_PATTERN = re.compile(
+    rf"^[ \t]*(?:[a-z]+[ \t]+)?({_HEADING_ALTERNATION}){_HEADING_SUFFIX}[ \t]*:?[ \t\r]*$",
+    re.MULTILINE,
+)
+
+# Fallback for text without line structure (e.g. pasted into a form)
+_INLINE_HEADING_PATTERN = re.compile(rf"\b({_HEADING_ALTERNATION})\b")
+
+
+def _find_headings(lower: str) -> List[Tuple[int, int, str]]:
+    """
+    Return (heading_start, content_start, section) in text order.
+    """
+    matches = list(_LINE_HEADING_PATTERN.finditer(lower))
+
+    # Fewer than two line headings: the text has no usable layout
+    if len({match.group(1) for match in matches}) < 2:
+        matches = list(_INLINE_HEADING_PATTERN.finditer(lower))
+
+    return [
+        (match.start(), match.end(), _HEADING_TO_SECTION[match.group(1)])
+        for match in matches
+    ]
+
+
+def segment_sections(lower: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Map each section to (start, end) offsets of its content.
+
+    A section starts after its first heading and runs until the next
+    heading of a different section (or the end of the text). Heading
+    words inside bullets do not start a section:
+
+    >>> text = "experience\\n- led projects migrating services to aws\\nprojects:\\n- resume analyzer"
+    >>> {name: text[start:end].strip() for name, (start, end) in segment_sections(text).items()}
+    {'experience': '- led projects migrating services to aws', 'projects': '- resume analyzer'}
+
+    Headings may carry joined words or a parenthetical:
+
+    >>> headings = [
+    ...     "experience & internships", "experience / internships",
+    ...     "work experience (2018-2024)", "education & certifications",
+    ...     "education and training",
+    ... ]
+    >>> [sorted(segment_sections(heading + "\\n- item\\nskills\\npython")) for heading in headings]
+    [['experience', 'skills'], ['experience', 'skills'], ['experience', 'skills'], ['education', 'skills'], ['education', 'skills']]
+    """
+    headings = _find_headings(lower)
+    sections: Dict[str, Tuple[int, int]] = {}
+
+    for index, (_, content_start, section) in enumerate(headings):
+        if section in sections:
+            continue
+
+        end = len(lower)
+        for next_start, _, next_section in headings[index + 1:]:
+            if next_section != section:
+                end = next_start
+                break
+
+        sections[section] = (content_start, end)
+
+    return sections
+
+
+class ParsedResume:
+    """
+    Normalized view of a resume shared by all analyzers.
+
+    - text        : original text
+    - lower       : lowercased text (all offsets refer to it)
+    - tokens      : whitespace tokens of `lower`
+    - sections    : {section: (start, end)}
+    - skill_spans : [(start, end, canonical_skill)]
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text = text or ""
+        self.lower = self.text.lower()
+        self.tokens = self.lower.split()
+        self.sections = segment_sections(self.lower)
+        self.skill_spans = SKILL_AUTOMATON.find_spans(self.lower)
+        self._skills: Optional[List[str]] = None
+
+    @property
+    def skills(self) -> List[str]:
+        """
+        Canonical skills, same result as extract_skills(text).
+        """
+        if self._skills is None:
+            self._skills = sorted({skill for _, _, skill in self.skill_spans})
+        return self._skills
+
+    @property
+    def word_count(self) -> int:
+        return len(self.tokens)
+
+    def has_section(self, name: str) -> bool:
+        return name in self.sections
+
+    def section(self, name: str) -> str:
+        """
+        Lowercased content of a section, "" when it is missing.
+        """
+        span = self.sections.get(name)
+        if span is None:
+            return ""
+        return self.lower[span[0]:span[1]]
+
+    def section_skills(self, name: str) -> List[str]:
+        """
+        Skills mentioned inside a section.
+        """
+        span = self.sections.get(name)
+        if span is None:
+            return []
+
+        start, end = span
+        return sorted({
+            skill for skill_start, skill_end, skill in self.skill_spans
+            if skill_start >= start and skill_end <= end
+        })
+
+
+def ensure_parsed(resume: Union[str, ParsedResume]) -> ParsedResume:
+    """
+    Accept raw text or an already built ParsedResume.
+    """
+    if isinstance(resume, ParsedResume):
+        return resume
+    return ParsedResume(resume)
@@ -0,0 +1,119 @@
+"""
+pdf_extractor.py
+
+PDF text extraction engines.
+
+pdfium (pypdfium2) extracts text without layout analysis and is much
+faster than pdfplumber on multi-page documents. It is tried first; when
+its output looks degenerate (empty, garbled or too few words) the
+document is re-extracted with pdfplumber.
+"""
+
+import re
+from typing import Optional, Tuple
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+from app.config import PDF_ENGINE
+
+MIN_WORDS_PER_PAGE = 5
+MIN_ALPHA_TOKEN_RATIO = 0.5
+MAX_GARBAGE_CHAR_RATIO = 0.05
+
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+
+def extract_with_pdfplumber(source, max_pages: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Layout-aware extraction. Returns (text, pages_read).
+    """
+    text = ""
+    with pdfplumber.open(source) as pdf:
+        pages = pdf.pages[:max_pages]
+        for page in pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text.strip(), len(pages)
+
+
+def extract_with_pdfium(source, max_pages: Optional[int] = None) -> Tuple[str, int]:
+    """
+    Fast extraction via pdfium. Returns (text, pages_read).
+    """
+    text = ""
+    pdf = pdfium.PdfDocument(source)
+    try:
+        page_count = len(pdf) if max_pages is None else min(len(pdf), max_pages)
+        for index in range(page_count):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                page_text = textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+
+            page_text = page_text.replace("\r\n", "\n").replace("\r", "\n").strip()
+            if page_text:
+                text += page_text + "\n"
+    finally:
+        pdf.close()
+
+    return text.strip(), page_count
+
+
+def looks_degenerate(text: str, pages: int) -> bool:
+    """
+    Heuristic check that fast-path output is usable.
+    """
+    if not text.strip():
+        return True
+
+    words = text.split()
+    if len(words) < MIN_WORDS_PER_PAGE * max(pages, 1):
+        return True
+
+    # Unmapped glyphs show up as "(cid:12)" or replacement / control chars
+    if _CID_PATTERN.search(text):
+        return True
+
+    garbage = sum(
+        1 for char in text
+        if char == "�" or (not char.isprintable() and char not in "\n\t")
+    )
+    if garbage / len(text) > MAX_GARBAGE_CHAR_RATIO:
+        return True
+
+    alpha_tokens = sum(1 for word in words if any(char.isalpha() for char in word))
+    return alpha_tokens / len(words) < MIN_ALPHA_TOKEN_RATIO
+
+
+def extract_pdf_text(
+    source,
+    max_pages: Optional[int] = None,
+    engine: str = PDF_ENGINE,
+) -> str:
+    """
+    Extract text from a PDF path or file-like object.
+
+    engine: "auto" (pdfium, falling back to pdfplumber), "pdfium"
+    or "pdfplumber".
+    """
+    if engine == "pdfplumber":
+        return extract_with_pdfplumber(source, max_pages)[0]
+
+    try:
+        text, pages = extract_with_pdfium(source, max_pages)
+    except Exception:
+        if engine == "pdfium":
+            raise
+        text, pages = "", 0
+
+    if engine == "pdfium" or not looks_degenerate(text, pages):
+        return text
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return extract_with_pdfplumber(source, max_pages)[0]
@@ -28,26 +28,39 @@ def parse_resume(file_path: str) -> str:
         raise ValueError("Unsupported resume format")
 """
 
-import pdfplumber
+import io
+from typing import BinaryIO, Optional, Union
+
 from docx import Document
 
-def parse_resume(file_path: str) -> str:
-    if file_path.endswith(".pdf"):
+from app.parsing.pdf_extractor import extract_pdf_text
+
+# Bump when extraction output changes, so cached parses are invalidated
+PARSER_VERSION = "2"
+
+def parse_resume(
+    source: Union[str, bytes, BinaryIO],
+    max_pages: Optional[int] = None,
+    filename: Optional[str] = None,
+) -> str:
+    """
+    Parse a resume from a file path, raw bytes or a file-like object.
+    For in-memory sources the format is taken from `filename`.
+    """
+    name = (filename or (source if isinstance(source, str) else "")).lower()
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    if name.endswith(".pdf"):
         try:
-            text = ""
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text.strip()
+            return extract_pdf_text(source, max_pages=max_pages)
         except Exception:
             # ✅ EDGE CASE: invalid / empty / corrupt PDF
             return ""
 
-    elif file_path.endswith(".docx"):
+    elif name.endswith(".docx"):
         try:
-            doc = Document(file_path)
+            doc = Document(source)
             return "\n".join(p.text for p in doc.paragraphs if p.text)
         except Exception:
             return ""
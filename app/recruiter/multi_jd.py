@@ -5,42 +5,40 @@ Recruiter-side engine to compare one resume against multiple
 job descriptions and rank best fit roles.
 """
 
-from typing import List, Dict
+from typing import List, Dict, Union
 
-from app.skills.skill_extractor import extract_skills
 from app.analysis.experience_analyzer import calculate_experience_score
 from app.analysis.project_analyzer import calculate_project_relevance_score
 from app.analysis.ats_checker import calculate_ats_format_score
-from app.role_intelligence.role_detector import (
-    detect_role,
-    calculate_role_relevance_score,
-)
+from app.role_intelligence.role_detector import calculate_role_relevance_score
 from app.analysis.final_scorer import calculate_final_ats_score
+from app.matching.compiled_jd import compile_jd
+from app.parsing.parsed_resume import ParsedResume, ensure_parsed
 
 
 def compare_resume_with_multiple_jds(
-    resume_text: str,
+    resume_text: Union[str, ParsedResume],
     jd_texts: List[Dict[str, str]],
 ) -> Dict[str, object]:
     """
     Compare one resume against multiple job descriptions.
 
     Args:
-        resume_text (str): Parsed resume text
+        resume_text (str | ParsedResume): Parsed resume text
         jd_texts (List[Dict]): [{"name": str, "text": str}]
 
     Returns:
         Dict with ranked JD comparison results
     """
 
-    resume_skills = extract_skills(resume_text)
+    parsed_resume = ensure_parsed(resume_text)
+    resume_skills = parsed_resume.skills
     results = []
 
     for jd in jd_texts:
         jd_name = jd["name"]
-        jd_text = jd["text"]
-
-        jd_skills = extract_skills(jd_text)
+        compiled_jd = compile_jd(jd["text"])
+        jd_skills = compiled_jd.skills
 
         # -------- Skill Matching --------
         matched_skills = list(set(resume_skills) & set(jd_skills))
@@ -50,19 +48,19 @@ def compare_resume_with_multiple_jds(
 
         # -------- Experience --------
         experience_result = calculate_experience_score(
-            resume_text, jd_text
+            parsed_resume, compiled_jd
         )
 
         # -------- Projects --------
         project_result = calculate_project_relevance_score(
-            resume_text, jd_skills, resume_skills
+            parsed_resume, jd_skills, resume_skills
         )
 
         # -------- ATS Format --------
-        ats_format_result = calculate_ats_format_score(resume_text)
+        ats_format_result = calculate_ats_format_score(parsed_resume)
 
         # -------- Role Intelligence --------
-        detected_role = detect_role(jd_skills)
+        detected_role = compiled_jd.detected_role
         role_result = calculate_role_relevance_score(
             resume_skills, detected_role
         )
@@ -79,7 +77,7 @@ def compare_resume_with_multiple_jds(
         results.append({
             "jd_name": jd_name,
             "role": role_result["role"],
-            "final_ats_score": final_score["final_ats_score"],
+            "final_ats_score": final_score["ats_score"],
             "breakdown": final_score["breakdown"],
         })
 
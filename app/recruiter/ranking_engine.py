@@ -5,63 +5,104 @@ Recruiter-side engine to rank multiple resumes
 against a single job description.
 """
 
+import logging
 from typing import List, Dict
 
-from app.skills.skill_extractor import extract_skills
 from app.analysis.experience_analyzer import calculate_experience_score
 from app.analysis.project_analyzer import calculate_project_relevance_score
 from app.analysis.ats_checker import calculate_ats_format_score
-from app.role_intelligence.role_detector import (
-    detect_role,
-    calculate_role_relevance_score,
-)
+from app.role_intelligence.role_detector import calculate_role_relevance_score
 from app.analysis.final_scorer import calculate_final_ats_score
+from app.matching.compiled_jd import compile_jd
+from app.matching.semantic_matcher import semantic_match_many
+from app.parsing.parsed_resume import ParsedResume
+from app.utils.profiling import timed_stage
+
+logger = logging.getLogger(__name__)
+
+
+def _match_skills(resume_skill_lists: List[List[str]], jd) -> List[Dict[str, object]]:
+    """
+    Semantic skill match of every candidate in one stacked operation;
+    exact canonical matches when the embedding model is unavailable.
+    """
+    try:
+        return semantic_match_many(resume_skill_lists, jd)
+    except Exception:
+        logger.exception("Batch semantic match failed, using exact skill matches")
+
+    jd_skills = set(jd.skills)
+    return [
+        {
+            "matched_skills": sorted(jd_skills & set(skills)),
+            "missing_skills": sorted(jd_skills - set(skills)),
+        }
+        for skills in resume_skill_lists
+    ]
 
 
 def rank_resumes_against_jd(
     resumes: List[Dict[str, str]],
     jd_text: str,
+    observer=None,
 ) -> Dict[str, object]:
     """
     Rank multiple resumes against a single job description.
 
     resumes: [{ "name": str, "text": str }]
+    observer: optional stage observer (e.g. a RequestProfiler)
     """
 
-    jd_skills = extract_skills(jd_text)
-    detected_role = detect_role(jd_skills)
+    # JD is analyzed once and shared by every candidate
+    with timed_stage(observer, "compile_jd"):
+        jd = compile_jd(jd_text)
+    jd_skills = jd.skills
+    detected_role = jd.detected_role
+
+    parsed_resumes = []
+    for resume in resumes:
+        with timed_stage(observer, "parse_resume"):
+            parsed_resumes.append(ParsedResume(resume["text"]))
+
+    # All candidates' skills are matched against the JD at once
+    with timed_stage(observer, "semantic"):
+        skill_matches = _match_skills(
+            [parsed_resume.skills for parsed_resume in parsed_resumes], jd
+        )
 
     ranked_results = []
 
-    for resume in resumes:
+    for resume, parsed_resume, skill_match in zip(resumes, parsed_resumes, skill_matches):
         resume_name = resume["name"]
-        resume_text = resume["text"]
-
-        resume_skills = extract_skills(resume_text)
+        resume_skills = parsed_resume.skills
 
         # -------- Skill score --------
-        matched_skills = list(set(resume_skills) & set(jd_skills))
+        matched_skills = skill_match["matched_skills"]
         skill_score = int(
             (len(matched_skills) / max(len(jd_skills), 1)) * 100
         )
 
         # -------- Experience --------
-        experience_result = calculate_experience_score(
-            resume_text, jd_text
-        )
+        with timed_stage(observer, "experience"):
+            experience_result = calculate_experience_score(
+                parsed_resume, jd
+            )
 
         # -------- Projects --------
-        project_result = calculate_project_relevance_score(
-            resume_text, jd_skills, resume_skills
-        )
+        with timed_stage(observer, "projects"):
+            project_result = calculate_project_relevance_score(
+                parsed_resume, jd_skills, resume_skills
+            )
 
         # -------- ATS Format --------
-        ats_format_result = calculate_ats_format_score(resume_text)
+        with timed_stage(observer, "ats_format"):
+            ats_format_result = calculate_ats_format_score(parsed_resume)
 
         # -------- Role relevance --------
-        role_result = calculate_role_relevance_score(
-            resume_skills, detected_role
-        )
+        with timed_stage(observer, "role"):
+            role_result = calculate_role_relevance_score(
+                resume_skills, detected_role
+            )
 
         # -------- Final ATS score --------
         final_score = calculate_final_ats_score(
@@ -74,10 +115,10 @@ def rank_resumes_against_jd(
 
         ranked_results.append({
             "candidate": resume_name,
-            "final_ats_score": final_score["final_ats_score"],
+            "final_ats_score": final_score["ats_score"],
             "breakdown": final_score["breakdown"],
             "matched_skills": matched_skills,
-            "missing_skills": list(set(jd_skills) - set(matched_skills)),
+            "missing_skills": skill_match["missing_skills"],
         })
 
     # Sort candidates by ATS score
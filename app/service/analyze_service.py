@@ -0,0 +1,913 @@
+"""
+analyze_service.py
+
+Analysis pipeline shared by the legacy /analyze and /api/v1/analyze
+routes.
+
+Each stage declares the context keys it reads. The engine starts a stage
+as soon as its inputs exist, so independent stages overlap:
+
+- CPU stages run on a small thread pool
+- AI stages run as async tasks on the event loop (LLM calls go through
+  the async gateway; blocking AI calls are moved to a worker thread so
+  they never occupy the CPU pool)
+
+End-to-end latency is roughly the slowest dependency chain instead of
+the sum of all stages.
+
+/api/v1/analyze has three depth tiers, each a variant of the same graph:
+
+- fast     : rule-based only (exact skill matching, no model, no LLM)
+- standard : adds embedding-based skill matching
+- deep     : adds LLM skill classification, section feedback and rewrite
+
+A field mask narrows the response further; stages that feed no
+requested field are never planned. stream_v1() yields each field as
+soon as the stages behind it finish, then the same response as
+analyze_v1().
+
+Every run carries a RequestBudget under the "budget" context key.
+Optional stages run through run_optional() and fall back to rule-based
+results when the budget runs short; the response lists them under
+"degraded_stages".
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from app.ai_engine.resume_rewrite_ai import rewrite_resume_for_jd
+from app.ai_engine.section_feedback_ai import generate_section_feedback_ai
+from app.ai_engine.skill_fallback import classify_unknown_skills, detect_unknown_skills
+from app.analysis.ats_checker import calculate_ats_format_score
+from app.analysis.experience_analyzer import (
+    calculate_experience_score,
+    extract_experience_years,
+)
+from app.analysis.final_scorer import calculate_final_ats_score
+from app.analysis.fraud_detector import detect_resume_fraud
+from app.analysis.project_analyzer import analyze_projects_core
+from app.analysis.section_analyzer import generate_section_feedback
+from app.config import (
+    AI_MIN_BUDGET_SECONDS,
+    ANALYSIS_DEFAULT_MODE,
+    PIPELINE_CPU_WORKERS,
+    SEMANTIC_MIN_BUDGET_SECONDS,
+)
+from app.matching.compiled_jd import compile_jd
+from app.matching.explainability import explain_score
+from app.matching.semantic_matcher import semantic_match
+from app.matching.weighted_scorer import calculate_ats_score
+from app.parsing.parsed_resume import ParsedResume
+from app.recommendations.engine import generate_skill_gap_recommendations
+from app.role_intelligence.role_detector import (
+    calculate_role_relevance_score,
+    detect_role,
+)
+from app.service.budget import (
+    RequestBudget,
+    request_budget_seconds,
+    run_optional,
+    run_optional_async,
+)
+from app.utils.metrics import counter, histogram
+
+logger = logging.getLogger(__name__)
+
+CPU = "cpu"
+AI = "ai"
+
+STAGE_SECONDS = histogram(
+    "analysis_stage_seconds",
+    "Wall time of each analysis pipeline stage",
+    ["pipeline", "stage", "kind"],
+)
+STAGE_ERRORS = counter(
+    "analysis_stage_errors_total",
+    "Analysis pipeline stages that raised",
+    ["pipeline", "stage", "error"],
+)
+
+
+# -----------------------------
+# Engine
+# -----------------------------
+class Stage:
+    """
+    One pipeline step.
+
+    `fn` is called with the values of `inputs` as keyword arguments and
+    its return value is stored in the context under `name`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        inputs: Sequence[str] = (),
+        kind: str = CPU,
+    ) -> None:
+        if kind not in (CPU, AI):
+            raise ValueError(f"Unknown stage kind: {kind}")
+
+        self.name = name
+        self.fn = fn
+        self.inputs = tuple(inputs)
+        self.kind = kind
+
+
+class Pipeline:
+    """
+    Dependency graph of stages, executed concurrently.
+    `name` labels the stage metrics.
+    """
+
+    def __init__(self, name: str, stages: Iterable[Stage]) -> None:
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            self.stages[stage.name] = stage
+
+    def plan(
+        self,
+        context: Dict[str, Any],
+        targets: Optional[Iterable[str]] = None,
+    ) -> List[Stage]:
+        """
+        Stages needed to produce `targets` (default: all), in dependency
+        order. Keys already present in the context are not recomputed.
+        """
+        planned: List[Stage] = []
+        visited = set()
+
+        def visit(name: str, path: frozenset) -> None:
+            if name in context or name in visited:
+                return
+
+            stage = self.stages.get(name)
+            if stage is None:
+                raise KeyError(f"No stage or input named '{name}'")
+            if name in path:
+                raise ValueError(f"Dependency cycle at stage '{name}'")
+
+            for dependency in stage.inputs:
+                visit(dependency, path | {name})
+
+            visited.add(name)
+            planned.append(stage)
+
+        for target in (targets if targets is not None else self.stages):
+            visit(target, frozenset())
+
+        return planned
+
+    def derive(
+        self,
+        name: str,
+        replace: Iterable[Stage] = (),
+        drop: Iterable[str] = (),
+    ) -> "Pipeline":
+        """
+        Copy of this pipeline with some stages swapped (matched by name)
+        or removed.
+        """
+        replacements = {stage.name: stage for stage in replace}
+        unknown = (set(replacements) | set(drop)) - set(self.stages)
+        if unknown:
+            raise KeyError(f"No stage named {sorted(unknown)}")
+
+        return Pipeline(name, [
+            replacements.get(stage.name, stage)
+            for stage in self.stages.values()
+            if stage.name not in drop
+        ])
+
+    async def run(
+        self,
+        context: Dict[str, Any],
+        targets: Optional[Iterable[str]] = None,
+        observer=None,
+        inline: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Compute `targets` into `context` and return it. Every stage starts
+        as soon as its own inputs are ready; the first failing stage
+        cancels the rest and its exception is raised.
+
+        observer : optional object with stage_finished(name, kind, wall, cpu)
+        inline   : run CPU stages on the event loop thread (for profiling)
+        """
+        planned = self.plan(context, targets)
+        if not planned:
+            return context
+
+        loop = asyncio.get_running_loop()
+        finished = {stage.name: asyncio.Event() for stage in planned}
+
+        async def execute(stage: Stage) -> None:
+            for dependency in stage.inputs:
+                if dependency in finished:
+                    await finished[dependency].wait()
+
+            kwargs = {dependency: context[dependency] for dependency in stage.inputs}
+
+            started = time.perf_counter()
+            cpu = None
+            try:
+                context[stage.name], cpu = await _call_stage(stage, kwargs, loop, inline)
+            except Exception as e:
+                STAGE_ERRORS.inc(self.name, stage.name, type(e).__name__)
+                raise
+            finally:
+                wall = time.perf_counter() - started
+                STAGE_SECONDS.observe(wall, self.name, stage.name, stage.kind)
+                if observer is not None:
+                    observer.stage_finished(stage.name, stage.kind, wall, cpu)
+
+            finished[stage.name].set()
+
+        tasks = [asyncio.create_task(execute(stage)) for stage in planned]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return context
+
+
+def _run_timed(fn: Callable, kwargs: Dict[str, Any]) -> Tuple[Any, float]:
+    # CPU time of the thread that actually runs the stage
+    cpu_started = time.thread_time()
+    result = fn(**kwargs)
+    return result, time.thread_time() - cpu_started
+
+
+async def _call_stage(
+    stage: Stage,
+    kwargs: Dict[str, Any],
+    loop,
+    inline: bool,
+) -> Tuple[Any, Optional[float]]:
+    """
+    Run one stage and return (result, cpu_seconds or None).
+    """
+    if asyncio.iscoroutinefunction(stage.fn):
+        return await stage.fn(**kwargs), None
+
+    if stage.kind == AI:
+        # Blocking network call: keep it off the CPU pool
+        return await asyncio.to_thread(_run_timed, stage.fn, kwargs)
+
+    if inline:
+        return _run_timed(stage.fn, kwargs)
+
+    return await loop.run_in_executor(
+        get_cpu_executor(), functools.partial(_run_timed, stage.fn, kwargs)
+    )
+
+
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor_lock = threading.Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    global _cpu_executor
+
+    if _cpu_executor is None:
+        with _cpu_executor_lock:
+            if _cpu_executor is None:
+                _cpu_executor = ThreadPoolExecutor(
+                    max_workers=max(1, PIPELINE_CPU_WORKERS),
+                    thread_name_prefix="analysis",
+                )
+
+    return _cpu_executor
+
+
+def shutdown_pipeline_executor() -> None:
+    global _cpu_executor
+
+    # A later lifespan (or a second TestClient) gets a fresh pool
+    with _cpu_executor_lock:
+        executor = _cpu_executor
+        _cpu_executor = None
+
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# -----------------------------
+# Shared stages
+# -----------------------------
+def _parse_resume(resume_text: str) -> ParsedResume:
+    return ParsedResume(resume_text)
+
+
+def _compile_jd(jd_text: str):
+    return compile_jd(jd_text)
+
+
+def _experience(resume, jd) -> dict:
+    return calculate_experience_score(resume, jd)
+
+
+def _projects(resume, resume_skills, jd) -> dict:
+    return analyze_projects_core(
+        resume_text=resume,
+        resume_skills=resume_skills,
+        jd_skills=jd.skills,
+    )
+
+
+def _ats_format(resume) -> dict:
+    return calculate_ats_format_score(resume)
+
+
+def _exact_match(resume_skills, jd) -> dict:
+    """
+    Rule-based stand-in for semantic_match: canonical skills only
+    match themselves.
+    """
+    resume_set = {skill.lower() for skill in resume_skills}
+    matched = sorted(skill for skill in jd.skills if skill.lower() in resume_set)
+
+    return {
+        "matched_skills": matched,
+        "missing_skills": sorted(set(jd.skills) - set(matched)),
+        "best_matches": {
+            skill: {"resume_skill": skill, "score": 1.0} for skill in matched
+        },
+    }
+
+
+def _semantic(resume_skills, jd, budget) -> dict:
+    return run_optional(
+        budget, "semantic", semantic_match, _exact_match, resume_skills, jd,
+        min_seconds=SEMANTIC_MIN_BUDGET_SECONDS,
+    )["result"]
+
+
+def _empty_classification(unknown_skills) -> dict:
+    return {}
+
+
+# -----------------------------
+# /api/v1/analyze
+# -----------------------------
+async def _v1_skill_classification(resume, jd, budget) -> dict:
+    # AI fallback for unknown skills
+    unknown = list(set(resume.skills) - set(jd.skills))
+    if not unknown:
+        return {}
+
+    return (await run_optional_async(
+        budget, "skill_classification", classify_unknown_skills, _empty_classification,
+        unknown, min_seconds=AI_MIN_BUDGET_SECONDS,
+    ))["result"]
+
+
+def _no_skill_classification(resume, jd) -> dict:
+    return {}
+
+
+def _v1_resume_skills(resume, skill_classification) -> List[str]:
+    return list(set(list(resume.skills) + list(skill_classification)))
+
+
+def _v1_resume_match_score(semantic, jd) -> int:
+    return int((len(semantic["matched_skills"]) / max(len(jd.skills), 1)) * 100)
+
+
+def _v1_detected_role(resume_text: str) -> str:
+    return detect_role(resume_text)  # STRING
+
+
+def _v1_role(resume_skills, detected_role) -> dict:
+    return calculate_role_relevance_score(
+        resume_skills=resume_skills,
+        detected_role=detected_role,
+    )
+
+
+def _v1_fraud(resume_text, experience) -> dict:
+    return detect_resume_fraud(resume_text, experience.get("resume_years", 0))
+
+
+def _v1_final_ats(resume_match_score, experience, projects, ats_format, role) -> dict:
+    return calculate_final_ats_score(
+        skill_score=resume_match_score,
+        experience_score=experience.get("experience_score", 0),
+        project_score=projects.get("project_score", 0),
+        ats_format_score=ats_format["ats_format_score"],
+        role_score=role["role_score"],
+    )
+
+
+async def _v1_ai_feedback(resume, jd, budget) -> dict:
+    def rule_based(resume, jd):
+        return generate_section_feedback(resume, jd.skills)
+
+    # The parsed documents let the prompt compaction reuse their
+    # sections and skill spans
+    return (await run_optional_async(
+        budget, "ai_feedback", generate_section_feedback_ai, rule_based,
+        resume, jd, min_seconds=AI_MIN_BUDGET_SECONDS,
+    ))["result"]
+
+
+def _empty_rewrite(resume, jd) -> dict:
+    # No rule-based rewrite exists; keep the response shape
+    return {"summary": "", "experience": [], "projects": []}
+
+
+async def _v1_ai_improved(resume, jd, budget) -> dict:
+    return (await run_optional_async(
+        budget, "ai_improved", rewrite_resume_for_jd, _empty_rewrite,
+        resume, jd, min_seconds=AI_MIN_BUDGET_SECONDS,
+    ))["result"]
+
+
+V1_PIPELINE = Pipeline("v1", [
+    Stage("resume", _parse_resume, ["resume_text"]),
+    Stage("jd", _compile_jd, ["jd_text"]),
+    Stage("skill_classification", _v1_skill_classification, ["resume", "jd", "budget"], kind=AI),
+    Stage("resume_skills", _v1_resume_skills, ["resume", "skill_classification"]),
+    Stage("semantic", _semantic, ["resume_skills", "jd", "budget"]),
+    Stage("resume_match_score", _v1_resume_match_score, ["semantic", "jd"]),
+    Stage("experience", _experience, ["resume", "jd"]),
+    Stage("projects", _projects, ["resume", "resume_skills", "jd"]),
+    Stage("ats_format", _ats_format, ["resume"]),
+    Stage("detected_role", _v1_detected_role, ["resume_text"]),
+    Stage("role", _v1_role, ["resume_skills", "detected_role"]),
+    Stage("fraud", _v1_fraud, ["resume_text", "experience"]),
+    Stage(
+        "final_ats",
+        _v1_final_ats,
+        ["resume_match_score", "experience", "projects", "ats_format", "role"],
+    ),
+    Stage(
+        "ai_feedback",
+        _v1_ai_feedback,
+        ["resume", "jd", "budget"],
+        kind=AI,
+    ),
+    Stage("ai_improved", _v1_ai_improved, ["resume", "jd", "budget"], kind=AI),
+])
+
+
+V1_PIPELINES = {
+    "fast": V1_PIPELINE.derive(
+        "v1_fast",
+        replace=[
+            Stage("skill_classification", _no_skill_classification, ["resume", "jd"]),
+            Stage("semantic", _exact_match, ["resume_skills", "jd"]),
+        ],
+        drop=["ai_feedback", "ai_improved"],
+    ),
+    "standard": V1_PIPELINE.derive(
+        "v1_standard",
+        replace=[Stage("skill_classification", _no_skill_classification, ["resume", "jd"])],
+        drop=["ai_feedback", "ai_improved"],
+    ),
+    "deep": V1_PIPELINE,
+}
+
+ANALYSIS_MODES = tuple(V1_PIPELINES)
+
+
+def _skills_field(ctx) -> dict:
+    return {
+        "matched": ctx["semantic"]["matched_skills"],
+        "missing": ctx["semantic"]["missing_skills"],
+        "must_have": ctx["jd"].must_have,
+        "good_to_have": ctx["jd"].good_to_have,
+    }
+
+
+def _skill_coverage_field(ctx) -> dict:
+    return {
+        "matched_percentage": ctx["resume_match_score"],
+        "missing_percentage": 100 - ctx["resume_match_score"],
+    }
+
+
+# Response field -> (stages it reads, builder), in response order
+V1_FIELDS: Dict[str, Tuple[Tuple[str, ...], Callable[[Dict[str, Any]], Any]]] = {
+    "ats_score": (("final_ats",), lambda ctx: ctx["final_ats"]["ats_score"]),
+    "resume_match_score": (("resume_match_score",), lambda ctx: ctx["resume_match_score"]),
+    "detected_role": (("detected_role",), lambda ctx: ctx["detected_role"]),
+    "skills": (("semantic", "jd"), _skills_field),
+    "experience": (("experience",), lambda ctx: ctx["experience"]),
+    "projects": (("projects",), lambda ctx: ctx["projects"]),
+    "fraud_report": (("fraud",), lambda ctx: ctx["fraud"]),
+    "skill_coverage": (("resume_match_score",), _skill_coverage_field),
+    "ai_insights": (("ai_feedback",), lambda ctx: ctx["ai_feedback"]),
+    "ai_resume_improvements": (("ai_improved",), lambda ctx: ctx["ai_improved"]),
+}
+
+
+class InvalidAnalysisOptions(ValueError):
+    """
+    Unknown mode or field, or a field the mode cannot produce.
+    """
+
+
+def _available_fields(mode: str) -> List[str]:
+    stages = V1_PIPELINES[mode].stages
+    return [
+        field for field, (needs, _) in V1_FIELDS.items()
+        if all(stage in stages for stage in needs)
+    ]
+
+
+def resolve_v1_options(mode: object = None, fields: object = None) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Validate the requested mode and comma-separated field mask.
+
+    Returns (mode, fields) with fields in response order. Non-string
+    values (unresolved FastAPI defaults when a route is called
+    directly) mean "not set".
+    """
+    if isinstance(mode, str) and mode.strip():
+        mode = mode.strip().lower()
+    else:
+        mode = ANALYSIS_DEFAULT_MODE
+
+    if mode not in V1_PIPELINES:
+        raise InvalidAnalysisOptions(
+            f"Unknown mode '{mode}' (expected one of: {', '.join(ANALYSIS_MODES)})"
+        )
+
+    available = _available_fields(mode)
+    if not isinstance(fields, str) or not fields.strip():
+        return mode, tuple(available)
+
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(V1_FIELDS)
+    if unknown:
+        raise InvalidAnalysisOptions(f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+    unavailable = requested - set(available)
+    if unavailable:
+        raise InvalidAnalysisOptions(
+            f"Field(s) {', '.join(sorted(unavailable))} are not produced in mode '{mode}'"
+        )
+
+    return mode, tuple(field for field in V1_FIELDS if field in requested)
+
+
+def v1_cache_name(mode: str, fields: Sequence[str]) -> str:
+    """
+    Result cache namespace for a (mode, field mask) pair.
+    """
+    if list(fields) == _available_fields(mode):
+        return f"v1-{mode}"
+    return f"v1-{mode}-" + "+".join(fields)
+
+
+async def analyze_v1(
+    resume_text: str,
+    jd_text: str,
+    profiler=None,
+    mode: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    budget: Optional[RequestBudget] = None,
+) -> Dict[str, Any]:
+    """
+    Single resume vs single JD analysis for /api/v1/analyze.
+
+    Only the stages behind `fields` (default: all fields of the mode)
+    run. With a profiler, CPU stages run inline and report their
+    timings to it. `budget` defaults to ANALYSIS_BUDGET_SECONDS from now.
+    """
+    mode, fields, budget = _v1_defaults(mode, fields, budget)
+
+    ctx = await V1_PIPELINES[mode].run(
+        {"resume_text": resume_text, "jd_text": jd_text, "budget": budget},
+        targets=_v1_targets(fields),
+        observer=profiler,
+        inline=profiler is not None,
+    )
+
+    return _v1_response(ctx, fields, budget)
+
+
+class _StageQueue:
+    """
+    Pipeline observer that queues the name of every finished stage.
+    """
+
+    def __init__(self) -> None:
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    def stage_finished(self, name, kind, wall, cpu) -> None:
+        self.queue.put_nowait(name)
+
+
+async def stream_v1(
+    resume_text: str,
+    jd_text: str,
+    mode: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    budget: Optional[RequestBudget] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    analyze_v1() as a stream of (event, data) pairs:
+
+    - ("field", {"field": name, "value": value}) as soon as every stage
+      behind a field has finished; rule-based fields come out first,
+      LLM-backed ones last
+    - ("result", response) once, at the end: exactly what analyze_v1()
+      returns for the same run
+
+    Closing the iterator cancels the stages still running.
+    """
+    mode, fields, budget = _v1_defaults(mode, fields, budget)
+
+    ctx = {"resume_text": resume_text, "jd_text": jd_text, "budget": budget}
+    stages = _StageQueue()
+    run = asyncio.create_task(
+        V1_PIPELINES[mode].run(ctx, targets=_v1_targets(fields), observer=stages)
+    )
+    run.add_done_callback(lambda _: stages.queue.put_nowait(None))
+
+    pending = list(fields)
+    try:
+        while pending:
+            stage = await stages.queue.get()
+
+            ready = [
+                field for field in pending
+                if all(needed in ctx for needed in V1_FIELDS[field][0])
+            ]
+            for field in ready:
+                pending.remove(field)
+                yield "field", {"field": field, "value": V1_FIELDS[field][1](ctx)}
+
+            if stage is None:
+                break
+
+        # Raises the failing stage's exception, if any
+        await run
+        yield "result", _v1_response(ctx, fields, budget)
+    finally:
+        if not run.done():
+            run.cancel()
+            await asyncio.gather(run, return_exceptions=True)
+
+
+def _v1_defaults(mode, fields, budget):
+    mode = mode or ANALYSIS_DEFAULT_MODE
+    if fields is None:
+        fields = _available_fields(mode)
+    if budget is None:
+        budget = RequestBudget(request_budget_seconds())
+    return mode, fields, budget
+
+
+def _v1_targets(fields: Sequence[str]) -> List[str]:
+    return sorted({stage for field in fields for stage in V1_FIELDS[field][0]})
+
+
+def _v1_response(ctx: Dict[str, Any], fields: Sequence[str], budget: RequestBudget) -> Dict[str, Any]:
+    return {
+        **{field: V1_FIELDS[field][1](ctx) for field in fields},
+        "degraded_stages": budget.degraded,
+    }
+
+
+# -----------------------------
+# Legacy /analyze
+# -----------------------------
+async def _legacy_skill_classification(resume, jd, budget):
+    unknown_resume_skills = detect_unknown_skills(list(resume.skills), jd.skills)
+    return (await run_optional_async(
+        budget, "skill_classification", classify_unknown_skills, _empty_classification,
+        unknown_resume_skills, min_seconds=AI_MIN_BUDGET_SECONDS,
+    ))["result"]
+
+
+def _legacy_resume_skills(resume, skill_classification) -> List[str]:
+    resume_skills = list(resume.skills)
+
+    # Merge AI-detected skills (dicts or plain strings)
+    for item in skill_classification:
+        if isinstance(item, dict):
+            skill_name = item.get("skill")
+        elif isinstance(item, str):
+            skill_name = item
+        else:
+            continue
+
+        if skill_name and skill_name not in resume_skills:
+            resume_skills.append(skill_name)
+
+    return resume_skills
+
+
+def _legacy_skill_match(resume_skills, jd, semantic) -> dict:
+    rule_matches = set(resume_skills) & set(jd.skills)
+    semantic_matches = set(semantic["matched_skills"])
+
+    final_matched = sorted(rule_matches | semantic_matches)
+    final_missing = sorted(set(jd.skills) - set(final_matched))
+
+    return {
+        "rule_matches": rule_matches,
+        "semantic_matches": semantic_matches,
+        "matched": final_matched,
+        "missing": final_missing,
+    }
+
+
+def _legacy_recommendations(skill_match) -> dict:
+    return generate_skill_gap_recommendations(skill_match["missing"])
+
+
+def _legacy_skill_score(skill_match, jd) -> int:
+    # JD coverage; also reported as resume_match_score
+    if not jd.skills:
+        return 0
+    return round((len(skill_match["matched"]) / len(jd.skills)) * 100)
+
+
+def _legacy_role(resume_skills, jd) -> dict:
+    return calculate_role_relevance_score(
+        resume_skills=resume_skills,
+        detected_role=jd.detected_role,
+    )
+
+
+def _legacy_weighted_ats(skill_match, jd) -> int:
+    return calculate_ats_score(skill_match["matched"], jd.must_have, jd.good_to_have)
+
+
+def _legacy_explanation(skill_match, jd, weighted_ats) -> List[str]:
+    score_explanation = explain_score(
+        skill_match["matched"], jd.must_have, jd.good_to_have
+    )
+    if weighted_ats == 0:
+        score_explanation.append("No must-have skills matched")
+    return score_explanation
+
+
+async def _legacy_section_feedback(resume, jd, budget) -> dict:
+    def rule_based(resume, jd):
+        return generate_section_feedback(resume, jd.skills)
+
+    return await run_optional_async(
+        budget, "section_feedback", generate_section_feedback_ai, rule_based,
+        resume=resume, jd=jd, min_seconds=AI_MIN_BUDGET_SECONDS,
+    )
+
+
+def _legacy_fraud(resume, resume_skills) -> dict:
+    years_of_experience = extract_experience_years(resume)
+    return detect_resume_fraud(resume_skills, years_of_experience)
+
+
+def _legacy_final_ats(skill_score, experience, projects, ats_format, role) -> dict:
+    return calculate_final_ats_score(
+        skill_score=skill_score,
+        experience_score=experience.get("experience_score", 0),
+        project_score=projects["project_score"],
+        ats_format_score=ats_format["ats_format_score"],
+        role_score=role["role_score"],
+    )
+
+
+LEGACY_PIPELINE = Pipeline("legacy", [
+    Stage("resume", _parse_resume, ["resume_text"]),
+    Stage("jd", _compile_jd, ["jd_text"]),
+    Stage(
+        "skill_classification",
+        _legacy_skill_classification,
+        ["resume", "jd", "budget"],
+        kind=AI,
+    ),
+    Stage("resume_skills", _legacy_resume_skills, ["resume", "skill_classification"]),
+    Stage("semantic", _semantic, ["resume_skills", "jd", "budget"]),
+    Stage("skill_match", _legacy_skill_match, ["resume_skills", "jd", "semantic"]),
+    Stage("recommendations", _legacy_recommendations, ["skill_match"]),
+    Stage("skill_score", _legacy_skill_score, ["skill_match", "jd"]),
+    Stage("experience", _experience, ["resume", "jd"]),
+    Stage("projects", _projects, ["resume", "resume_skills", "jd"]),
+    Stage("ats_format", _ats_format, ["resume"]),
+    Stage("role", _legacy_role, ["resume_skills", "jd"]),
+    Stage("weighted_ats", _legacy_weighted_ats, ["skill_match", "jd"]),
+    Stage("score_explanation", _legacy_explanation, ["skill_match", "jd", "weighted_ats"]),
+    Stage(
+        "section_feedback",
+        _legacy_section_feedback,
+        ["resume", "jd", "budget"],
+        kind=AI,
+    ),
+    Stage("fraud", _legacy_fraud, ["resume", "resume_skills"]),
+    Stage(
+        "final_ats",
+        _legacy_final_ats,
+        ["skill_score", "experience", "projects", "ats_format", "role"],
+    ),
+])
+
+
+async def analyze_legacy(resume_text: str, jd_text: str) -> Dict[str, Any]:
+    """
+    Single resume vs single JD analysis for the legacy /analyze route.
+    """
+    budget = RequestBudget(request_budget_seconds())
+    ctx = {"resume_text": resume_text, "jd_text": jd_text, "budget": budget}
+
+    # Phase 1: the cheap checks that can end the request early. AI skill
+    # classification only adds skills when the resume already has some,
+    # so an empty resume skill list is known without calling it.
+    await LEGACY_PIPELINE.run(ctx, ["resume", "jd"])
+    resume, jd = ctx["resume"], ctx["jd"]
+
+    if not resume.skills and not jd.skills:
+        return {
+            "error": "No skills detected in resume and job description",
+            "resume_skills": [],
+            "jd_skills": [],
+            "ats_score": 0,
+            "score_explanation": [
+                "Neither resume nor job description contains recognizable skills"
+            ]
+        }
+
+    if not resume.skills:
+        return {
+            "error": "No skills detected in resume",
+            "resume_skills": [],
+            "jd_skills": list(jd.skills),
+            "ats_score": 0,
+            "score_explanation": [
+                "Resume does not contain recognizable skills"
+            ]
+        }
+
+    if not jd.skills:
+        await LEGACY_PIPELINE.run(ctx, ["resume_skills"])
+        return {
+            "error": "No skills detected in job description",
+            "resume_skills": ctx["resume_skills"],
+            "jd_skills": [],
+            "ats_score": 0,
+            "score_explanation": [
+                "Job description does not contain recognizable skills"
+            ]
+        }
+
+    # Phase 2: everything else, concurrently
+    await LEGACY_PIPELINE.run(ctx)
+
+    skill_match = ctx["skill_match"]
+    section_feedback = ctx["section_feedback"]
+    final_ats = ctx["final_ats"]
+
+    logger.debug("Final ATS: %s", final_ats)
+
+    return {
+        "resume_match_score": ctx["skill_score"],
+        "resume_skills": ctx["resume_skills"],
+        "jd_skills": list(jd.skills),
+        "matched_skills": skill_match["matched"],
+        "missing_skills": skill_match["missing"],
+
+        "skill_gap_recommendations": ctx["recommendations"],
+        "section_feedback": {
+            "rule_based": section_feedback,
+            "ai_based": section_feedback
+        },
+        "must_have_skills": jd.must_have,
+        "good_to_have_skills": jd.good_to_have,
+        "ats_score": final_ats["ats_score"],
+        "score_explanation": ctx["score_explanation"],
+
+        "fraud_report": ctx["fraud"],
+        "degraded_stages": budget.degraded,
+
+        "_debug": {
+            "rule_matches_count": len(skill_match["rule_matches"]),
+            "semantic_matches_count": len(skill_match["semantic_matches"])
+        }
+    }
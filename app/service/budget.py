@@ -0,0 +1,161 @@
+"""
+budget.py
+
+Per-request latency budget.
+
+A RequestBudget is created when the request arrives and travels through
+the analysis pipeline as the "budget" context key. Required stages only
+read it; optional stages (LLM feedback, rewrite, skill classification,
+semantic matching) go through run_optional(), which:
+
+- skips the stage when less than `min_seconds` is left
+- otherwise runs it via ai_safe_execute with the remaining time as
+  timeout (run_optional_async / ai_safe_execute_async for coroutine
+  functions such as the LLM engines)
+
+and in both cases, or on any error, serves the rule-based fallback and
+records the stage as degraded.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.ai_engine.ai_guard import ai_safe_execute, ai_safe_execute_async
+from app.config import ANALYSIS_BUDGET_SECONDS
+from app.utils.metrics import counter
+
+SKIPPED = "skipped"
+TIMEOUT = "timeout"
+ERROR = "error"
+
+DEGRADED_STAGES = counter(
+    "analysis_degraded_stages_total",
+    "Optional stages served by their fallback",
+    ["stage", "reason"],
+)
+
+
+class RequestBudget:
+    """
+    Deadline of one request plus the stages degraded to meet it.
+    `seconds=None` means no deadline.
+    """
+
+    def __init__(self, seconds: Optional[float] = None) -> None:
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds if seconds is not None else None
+        self._degraded: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left (may be negative), None without a deadline.
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def degrade(self, stage: str, reason: str, detail: str = "") -> None:
+        DEGRADED_STAGES.inc(stage, reason)
+        with self._lock:
+            self._degraded.append({"stage": stage, "reason": reason, "detail": detail})
+
+    @property
+    def degraded(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return list(self._degraded)
+
+
+def request_budget_seconds(budget_ms: object = None) -> Optional[float]:
+    """
+    Budget for a request: ANALYSIS_BUDGET_SECONDS, optionally tightened
+    by the client's `budget_ms`. Clients can shorten the budget but not
+    extend it. None means no deadline.
+    """
+    default = ANALYSIS_BUDGET_SECONDS if ANALYSIS_BUDGET_SECONDS > 0 else None
+
+    # Non-numeric values (unresolved FastAPI defaults) count as not set
+    if isinstance(budget_ms, bool) or not isinstance(budget_ms, (int, float, str)):
+        return default
+    try:
+        requested = float(budget_ms) / 1000
+    except ValueError:
+        return default
+    if requested <= 0:
+        return default
+
+    return requested if default is None else min(requested, default)
+
+
+def run_optional(
+    budget: RequestBudget,
+    stage: str,
+    function: Callable,
+    fallback: Callable,
+    *args,
+    min_seconds: float = 0.0,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    Run an optional stage within the budget, falling back to the
+    rule-based result when it is skipped, times out or fails.
+
+    Returns the ai_safe_execute outcome ({"used_ai", "result", ...}).
+    """
+    remaining = budget.remaining()
+
+    skipped = _skip(budget, stage, remaining, min_seconds, fallback, args, kwargs)
+    if skipped is not None:
+        return skipped
+
+    outcome = ai_safe_execute(function, fallback, *args, timeout=remaining, **kwargs)
+    _record(budget, stage, outcome)
+    return outcome
+
+
+async def run_optional_async(
+    budget: RequestBudget,
+    stage: str,
+    function: Callable,
+    fallback: Callable,
+    *args,
+    min_seconds: float = 0.0,
+    **kwargs,
+) -> Dict[str, Any]:
+    """
+    run_optional for a coroutine `function`; `fallback` stays synchronous.
+    """
+    remaining = budget.remaining()
+
+    skipped = _skip(budget, stage, remaining, min_seconds, fallback, args, kwargs)
+    if skipped is not None:
+        return skipped
+
+    outcome = await ai_safe_execute_async(function, fallback, *args, timeout=remaining, **kwargs)
+    _record(budget, stage, outcome)
+    return outcome
+
+
+def _skip(budget, stage, remaining, min_seconds, fallback, args, kwargs) -> Optional[Dict[str, Any]]:
+    if remaining is None or remaining >= min_seconds:
+        return None
+
+    detail = f"{max(remaining, 0.0):.2f}s left, needs {min_seconds:.2f}s"
+    budget.degrade(stage, SKIPPED, detail)
+    return {
+        "used_ai": False,
+        "fallback_reason": f"skipped: {detail}",
+        "timed_out": False,
+        "result": fallback(*args, **kwargs),
+    }
+
+
+def _record(budget: RequestBudget, stage: str, outcome: Dict[str, Any]) -> None:
+    if not outcome["used_ai"]:
+        reason = TIMEOUT if outcome["timed_out"] else ERROR
+        budget.degrade(stage, reason, outcome["fallback_reason"])
@@ -0,0 +1,70 @@
+"""
+readiness.py
+
+Startup warmup and readiness tracking.
+Records cold-start and time-to-first-analysis so they can be compared
+across releases.
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.matching import semantic_matcher
+from app.parsing.parse_cache import parse_cache_stats
+
+# Import time of the app package, close enough to process start
+STARTED_AT = time.perf_counter()
+
+_state: Dict[str, Optional[float]] = {
+    "warmup_started": None,
+    "ready_at": None,
+    "first_analysis_at": None,
+}
+_warmup_error: Optional[str] = None
+
+
+async def run_warmup() -> None:
+    """
+    Load the model and caches off the event loop.
+    """
+    global _warmup_error
+
+    _state["warmup_started"] = time.perf_counter()
+    try:
+        await asyncio.to_thread(semantic_matcher.warmup)
+        _state["ready_at"] = time.perf_counter()
+    except Exception as e:
+        _warmup_error = str(e)
+
+
+def mark_analysis_done() -> None:
+    """
+    Record the first completed analysis after startup.
+    """
+    if _state["first_analysis_at"] is None:
+        _state["first_analysis_at"] = time.perf_counter()
+
+
+def _since_start(key: str) -> Optional[float]:
+    value = _state[key]
+    return round(value - STARTED_AT, 3) if value is not None else None
+
+
+def is_ready() -> bool:
+    # Without startup warmup the model may still have been loaded lazily
+    return (
+        _state["ready_at"] is not None
+        or semantic_matcher.model_status()["model_loaded"]
+    )
+
+
+def readiness_report() -> Dict[str, object]:
+    return {
+        "ready": is_ready(),
+        "warmup_error": _warmup_error,
+        "cold_start_seconds": _since_start("ready_at"),
+        "time_to_first_analysis_seconds": _since_start("first_analysis_at"),
+        "semantic_matcher": semantic_matcher.model_status(),
+        "parse_cache": parse_cache_stats(),
+    }
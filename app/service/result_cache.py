@@ -0,0 +1,258 @@
+"""
+result_cache.py
+
+Cache of complete analysis results.
+
+Keyed by the pipeline name, a scoring config version and the hashes of
+the normalized JD and resume text:
+
+    <pipeline>:<config_version>:<jd_hash>:<resume_hash>
+
+The config version covers the final score weights, the skill taxonomy
+(including skills promoted at runtime), the embedding model and the LLM
+prompts, so changing any of them makes
+old entries unreachable (they age out through TTL / size eviction).
+
+Backends (RESULT_CACHE_BACKEND):
+
+- memory : in-process LRU
+- sqlite : memory LRU in front of a local sqlite file
+- off    : caching disabled
+"""
+
+import hashlib
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.ai_engine import prompts
+from app.ai_engine.context_compactor import COMPACTOR_VERSION
+from app.analysis.final_scorer import WEIGHTS
+from app.config import (
+    CONTEXT_COMPACTION_ENABLED,
+    EMBEDDING_MODEL_NAME,
+    FEEDBACK_PROMPT_MAX_TOKENS,
+    RESULT_CACHE_BACKEND,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_MEMORY_ITEMS,
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_TTL_SECONDS,
+    REWRITE_PROMPT_MAX_TOKENS,
+)
+from app.matching.taxonomy_embeddings import taxonomy_terms, taxonomy_version
+from app.skills.skill_extractor import promoted_taxonomy_digest
+from app.utils.cache import MemoryLRU, SqliteCache, TieredCache
+from app.utils.metrics import counter, register_cache_stats
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of a cached result changes
+RESULT_SCHEMA_VERSION = "1"
+
+_TRUTHY = ("1", "true", "yes", "on")
+
+_LINE_SPACE_PATTERN = re.compile(r"[ \t\f\v]+")
+
+RESULT_CACHE_BYPASSES = counter(
+    "result_cache_bypass_total",
+    "Analysis requests that skipped the result cache lookup",
+    ["pipeline"],
+)
+RESULT_CACHE_SKIPPED_WRITES = counter(
+    "result_cache_skipped_writes_total",
+    "Analysis results not cached because an AI stage degraded",
+    ["pipeline"],
+)
+
+
+def _build_backend() -> Optional[TieredCache]:
+    backend = RESULT_CACHE_BACKEND.strip().lower()
+    if backend == "off":
+        return None
+
+    memory = MemoryLRU(
+        max_items=RESULT_CACHE_MEMORY_ITEMS,
+        ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+    )
+    if backend == "memory":
+        return TieredCache(memory=memory)
+    if backend == "sqlite":
+        return TieredCache(
+            memory=memory,
+            disk=SqliteCache(
+                RESULT_CACHE_PATH,
+                max_bytes=RESULT_CACHE_MAX_BYTES,
+                ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+                table="analysis_results",
+            ),
+        )
+
+    raise ValueError(f"Unknown RESULT_CACHE_BACKEND: {RESULT_CACHE_BACKEND!r}")
+
+
+result_cache = _build_backend()
+
+
+# -----------------------------
+# Keys
+# -----------------------------
+def normalize_text(text: str) -> str:
+    """
+    Drop formatting noise that does not change the analysis: line
+    endings, runs of spaces/tabs, surrounding and blank lines.
+    Line structure is kept (section detection depends on it).
+    """
+    lines = (
+        _LINE_SPACE_PATTERN.sub(" ", line).strip()
+        for line in (text or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    )
+    return "\n".join(line for line in lines if line)
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def config_version() -> str:
+    """
+    Stamp of everything besides the inputs that changes a result.
+    """
+    return _config_version(promoted_taxonomy_digest())
+
+
+@lru_cache(maxsize=4)
+def _config_version(promoted_digest: str) -> str:
+    prompt_digest = hashlib.sha256()
+    for name in sorted(vars(prompts)):
+        value = getattr(prompts, name)
+        if name.isupper() and isinstance(value, str):
+            prompt_digest.update(f"{name}\n{value}\n".encode("utf-8"))
+
+    stamp = json.dumps({
+        "schema": RESULT_SCHEMA_VERSION,
+        "weights": WEIGHTS,
+        "taxonomy": taxonomy_version(taxonomy_terms(), EMBEDDING_MODEL_NAME),
+        "promoted_skills": promoted_digest,
+        "prompts": prompt_digest.hexdigest(),
+        "compaction": [
+            COMPACTOR_VERSION if CONTEXT_COMPACTION_ENABLED else None,
+            FEEDBACK_PROMPT_MAX_TOKENS,
+            REWRITE_PROMPT_MAX_TOKENS,
+        ],
+    }, sort_keys=True)
+
+    return hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:16]
+
+
+def result_cache_key(pipeline: str, resume_text: str, jd_text: str) -> str:
+    return f"{pipeline}:{config_version()}:{text_digest(jd_text)}:{text_digest(resume_text)}"
+
+
+# -----------------------------
+# Bypass
+# -----------------------------
+def bypass_requested(cache_control: Optional[str], refresh: object = None) -> bool:
+    """
+    True for "Cache-Control: no-cache" / "no-store" or a truthy
+    `refresh` form field. Non-string / non-bool values (unresolved
+    FastAPI defaults when a route is called directly) count as not set.
+    """
+    if isinstance(cache_control, str):
+        directives = {part.strip().lower() for part in cache_control.split(",")}
+        if directives & {"no-cache", "no-store"}:
+            return True
+    if isinstance(refresh, str):
+        return refresh.strip().lower() in _TRUTHY
+    return refresh is True
+
+
+# -----------------------------
+# Lookup / store
+# -----------------------------
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def get_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    if result_cache is None:
+        return None
+
+    payload = result_cache.get(key)
+    if payload is None:
+        return None
+    return json.loads(payload)
+
+
+def _degraded(result: Dict[str, Any]) -> bool:
+    """
+    Results built from fallbacks (budget ran short, LLM failed) or from
+    an unparseable LLM answer are not worth pinning for a whole TTL;
+    the next request should try again.
+    """
+    if result.get("degraded_stages"):
+        return True
+
+    improvements = result.get("ai_resume_improvements")
+    if isinstance(improvements, dict) and "error" in improvements:
+        return True
+
+    feedback = result.get("ai_insights")
+    if isinstance(feedback, dict):
+        for section in feedback.values():
+            if isinstance(section, dict) and "LLM parse failed" in section.get("issues", []):
+                return True
+
+    return False
+
+
+def store_result(pipeline: str, key: str, result: Dict[str, Any]) -> bool:
+    if result_cache is None:
+        return False
+
+    if _degraded(result):
+        RESULT_CACHE_SKIPPED_WRITES.inc(pipeline)
+        return False
+
+    result_cache.set(key, json.dumps(result, default=_json_default))
+    return True
+
+
+def record_bypass(pipeline: str) -> None:
+    RESULT_CACHE_BYPASSES.inc(pipeline)
+
+
+# -----------------------------
+# Invalidation
+# -----------------------------
+def invalidate_results(
+    resume_text: Optional[str] = None,
+    jd_text: Optional[str] = None,
+    pipeline: str = "*",
+) -> int:
+    """
+    Drop cached results for a resume, a JD, a pair, or everything
+    (no arguments). Matches every config version. Returns the number
+    of entries removed.
+    """
+    if result_cache is None:
+        return 0
+
+    jd_part = text_digest(jd_text) if jd_text else "*"
+    resume_part = text_digest(resume_text) if resume_text else "*"
+
+    removed = result_cache.delete_matching(f"{pipeline}:*:{jd_part}:{resume_part}")
+    logger.info("Invalidated %d cached analysis result(s)", removed)
+    return removed
+
+
+def result_cache_stats() -> Dict[str, object]:
+    if result_cache is None:
+        return {"misses": 0, "hit_rate": 0.0}
+    return result_cache.stats()
+
+
+register_cache_stats("analysis_results", result_cache_stats)
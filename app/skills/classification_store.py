@@ -0,0 +1,132 @@
+"""
+classification_store.py
+
+Persistent record of every skill string the LLM has classified.
+
+One row per normalized skill. `category` is NULL when the model was
+asked about the skill but did not classify it, so it is not asked again
+either. The whole table is loaded into memory on first use; lookups
+never touch the file, writes go through to it.
+
+Failed calls (network errors, unparseable answers) are not recorded,
+so those skills are retried by a later request.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.config import SKILL_STORE_PATH
+from app.utils.metrics import register_cache_stats
+
+
+def skill_key(skill: str) -> str:
+    """
+    Store key for a skill string: lowercased, whitespace collapsed.
+    """
+    return " ".join(str(skill).lower().split())
+
+
+class SkillClassificationStore:
+    """
+    skill key -> category (or None), backed by a sqlite file.
+    An empty `path` keeps the store in memory only.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._categories: Dict[str, Optional[str]] = {}
+
+    def _open(self) -> None:
+        """
+        Connect and load the table on first use. Call with the lock held.
+        """
+        if self._conn is not None:
+            return
+
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path or ":memory:", check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS skill_classifications ("
+            " skill TEXT PRIMARY KEY,"
+            " category TEXT,"
+            " classified_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+        self._categories = dict(
+            conn.execute("SELECT skill, category FROM skill_classifications")
+        )
+        self._conn = conn
+
+    def lookup(self, keys: Iterable[str]) -> Tuple[Dict[str, Optional[str]], list]:
+        """
+        Split `keys` into (known key -> category, keys never asked about).
+        """
+        known: Dict[str, Optional[str]] = {}
+        missing = []
+
+        with self._lock:
+            self._open()
+            for key in keys:
+                if key in self._categories:
+                    known[key] = self._categories[key]
+                else:
+                    missing.append(key)
+            self._counts["hits"] += len(known)
+            self._counts["misses"] += len(missing)
+
+        return known, missing
+
+    def put_many(self, categories: Dict[str, Optional[str]]) -> None:
+        if not categories:
+            return
+
+        now = time.time()
+        with self._lock:
+            self._open()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO skill_classifications (skill, category, classified_at)"
+                " VALUES (?, ?, ?)",
+                [(key, category, now) for key, category in categories.items()],
+            )
+            self._conn.commit()
+            self._categories.update(categories)
+
+    def classified(self) -> Dict[str, str]:
+        """
+        Every skill that received a category.
+        """
+        with self._lock:
+            self._open()
+            return {key: category for key, category in self._categories.items() if category}
+
+    def __len__(self) -> int:
+        return len(self._categories)
+
+    def stats(self) -> Dict[str, object]:
+        hits, misses = self._counts["hits"], self._counts["misses"]
+        lookups = hits + misses
+
+        return {
+            "memory_items": len(self),
+            "memory_hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+skill_store = SkillClassificationStore(SKILL_STORE_PATH)
+
+register_cache_stats("skill_classifications", skill_store.stats)
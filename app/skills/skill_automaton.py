@@ -0,0 +1,235 @@
+"""
+skill_automaton.py
+
+Aho-Corasick skill matcher.
+Finds every taxonomy term (canonical skills and aliases) in a single
+pass over the text, with the same word-boundary rules as regex `\\b`.
+
+Matching reads one immutable snapshot of the tables, so terms can be
+added at runtime with extend() while other threads are matching. Terms
+that live outside the code (e.g. in a database) can be loaded just
+before the first match with defer().
+"""
+
+import copy
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+
+def _is_word_char(char: str) -> bool:
+    # Same definition of a word character as `\w` for str patterns
+    return char.isalnum() or char == "_"
+
+
+def _is_boundary(text: str, index: int) -> bool:
+    """
+    True if `\\b` would match at `index` in `text`.
+    """
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+
+class SkillAutomaton:
+    """
+    Multi-pattern matcher over a skill taxonomy.
+
+    Each term maps to one or more output skills. Matches may overlap
+    (e.g. "gen ai" and "ai"), exactly like running one regex per term.
+    """
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (term_length, outputs) for every term ending at this node
+        self._terms: List[List[Tuple[int, Set[str]]]] = [[]]
+        # Terms ending at this node or any of its failure-chain suffixes
+        self._outputs: List[List[Tuple[int, Set[str]]]] = [[]]
+        self._dirty = False
+        # (goto, fail, outputs) published by build(); read by matching
+        self._snapshot = (self._goto, self._fail, self._outputs)
+        self._extend_lock = threading.Lock()
+        self._deferred: List[Callable[[], None]] = []
+        self._deferred_lock = threading.Lock()
+
+    def add(self, term: str, output: str) -> None:
+        """
+        Register `term` so that a bounded match yields `output`.
+        """
+        if not term:
+            return
+
+        node = 0
+        for char in term:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._terms.append([])
+            node = nxt
+
+        for length, outputs in self._terms[node]:
+            if length == len(term):
+                outputs.add(output)
+                break
+        else:
+            self._terms[node].append((len(term), {output}))
+
+        self._dirty = True
+
+    def build(self) -> "SkillAutomaton":
+        """
+        Compute failure links. Called automatically before matching.
+        """
+        self._outputs = [[] for _ in self._goto]
+
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._outputs[child] = list(self._terms[child])
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._outputs[child] = (
+                    self._terms[child] + self._outputs[self._fail[child]]
+                )
+
+        self._snapshot = (self._goto, self._fail, self._outputs)
+        self._dirty = False
+        return self
+
+    def extend(self, pairs: Iterable[Tuple[str, str]]) -> List[str]:
+        """
+        Add (term, output) pairs to a live automaton. The tables are
+        rebuilt on a copy and published in one assignment, so
+        concurrent matching sees either the old or the new taxonomy.
+        Returns the terms that were not already known.
+        """
+        with self._extend_lock:
+            if self._dirty:
+                self.build()
+
+            draft = SkillAutomaton()
+            draft._goto = copy.deepcopy(self._goto)
+            draft._fail = list(self._fail)
+            draft._terms = copy.deepcopy(self._terms)
+
+            added = []
+            for term, output in pairs:
+                if term and term == term.lower() and not draft._has_term(term):
+                    draft.add(term, output)
+                    added.append(term)
+
+            if not added:
+                return added
+
+            draft.build()
+            self._goto, self._fail, self._terms = draft._goto, draft._fail, draft._terms
+            self._outputs = draft._outputs
+            self._snapshot = draft._snapshot
+            return added
+
+    def defer(self, loader: Callable[[], None]) -> None:
+        """
+        Run `loader()` once, right before the first match; typically it
+        calls extend() with terms that should not be read at import.
+        """
+        self._deferred.append(loader)
+
+    def load_deferred(self) -> None:
+        """
+        Run pending defer() loaders. Matching does this by itself; other
+        threads wait until the loaders are done.
+        """
+        if not self._deferred:
+            return
+
+        with self._deferred_lock:
+            while self._deferred:
+                try:
+                    self._deferred[0]()
+                finally:
+                    self._deferred.pop(0)
+
+    def _has_term(self, term: str) -> bool:
+        node = 0
+        for char in term:
+            node = self._goto[node].get(char)
+            if node is None:
+                return False
+        return any(length == len(term) for length, _ in self._terms[node])
+
+    def find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Return (start, end, output) for every bounded term occurrence.
+        """
+        if self._deferred:
+            self.load_deferred()
+        if self._dirty:
+            self.build()
+
+        goto, fail, node_outputs = self._snapshot
+
+        spans = []
+        node = 0
+
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            if not node_outputs[node]:
+                continue
+
+            end = index + 1
+            if not _is_boundary(text, end):
+                continue
+
+            for length, outputs in node_outputs[node]:
+                start = end - length
+                if _is_boundary(text, start):
+                    for output in outputs:
+                        spans.append((start, end, output))
+
+        return spans
+
+    def find_all(self, text: str) -> Set[str]:
+        """
+        Return the set of outputs whose terms occur in `text`.
+        """
+        return {output for _, _, output in self.find_spans(text)}
+
+
+def build_skill_automaton(
+    skills: Iterable[str],
+    aliases: Dict[str, str],
+    normalize,
+) -> SkillAutomaton:
+    """
+    Build the matcher for a skill list plus alias map.
+
+    Terms are matched against lowercased text, so a term containing
+    uppercase characters can never match and is skipped.
+    """
+    automaton = SkillAutomaton()
+
+    for skill in skills:
+        if skill == skill.lower():
+            automaton.add(skill, normalize(skill))
+
+    for alias, canonical in aliases.items():
+        if alias == alias.lower():
+            automaton.add(alias, normalize(canonical))
+
+    return automaton.build()
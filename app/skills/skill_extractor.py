@@ -1,23 +1,82 @@
-import re
+import hashlib
+import logging
+import threading
+
+from app.skills.classification_store import skill_store
 from app.skills.skill_list import SKILL_LIST as SKILLS
 from app.skills.skill_aliases import SKILL_ALIASES
 from app.skills.skill_normalizer import normalize_skill
+from app.skills.skill_automaton import build_skill_automaton
+
+logger = logging.getLogger(__name__)
+
+# Built once when the taxonomy loads: canonical skills and aliases
+# are matched together in a single pass over the text
+SKILL_AUTOMATON = build_skill_automaton(SKILLS, SKILL_ALIASES, normalize_skill)
+
+# Skills added at runtime from LLM classifications (see promote_skills)
+_promoted: set = set()
+_promoted_lock = threading.Lock()
+_taxonomy_listeners = []
 
 
 def extract_skills(text: str) -> list[str]:
     text = text.lower()
-    found_skills = set()
+    found_skills = SKILL_AUTOMATON.find_all(text)
 
-    # 1️⃣ Detect canonical skills
-    for skill in SKILLS:
-        pattern = r"\b" + re.escape(skill) + r"\b"
-        if re.search(pattern, text):
-            found_skills.add(normalize_skill(skill))
+    return sorted(found_skills)
 
-    # 2️⃣ Detect aliases directly (CRITICAL FIX)
-    for alias, canonical in SKILL_ALIASES.items():
-        pattern = r"\b" + re.escape(alias) + r"\b"
-        if re.search(pattern, text):
-            found_skills.add(normalize_skill(canonical))
 
-    return sorted(found_skills)
+# -----------------------------
+# Runtime taxonomy extension
+# -----------------------------
+def on_taxonomy_change(callback) -> None:
+    """
+    Call `callback()` whenever promote_skills() adds a term, e.g. to
+    drop caches holding skills extracted with the old taxonomy.
+    """
+    _taxonomy_listeners.append(callback)
+
+
+def promote_skills(skills) -> int:
+    """
+    Add LLM-classified skills to the matcher so later extractions find
+    them locally. Skills already in the taxonomy are ignored. Returns
+    the number of skills added.
+    """
+    with _promoted_lock:
+        added = SKILL_AUTOMATON.extend(
+            (skill, normalize_skill(skill)) for skill in skills
+        )
+        _promoted.update(added)
+
+    if added:
+        for callback in list(_taxonomy_listeners):
+            callback()
+    return len(added)
+
+
+def promoted_taxonomy_digest() -> str:
+    """
+    Stamp of the promoted skills ("" when none); part of the result
+    cache key, since promotions change what gets extracted.
+    """
+    SKILL_AUTOMATON.load_deferred()
+    with _promoted_lock:
+        if not _promoted:
+            return ""
+        terms = sorted(_promoted)
+
+    return hashlib.sha256("\n".join(terms).encode("utf-8")).hexdigest()[:16]
+
+
+def _promote_stored_skills() -> None:
+    try:
+        promote_skills(skill_store.classified())
+    except Exception:
+        logger.exception("Loading stored skill classifications failed")
+
+
+# Skills classified in earlier runs join the taxonomy before the first
+# match; the store itself is not opened at import
+SKILL_AUTOMATON.defer(_promote_stored_skills)
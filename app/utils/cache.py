@@ -0,0 +1,323 @@
+"""
+cache.py
+
+Small reusable cache building blocks.
+
+- MemoryLRU   : thread-safe in-process LRU with optional TTL
+- SqliteCache : local sqlite key/value store with TTL and a size bound
+                (least recently used rows are evicted first)
+- TieredCache : memory tier in front of a disk tier, with hit-rate stats
+"""
+
+import os
+import sqlite3
+from fnmatch import fnmatchcase
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# A disk-tier hit refreshes accessed_at (the eviction order) at most
+# this often, so repeated reads of a hot key do not each write a row
+ACCESS_TOUCH_SECONDS = 60.0
+
+
+class MemoryLRU:
+    """
+    In-process LRU cache. Values are stored as-is, so it can also hold
+    objects that are expensive to rebuild.
+    """
+
+    def __init__(self, max_items: int = 256, ttl_seconds: Optional[float] = None) -> None:
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+
+            value, stored_at = item
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                del self._items[key]
+                return None
+
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_items <= 0:
+            return
+
+        with self._lock:
+            self._items[key] = (value, time.time())
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def delete_matching(self, pattern: str) -> int:
+        """
+        Delete keys matching a glob pattern ("*" / "?"); returns the count.
+        """
+        with self._lock:
+            doomed = [key for key in self._items if fnmatchcase(key, pattern)]
+            for key in doomed:
+                del self._items[key]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SqliteCache:
+    """
+    Key/value cache stored in a local sqlite file.
+
+    `max_bytes` bounds the total size of stored values; when exceeded,
+    least recently accessed rows are deleted until the store is back
+    under 90% of the bound. Access times are only written when older
+    than ACCESS_TOUCH_SECONDS, so recency is approximate. Expired rows are dropped on read and during
+    eviction. The file is created on first use, not at construction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        table: str = "cache",
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.table = table
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        Connect and create the table on first use. Call with the lock held.
+        """
+        if self._conn is not None:
+            return self._conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table}(accessed_at)"
+        )
+        conn.commit()
+
+        self._conn = conn
+        return conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            self._open()
+            row = self._conn.execute(
+                f"SELECT value, created_at, accessed_at FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at, accessed_at = row
+            if self._expired(created_at, now):
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            if now - accessed_at >= ACCESS_TOUCH_SECONDS:
+                self._conn.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+
+        with self._lock:
+            self._open()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table}"
+                " (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            self.evictions += cursor.rowcount
+
+        if self.max_bytes is None:
+            return
+
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC"
+        )
+        doomed = []
+        for key, size in rows:
+            if total <= target:
+                break
+            doomed.append((key,))
+            total -= size
+
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._open()
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def delete_matching(self, pattern: str) -> int:
+        """
+        Delete keys matching a glob pattern (sqlite GLOB); returns the count.
+        """
+        with self._lock:
+            self._open()
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key GLOB ?", (pattern,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._open()
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def size_info(self) -> Dict[str, int]:
+        with self._lock:
+            # Stats alone should not create the file
+            if self._conn is None and not os.path.exists(self.path):
+                return {"items": 0, "bytes": 0}
+            self._open()
+            items, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {"items": items, "bytes": total}
+
+
+class TieredCache:
+    """
+    Memory LRU in front of an optional sqlite tier.
+    Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory: MemoryLRU, disk: Optional[SqliteCache] = None) -> None:
+        self.memory = memory
+        self.disk = disk
+
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def delete_matching(self, pattern: str) -> int:
+        deleted = self.memory.delete_matching(pattern)
+        if self.disk is not None:
+            # Disk holds a superset of memory
+            deleted = max(deleted, self.disk.delete_matching(pattern))
+        return deleted
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, object]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+
+        stats = {
+            "memory_items": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.memory.evictions,
+        }
+        if self.disk is not None:
+            disk = self.disk.size_info()
+            stats["disk_items"] = disk["items"]
+            stats["disk_bytes"] = disk["bytes"]
+            stats["evictions"] += self.disk.evictions
+
+        return stats
@@ -0,0 +1,308 @@
+"""
+metrics.py
+
+Lightweight in-process metrics with Prometheus text exposition.
+
+- Counter   : monotonically increasing count per label set
+- Histogram : fixed-bucket latency histogram per label set
+- Collectors: callbacks evaluated at scrape time (cache hit rates etc.)
+
+Recording is a dict lookup and a few integer updates under a lock, so
+the instrumentation can stay on in production.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Seconds; covers in-process stages (ms) up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+# (name, type, help, [(labels, value)])
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + body + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, object] = {}
+
+    def _labels(self, values: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._series.get(labels, 0.0)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            series = list(self._series.items())
+
+        samples = [(self._labels(labels), value) for labels, value in series]
+        return self.name, self.kind, self.help, samples
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts (last = +Inf), sum, count]
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[labels] = series
+
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            series = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in self._series.items()
+            ]
+
+        samples = []
+        for labels, counts, total, count in series:
+            base = self._labels(labels)
+
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(({**base, "le": _format_value(bound)}, cumulative, "_bucket"))
+
+            samples.append((base, total, "_sum"))
+            samples.append((base, count, "_count"))
+
+        return self.name, self.kind, self.help, samples
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception:
+                # A broken collector must not take the endpoint down
+                continue
+        return families
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        # Several collectors may report the same family (one per cache)
+        merged: Dict[str, MetricFamily] = {}
+        for name, kind, help, samples in self.collect():
+            if name in merged:
+                merged[name][3].extend(samples)
+            else:
+                merged[name] = (name, kind, help, list(samples))
+
+        lines = []
+        for name, kind, help, samples in merged.values():
+            lines.append(f"# HELP {name} {_escape(help)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in samples:
+                labels, value = sample[0], sample[1]
+                suffix = sample[2] if len(sample) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def histogram(
+    name: str,
+    help: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+def register_cache_stats(cache: str, stats_fn: Callable[[], Dict[str, object]]) -> None:
+    """
+    Expose a cache's stats() dict at scrape time.
+
+    Understands the keys used by the caches in this repo:
+    "<tier>_hits", "misses", "hit_rate", "<tier>_items" and "evictions".
+    """
+    def collect() -> List[MetricFamily]:
+        stats = stats_fn()
+        labels = {"cache": cache}
+
+        hits = [
+            ({**labels, "tier": key[:-len("_hits")]}, value)
+            for key, value in stats.items() if key.endswith("_hits")
+        ]
+        items = [
+            ({**labels, "tier": key[:-len("_items")]}, value)
+            for key, value in stats.items() if key.endswith("_items")
+        ]
+
+        families = [
+            ("cache_hits_total", "counter", "Cache hits by tier", hits),
+            ("cache_misses_total", "counter", "Cache misses",
+             [(labels, stats.get("misses", 0))]),
+            ("cache_hit_ratio", "gauge", "Hits over lookups since start",
+             [(labels, stats.get("hit_rate", 0.0))]),
+            ("cache_items", "gauge", "Entries held by tier", items),
+        ]
+        if "evictions" in stats:
+            families.append(
+                ("cache_evictions_total", "counter", "Cache evictions",
+                 [(labels, stats["evictions"])])
+            )
+        return families
+
+    REGISTRY.register_collector(collect)
+
+
+# -----------------------------
+# HTTP request metrics
+# -----------------------------
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_seconds",
+    "Time to produce the response headers",
+    ["method", "route"],
+)
+HTTP_REQUESTS = counter(
+    "http_requests_total",
+    "HTTP requests by status code",
+    ["method", "route", "status"],
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Plain ASGI middleware (no per-request task or body buffering).
+    Requests are labelled with the route template, not the raw path,
+    to keep label cardinality bounded.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+        recorded = False
+
+        def record() -> None:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, scope["method"], path
+            )
+            HTTP_REQUESTS.inc(scope["method"], path, str(status["code"]))
+
+        async def send_wrapper(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                record()
+                recorded = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                record()
@@ -0,0 +1,224 @@
+"""
+profiling.py
+
+Opt-in per-request profiling.
+
+A profiled request runs under cProfile with tracemalloc enabled and
+gets a compact report attached to its response:
+
+- top functions by cumulative time
+- wall and CPU time per stage
+- peak traced allocation
+
+cProfile only sees the thread it was enabled on, so profiled pipeline
+runs execute their CPU stages inline on the event loop thread. Only one
+request is profiled at a time; others wait for the profiler.
+"""
+
+import asyncio
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+from app.config import ENABLE_REQUEST_PROFILING, PROFILE_TOP_FUNCTIONS
+
+_TRUTHY = ("1", "true", "yes", "on")
+
+_profile_lock: Optional[asyncio.Lock] = None
+
+
+class ProfilingDisabledError(Exception):
+    """
+    Raised when profiling is requested but ENABLE_REQUEST_PROFILING is off.
+    """
+
+
+def profiling_requested(header: Optional[str], flag: object = None) -> bool:
+    """
+    True when the X-Profile header or the `profile` form field is set.
+    Non-string / non-bool values (unresolved FastAPI defaults when a
+    route is called directly) count as not set.
+    """
+    if isinstance(header, str) and header.strip().lower() in _TRUTHY:
+        return True
+    if isinstance(flag, str):
+        return flag.strip().lower() in _TRUTHY
+    return flag is True
+
+
+def _short_path(filename: str) -> str:
+    """
+    "app/..." for repo code, package-relative for site-packages.
+    """
+    path = filename.replace(os.sep, "/")
+
+    index = path.rfind("/site-packages/")
+    if index != -1:
+        return path[index + len("/site-packages/"):]
+
+    index = path.rfind("/app/")
+    if index != -1:
+        return path[index + 1:]
+
+    return os.path.basename(path)
+
+
+class RequestProfiler:
+    """
+    Collects the profile of one request. Also acts as a stage observer
+    for the analysis pipeline (see stage_finished).
+    """
+
+    def __init__(self, top: int = PROFILE_TOP_FUNCTIONS) -> None:
+        self.top = top
+        self._profile = cProfile.Profile()
+        self._stages: List[Dict[str, object]] = []
+        self._started_tracemalloc = False
+        self._wall = 0.0
+        self._cpu = 0.0
+        self._peak_bytes = 0
+
+    # -----------------------------
+    # Lifecycle
+    # -----------------------------
+    def start(self) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self._wall = time.perf_counter() - self._wall_started
+        self._cpu = time.process_time() - self._cpu_started
+
+        self._peak_bytes = tracemalloc.get_traced_memory()[1]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    # -----------------------------
+    # Stage timings
+    # -----------------------------
+    def stage_finished(
+        self,
+        name: str,
+        kind: str,
+        wall: float,
+        cpu: Optional[float],
+    ) -> None:
+        self._stages.append({"stage": name, "kind": kind, "wall": wall, "cpu": cpu})
+
+    def _stage_report(self) -> List[Dict[str, object]]:
+        merged: Dict[str, Dict[str, object]] = {}
+
+        for entry in self._stages:
+            item = merged.setdefault(entry["stage"], {
+                "stage": entry["stage"],
+                "kind": entry["kind"],
+                "calls": 0,
+                "wall_ms": 0.0,
+                "cpu_ms": 0.0 if entry["cpu"] is not None else None,
+            })
+            item["calls"] += 1
+            item["wall_ms"] += entry["wall"] * 1000
+            if item["cpu_ms"] is not None and entry["cpu"] is not None:
+                item["cpu_ms"] += entry["cpu"] * 1000
+
+        for item in merged.values():
+            item["wall_ms"] = round(item["wall_ms"], 3)
+            if item["cpu_ms"] is not None:
+                item["cpu_ms"] = round(item["cpu_ms"], 3)
+
+        return sorted(merged.values(), key=lambda item: item["wall_ms"], reverse=True)
+
+    # -----------------------------
+    # Report
+    # -----------------------------
+    def _top_functions(self) -> List[Dict[str, object]]:
+        stats = pstats.Stats(self._profile)
+        stats.sort_stats("cumulative")
+
+        functions = []
+        for func in stats.fcn_list[:self.top]:
+            _, calls, tottime, cumtime, _ = stats.stats[func]
+            filename, line, name = func
+            location = f"{_short_path(filename)}:{line}" if line else filename
+
+            functions.append({
+                "function": f"{location}({name})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            })
+
+        return functions
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "wall_ms": round(self._wall * 1000, 3),
+            "cpu_ms": round(self._cpu * 1000, 3),
+            "peak_traced_kb": round(self._peak_bytes / 1024, 1),
+            "stages": self._stage_report(),
+            "top_functions": self._top_functions(),
+        }
+
+
+@contextmanager
+def timed_stage(observer, name: str, kind: str = "cpu"):
+    """
+    Time a block of synchronous code as a stage for `observer`
+    (no-op when observer is None).
+    """
+    if observer is None:
+        yield
+        return
+
+    wall_started = time.perf_counter()
+    cpu_started = time.thread_time()
+    try:
+        yield
+    finally:
+        observer.stage_finished(
+            name,
+            kind,
+            time.perf_counter() - wall_started,
+            time.thread_time() - cpu_started,
+        )
+
+
+@asynccontextmanager
+async def request_profiling(header: Optional[str], flag: object = None):
+    """
+    Yield a running RequestProfiler when the request asked for one,
+    else None. Raises ProfilingDisabledError when profiling is off.
+    """
+    global _profile_lock
+
+    if not profiling_requested(header, flag):
+        yield None
+        return
+
+    if not ENABLE_REQUEST_PROFILING:
+        raise ProfilingDisabledError(
+            "Request profiling is disabled (set ENABLE_REQUEST_PROFILING=1)"
+        )
+
+    if _profile_lock is None:
+        _profile_lock = asyncio.Lock()
+
+    async with _profile_lock:
+        profiler = RequestProfiler()
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
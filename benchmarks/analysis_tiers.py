@@ -0,0 +1,114 @@
+"""
+analysis_tiers.py
+
+Latency of the /api/v1/analyze depth tiers (fast / standard / deep) and
+of a field-masked request, measured in-process on the analysis service
+(no HTTP, no result cache).
+
+- fast     : needs nothing beyond the repo
+- standard : loads the embedding model once before timing
+- deep     : calls Gemini (GEMINI_API_KEY) on every run
+
+    python benchmarks/analysis_tiers.py --runs 20
+    python benchmarks/analysis_tiers.py --modes fast standard --resume cv.txt --jd jd.txt
+
+Numbers depend on hardware, the embedding cache and LLM latency;
+record them with the machine they were taken on.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.matching.embedding_batcher import _percentile  # noqa: E402
+from app.service.analyze_service import (  # noqa: E402
+    ANALYSIS_MODES,
+    analyze_v1,
+    resolve_v1_options,
+)
+
+SAMPLE_RESUME = (
+    "Summary\nBackend developer with python, django, fastapi and sql.\n"
+    "Experience\nSoftware Engineer Jan 2021 - Present building rest api "
+    "services on aws with docker and kubernetes.\n"
+    "Projects\nResume analyzer in python using machine learning and nlp.\n"
+    "Skills\npython django sql docker aws react\n"
+    "Education\nB.Tech computer science\n"
+)
+
+SAMPLE_JD = (
+    "We are hiring a backend developer. Must have python, django, sql, "
+    "docker and 3+ years experience building rest api services. Good to "
+    "have aws, kubernetes and react. The role involves designing services, "
+    "reviewing code and mentoring engineers across the platform team. " * 2
+)
+
+
+def _read(path, default: str) -> str:
+    if not path:
+        return default
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+async def _measure(resume: str, jd: str, mode: str, fields, runs: int):
+    mode, fields = resolve_v1_options(mode, fields)
+
+    # Untimed: model load, compiled JD cache, thread pool start-up
+    await analyze_v1(resume, jd, mode=mode, fields=fields)
+
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await analyze_v1(resume, jd, mode=mode, fields=fields)
+        latencies.append(time.perf_counter() - started)
+
+    return {
+        "mode": mode,
+        "fields": list(fields),
+        "runs": runs,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p95": round(_percentile(latencies, 95) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+    }
+
+
+async def _run(args) -> dict:
+    resume = _read(args.resume, SAMPLE_RESUME)
+    jd = _read(args.jd, SAMPLE_JD)
+
+    results = {}
+    for mode in args.modes:
+        results[mode] = await _measure(resume, jd, mode, None, args.runs)
+
+    if args.fields:
+        mode = args.modes[0]
+        results[f"{mode}[{args.fields}]"] = await _measure(
+            resume, jd, mode, args.fields, args.runs
+        )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", choices=ANALYSIS_MODES, default=list(ANALYSIS_MODES))
+    parser.add_argument("--fields", default="ats_score",
+                        help="field mask timed with the first mode ('' to skip)")
+    parser.add_argument("--resume", help="resume text file (default: built-in sample)")
+    parser.add_argument("--jd", help="job description text file (default: built-in sample)")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
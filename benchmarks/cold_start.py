@@ -0,0 +1,111 @@
+"""
+cold_start.py
+
+Measures process cold start and time-to-first-analysis.
+
+Starts uvicorn in a subprocess, then reports:
+- seconds until "/" answers (server accepting requests)
+- seconds until "/ready" returns 200 (model and caches hot)
+- seconds until the first /api/v1/analyze response, and its latency
+
+Run it on two checkouts to compare before/after:
+    python benchmarks/cold_start.py --port 8765
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+SAMPLE_RESUME = (
+    "Summary Backend developer with python, django, fastapi and sql. "
+    "Experience Software Engineer Jan 2021 - Present building rest api "
+    "services on aws with docker and kubernetes. Projects Resume analyzer "
+    "in python using machine learning and nlp. Skills python django sql "
+    "docker aws react. Education B.Tech computer science. " * 3
+)
+
+SAMPLE_JD = (
+    "We are hiring a backend developer. Must have python, django, sql, "
+    "docker and 3+ years experience building rest api services. Good to "
+    "have aws, kubernetes and react. The role involves designing services, "
+    "reviewing code and mentoring engineers across the platform team. " * 2
+)
+
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return 0
+
+
+def _post_form(url: str, fields: dict) -> int:
+    body = urllib.parse.urlencode(fields).encode("utf-8")
+    request = urllib.request.Request(url, data=body, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _wait_for(url: str, status: int, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        if _get(url) == status:
+            return round(time.perf_counter() - started, 3)
+        time.sleep(0.05)
+    raise TimeoutError(f"{url} did not return {status} within {timeout}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--skip-ready", action="store_true",
+                        help="Do not wait for /ready (servers without it)")
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    started = time.perf_counter()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port)],
+        env=os.environ.copy(),
+    )
+
+    try:
+        result = {"accepting_requests_seconds": _wait_for(f"{base}/", 200, started, args.timeout)}
+
+        if not args.skip_ready:
+            result["ready_seconds"] = _wait_for(f"{base}/ready", 200, started, args.timeout)
+
+        request_started = time.perf_counter()
+        status = _post_form(
+            f"{base}/api/v1/analyze",
+            {"resume_text": SAMPLE_RESUME, "jd_text": SAMPLE_JD},
+        )
+        finished = time.perf_counter()
+
+        result["first_analysis_status"] = status
+        result["first_analysis_latency_seconds"] = round(finished - request_started, 3)
+        result["time_to_first_analysis_seconds"] = round(finished - started, 3)
+
+        print(json.dumps(result, indent=2))
+        return 0
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+embedding_batching.py
+
+Compares per-request model.encode calls with the micro-batcher under
+concurrent load. Strings are random so the embedding cache never hits.
+
+    python benchmarks/embedding_batching.py --threads 16 --requests 50
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.matching.embedding_batcher import EmbeddingBatcher, _percentile  # noqa: E402
+from app.matching.semantic_matcher import get_model  # noqa: E402
+
+
+def _random_skills(count: int):
+    return [
+        "".join(random.choice(string.ascii_lowercase) for _ in range(8))
+        for _ in range(count)
+    ]
+
+
+def _run(encode, threads: int, requests: int, skills_per_request: int):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(requests):
+            texts = _random_skills(skills_per_request)
+            started = time.perf_counter()
+            encode(texts)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - started
+
+    total = threads * requests
+    return {
+        "requests": total,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(total / wall, 2),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p95": round(_percentile(latencies, 95) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--skills", type=int, default=8)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = get_model()
+    model.encode(["warmup"])
+
+    unbatched = _run(model.encode, args.threads, args.requests, args.skills)
+
+    batcher = EmbeddingBatcher(
+        model.encode,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    batched = _run(batcher.encode, args.threads, args.requests, args.skills)
+    batched["batcher"] = batcher.stats()
+    batcher.close()
+
+    print(json.dumps({"unbatched": unbatched, "batched": batched}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+llm_load.py
+
+Throughput and tail latency of deep /api/v1/analyze requests under
+concurrent load, fully offline: LLM calls go to the stand-in provider
+(LLM_PROVIDER=stub) and the LLM response cache is switched off, so
+every request pays for its feedback and rewrite calls. The skill store
+is kept in memory only: as in production, a skill is classified once.
+
+Measured in-process on the analysis service (no HTTP, no result cache).
+The embedding model is loaded once before timing.
+
+    python benchmarks/llm_load.py --concurrency 32 --requests 200
+    python benchmarks/llm_load.py --latency-ms 1500 --sigma 0.8 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+
+def _configure(args) -> None:
+    # Read by app.config at import time
+    os.environ.update({
+        "LLM_PROVIDER": "stub",
+        "LLM_CACHE_ENABLED": "false",
+        "SKILL_STORE_PATH": "",
+        "LLM_STUB_LATENCY_MS": str(args.latency_ms),
+        "LLM_STUB_LATENCY_SIGMA": str(args.sigma),
+        "LLM_STUB_ERROR_RATE": str(args.error_rate),
+        "LLM_STUB_MALFORMED_RATE": str(args.malformed_rate),
+        "LLM_STUB_SEED": str(args.seed),
+        "LLM_REQUESTS_PER_MINUTE": str(args.rpm),
+    })
+    if args.max_llm_concurrency:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.max_llm_concurrency)
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+SAMPLE_JD = (
+    "We are hiring a backend developer. Must have python, django, sql, "
+    "docker and 3+ years experience building rest api services. Good to "
+    "have aws, kubernetes and react. The role involves designing services, "
+    "reviewing code and mentoring engineers across the platform team. " * 2
+)
+
+
+SAMPLE_RESUME = (
+    "Summary\nBackend developer with python, django, fastapi and sql.\n"
+    "Experience\nSoftware Engineer Jan 2021 - Present building rest api "
+    "services on aws with docker and kubernetes.\n"
+    "Projects\nResume analyzer in python using machine learning and nlp.\n"
+    "Skills\npython django sql docker aws react\n"
+    "Education\nB.Tech computer science\n"
+)
+
+
+async def _run(args) -> dict:
+    from app.ai_engine.llm_gateway import close_llm_gateway
+    from app.matching.embedding_batcher import _percentile
+    from app.service.analyze_service import analyze_v1
+
+    # Untimed: model load, compiled JD cache, thread pool start-up
+    await analyze_v1(SAMPLE_RESUME, SAMPLE_JD, mode="deep")
+
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    degraded = Counter()
+
+    async def one() -> None:
+        async with gate:
+            started = time.perf_counter()
+            result = await analyze_v1(SAMPLE_RESUME, SAMPLE_JD, mode="deep")
+            latencies.append(time.perf_counter() - started)
+            for stage in result["degraded_stages"]:
+                degraded[f"{stage['stage']}:{stage['reason']}"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    wall = time.perf_counter() - started
+
+    await close_llm_gateway()
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 3),
+        "requests_per_second": round(args.requests / wall, 2),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50) * 1000, 3),
+            "p95": round(_percentile(latencies, 95) * 1000, 3),
+            "p99": round(_percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "degraded_stages": dict(degraded),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="median stub latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="log-normal shape (0 = constant)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rpm", type=float, default=0.0,
+                        help="LLM requests per minute (0 = no rate limit)")
+    parser.add_argument("--max-llm-concurrency", type=int, default=0,
+                        help="in-flight LLM calls (default: LLM_MAX_CONCURRENCY)")
+    args = parser.parse_args()
+
+    _configure(args)
+    print(json.dumps(asyncio.run(_run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
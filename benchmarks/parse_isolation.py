@@ -0,0 +1,126 @@
+"""
+parse_isolation.py
+
+Shows whether small-request latency depends on a concurrent large upload.
+
+Starts uvicorn, then keeps uploading a large PDF to /upload-resume while
+other threads send small /extract-skills requests. Reports p50/p95/p99
+of the small requests with and without the background uploads.
+
+    python benchmarks/parse_isolation.py --pdf samples/30_pages.pdf
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+from cold_start import _wait_for
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _upload(url: str, pdf_path: str) -> None:
+    boundary = uuid.uuid4().hex
+    with open(pdf_path, "rb") as f:
+        payload = f.read()
+
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{os.path.basename(pdf_path)}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode("utf-8") + payload + f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    request = urllib.request.Request(url, data=body, method="POST")
+    request.add_header("Content-Type", f"multipart/form-data; boundary={boundary}")
+    try:
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+    except urllib.error.HTTPError:
+        pass
+
+
+def _small_requests(url: str, count: int, latencies: list) -> None:
+    for _ in range(count):
+        request = urllib.request.Request(
+            url, data=b"python django sql docker aws", method="POST",
+            headers={"Content-Type": "text/plain"},
+        )
+        started = time.perf_counter()
+        with urllib.request.urlopen(request, timeout=300) as response:
+            response.read()
+        latencies.append(time.perf_counter() - started)
+
+
+def _measure(base: str, count: int, threads: int):
+    latencies = []
+    pool = [
+        threading.Thread(target=_small_requests, args=(f"{base}/extract-skills", count, latencies))
+        for _ in range(threads)
+    ]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", required=True, help="Large (e.g. 30-page) PDF")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port)],
+        env=os.environ.copy(),
+    )
+
+    try:
+        _wait_for(f"{base}/", 200, time.perf_counter(), 300)
+
+        baseline = _measure(base, args.requests, args.threads)
+
+        stop = threading.Event()
+
+        def uploader():
+            while not stop.is_set():
+                _upload(f"{base}/upload-resume", args.pdf)
+
+        upload_thread = threading.Thread(target=uploader, daemon=True)
+        upload_thread.start()
+        time.sleep(0.2)
+
+        under_load = _measure(base, args.requests, args.threads)
+        stop.set()
+        upload_thread.join(timeout=300)
+
+        print(json.dumps({"baseline": baseline, "with_large_upload": under_load}, indent=2))
+        return 0
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+pdf_engines.py
+
+Benchmarks pdfium vs pdfplumber text extraction over a corpus of PDFs.
+
+For every file and engine, extraction runs in a fresh process so peak
+memory is not polluted by earlier runs. Reports per-page time, peak
+Python heap (tracemalloc), peak RSS, whether the auto engine fell back,
+and how closely pdfium's text matches pdfplumber's.
+
+    python benchmarks/pdf_engines.py samples/pdfs/
+"""
+
+import argparse
+import difflib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.parsing.pdf_extractor import (  # noqa: E402
+    extract_with_pdfium,
+    extract_with_pdfplumber,
+    looks_degenerate,
+)
+
+ENGINES = {
+    "pdfium": extract_with_pdfium,
+    "pdfplumber": extract_with_pdfplumber,
+}
+
+
+def _run_engine(engine: str, path: str, queue) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    text, pages = ENGINES[engine](path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({
+        "text": text,
+        "pages": pages,
+        "seconds": elapsed,
+        "tracemalloc_peak_kb": peak // 1024,
+        # ru_maxrss is in KB on Linux
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    })
+
+
+def _measure(engine: str, path: str) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run_engine, args=(engine, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def text_similarity(a: str, b: str) -> dict:
+    """
+    Token-level equivalence between two extractions.
+    """
+    tokens_a, tokens_b = a.split(), b.split()
+    set_a, set_b = set(tokens_a), set(tokens_b)
+
+    return {
+        "sequence_ratio": round(
+            difflib.SequenceMatcher(None, tokens_a, tokens_b, autojunk=False).ratio(), 4
+        ),
+        "token_jaccard": round(
+            len(set_a & set_b) / len(set_a | set_b), 4
+        ) if set_a | set_b else 1.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("corpus", help="Directory containing PDF files")
+    args = parser.parse_args()
+
+    files = sorted(
+        os.path.join(args.corpus, name)
+        for name in os.listdir(args.corpus)
+        if name.lower().endswith(".pdf")
+    )
+
+    rows = []
+    for path in files:
+        row = {"file": os.path.basename(path)}
+        texts = {}
+
+        for engine in ENGINES:
+            result = _measure(engine, path)
+            texts[engine] = result.pop("text")
+            pages = max(result["pages"], 1)
+            row[engine] = {
+                "pages": result["pages"],
+                "ms_per_page": round(result["seconds"] * 1000 / pages, 2),
+                "tracemalloc_peak_kb": result["tracemalloc_peak_kb"],
+                "max_rss_kb": result["max_rss_kb"],
+            }
+
+        row["auto_falls_back"] = looks_degenerate(texts["pdfium"], row["pdfium"]["pages"])
+        row["equivalence"] = text_similarity(texts["pdfium"], texts["pdfplumber"])
+        rows.append(row)
+
+    summary = {}
+    if rows:
+        for engine in ENGINES:
+            summary[f"{engine}_mean_ms_per_page"] = round(
+                sum(row[engine]["ms_per_page"] for row in rows) / len(rows), 2
+            )
+        summary["mean_sequence_ratio"] = round(
+            sum(row["equivalence"]["sequence_ratio"] for row in rows) / len(rows), 4
+        )
+        summary["fallback_rate"] = round(
+            sum(row["auto_falls_back"] for row in rows) / len(rows), 4
+        )
+
+    print(json.dumps({"files": rows, "summary": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()